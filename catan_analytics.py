@@ -0,0 +1,434 @@
+### Catan Board Randomizer ###
+###   Streaming Analytics    ###
+
+# Import Necessary Packages
+import argparse # Command line argument parsing
+import json # JSON report
+import math # Normal approximation of the chi-square tail
+import os # File system access for the output directory
+import random # Seeded generators for the Python board sources
+from concurrent.futures import ProcessPoolExecutor # Pool of worker processes
+import numpy as np # Array library used to tally whole batches of boards at once
+from PIL import Image, ImageDraw # Heatmap images
+from catan_batch import RESOURCES, TOKENS, generate_batch, words_to_batch # Batch board arrays
+from catan_core import BOARD_DATA, MODES, RESOURCE_NAMES, get_topology, new_board, new_valid_board # Board generation
+from catan_geometry import HEX_SIZE, LEGEND_ITEMS, board_frame, hex_corners # Shared board geometry
+from catan_render import load_font # Font of the heatmap labels
+from catan_topology import RED_NUMBERS # Numbers coloured red on the board
+
+# Boards generated and tallied per task; every chunk has its own random stream spawned from the master seed
+ANALYSIS_CHUNK = 1 << 16
+
+# Boards converted from 'board_words' to an array at a time when consuming a stream
+STREAM_BATCH = 4096
+
+# Highest count kept by the per-board histograms, larger counts are added to the last bin
+HISTOGRAM_BINS = 16
+
+# Where the board streams come from
+SOURCES = ('new_board', 'new_valid_board', 'batch')
+
+# Fill color of the highest value of every heatmap
+HEATMAP_COLORS = {
+    'desert': '#C08A2C',
+    'red': '#B20909',
+    'wheat': '#ECCF1B',
+    'wood': '#1A4D00',
+    'sheep': '#5FA81F',
+    'brick': '#BA0B0B',
+    'ore': '#606060',
+}
+
+def port_hexes(mode):
+    """
+    Finds the hex every port sits on.
+
+    Port circles come in pairs on the two corners of a coastal side, and the hex touching both corners is the
+    one the port belongs to.
+
+    Parameters:
+    - mode (str): The game mode.
+
+    Returns:
+    - list of tuples: (hex index, port type) of every port, the type being "3:1" or a resource name.
+    """
+    topology = get_topology(mode)
+    vertex_of = {coords: vertex for vertex, coords in enumerate(topology.vertex_coords)}
+    port_types = {color: label if label == '3:1' else label.lower() for label, color in LEGEND_ITEMS.items()}
+    ports, colors = BOARD_DATA[mode]['ports'], BOARD_DATA[mode]['colors']
+
+    found = []
+    for index in range(0, len(ports) - 1, 2):
+        corners = [vertex_of.get((round(2 * col), round(3 * row))) for row, col in ports[index:index + 2]]
+        if None in corners:
+            continue
+        shared = set(topology.vertex_hexes[corners[0]]) & set(topology.vertex_hexes[corners[1]])
+        if len(shared) == 1:
+            found.append((shared.pop(), port_types.get(colors[index], colors[index])))
+    return found
+
+class BoardStats:
+    """
+    Constant-memory aggregates over any number of boards of one mode.
+
+    Everything is a count, so two instances built from different boards add up to the instance of all of them:
+    workers tally their own share and the results are merged in any order.
+
+    Attributes:
+    - mode (str): The game mode.
+    - boards (int): The number of boards tallied.
+    - resources (ndarray of int64): Shape (hexes, 6), how often every resource sat on every hex.
+    - numbers (ndarray of int64): Shape (hexes, 13), how often every number sat on every hex.
+    - red_pairs (ndarray of int64): Shape (HISTOGRAM_BINS,), boards by the number of neighbouring 6/8 pairs.
+    - matching_ports (ndarray of int64): Shape (HISTOGRAM_BINS,), boards by the number of 2:1 ports sitting on a
+      hex of their own resource.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        topology = get_topology(mode)
+        self.boards = 0
+        self.resources = np.zeros((topology.hex_count, len(RESOURCE_NAMES)), dtype=np.int64)
+        self.numbers = np.zeros((topology.hex_count, 13), dtype=np.int64)
+        self.red_pairs = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+        self.matching_ports = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+
+        # The layout is fixed, so its neighbour pairs and 2:1 ports are looked up once rather than per batch
+        self._edges = np.array(topology.edges, dtype=np.intp).reshape(-1, 2)
+        self._port_resources = [(hex_index, RESOURCE_NAMES.index(port_type))
+                                for hex_index, port_type in port_hexes(mode) if port_type in RESOURCE_NAMES]
+
+    def update(self, boards):
+        """
+        Tallies a batch of boards.
+
+        Parameters:
+        - boards (ndarray of uint8): Shape (n, 2, hexes), as returned by generate_batch.
+        """
+        n, _, hex_count = boards.shape
+        resources, tokens = boards[:, RESOURCES], boards[:, TOKENS]
+
+        # Offset every hex's values into its own block of bins, so one bincount fills the whole table
+        offsets = np.arange(hex_count, dtype=np.intp)
+        self.resources += np.bincount((offsets * len(RESOURCE_NAMES) + resources).ravel(),
+                                      minlength=self.resources.size).reshape(self.resources.shape)
+        self.numbers += np.bincount((offsets * 13 + tokens).ravel(),
+                                    minlength=self.numbers.size).reshape(self.numbers.shape)
+
+        red = np.isin(tokens, RED_NUMBERS)
+        pairs = (red[:, self._edges[:, 0]] & red[:, self._edges[:, 1]]).sum(axis=1)
+        self.red_pairs += np.bincount(np.minimum(pairs, HISTOGRAM_BINS - 1), minlength=HISTOGRAM_BINS)
+
+        matching = np.zeros(n, dtype=np.intp)
+        for hex_index, resource_id in self._port_resources:
+            matching += resources[:, hex_index] == resource_id
+        self.matching_ports += np.bincount(np.minimum(matching, HISTOGRAM_BINS - 1), minlength=HISTOGRAM_BINS)
+        self.boards += n
+
+    def consume(self, board_stream, batch=STREAM_BATCH):
+        """
+        Tallies boards from a stream in 'board_words' format, such as iter_boards or repeated new_board calls.
+
+        Only 'batch' boards are held at a time, so the stream may be endless in principle.
+
+        Parameters:
+        - board_stream (iterable): Tuples whose first entry is 'board_words', like (board_words, ports, colors).
+        - batch (int): The number of boards converted and tallied at once.
+
+        Returns:
+        - BoardStats: This instance, for chaining.
+        """
+        pending = []
+        for item in board_stream:
+            pending.append(item[0])
+            if len(pending) == batch:
+                self.update(words_to_batch(pending))
+                pending.clear()
+        if pending:
+            self.update(words_to_batch(pending))
+        return self
+
+    def merge(self, other):
+        """
+        Adds the counts of another instance of the same mode.
+
+        Parameters:
+        - other (BoardStats): The counts to add.
+
+        Returns:
+        - BoardStats: This instance, for chaining.
+
+        Raises:
+        - ValueError: If the modes differ.
+        """
+        if other.mode != self.mode:
+            raise ValueError(f"Cannot merge {other.mode} counts into {self.mode} counts")
+        self.boards += other.boards
+        self.resources += other.resources
+        self.numbers += other.numbers
+        self.red_pairs += other.red_pairs
+        self.matching_ports += other.matching_ports
+        return self
+
+    def heatmaps(self):
+        """
+        Returns:
+        - dict: Name -> share of boards per hex: 'desert', 'red' (a 6 or an 8) and every resource.
+        """
+        shares = self.resources / max(self.boards, 1)
+        maps = {'desert': shares[:, 0],
+                'red': self.numbers[:, list(RED_NUMBERS)].sum(axis=1) / max(self.boards, 1)}
+        for resource_id, resource in enumerate(RESOURCE_NAMES[1:], start=1):
+            maps[resource] = shares[:, resource_id]
+        return maps
+
+    def uniformity(self):
+        """
+        Tests whether the tiles and numbers are spread as an unbiased shuffle spreads them.
+
+        An unbiased shuffle puts every tile on every hex equally often, and every number on every numbered hex
+        equally often. The counts are checked against these expectations with Pearson's chi-square test. Boards
+        from new_board should pass both tests; the 6 and 8 rule of the valid generators moves the reds, and with
+        them the deserts, away from the middle on purpose.
+
+        Returns:
+        - dict: For 'resources' and 'numbers', the 'chi2' statistic, the degrees of freedom 'df', an approximate
+          'p_value', and the largest standardized residual 'max_residual' with its 'hex' and 'value'.
+        """
+        results = {}
+        tables = {
+            'resources': (self.resources, RESOURCE_NAMES),
+            'numbers': (self.numbers[:, 1:], list(range(1, 13))),
+        }
+        for name, (observed, labels) in tables.items():
+            # Tiles and numbers are fixed pools, so every row and column total is fixed and the test is one of
+            # independence between the hex and what lies on it
+            used = observed.sum(axis=0) > 0
+            observed = observed[:, used]
+            expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / max(observed.sum(), 1)
+            rows = expected.sum(axis=1) > 0
+            observed, expected = observed[rows], expected[rows]
+            residuals = (observed - expected) / np.sqrt(np.where(expected > 0, expected, 1))
+            chi2 = float((residuals ** 2).sum())
+            df = max((observed.shape[0] - 1) * (observed.shape[1] - 1), 1)
+            worst = np.unravel_index(np.abs(residuals).argmax(), residuals.shape) if residuals.size else (0, 0)
+            results[name] = {
+                'chi2': chi2,
+                'df': df,
+                'p_value': chi2_tail(chi2, df),
+                'max_residual': float(residuals[worst]) if residuals.size else 0.0,
+                'hex': int(np.flatnonzero(rows)[worst[0]]) if residuals.size else None,
+                'value': str(np.array(labels)[used][worst[1]]) if residuals.size else None,
+            }
+        return results
+
+    def report(self):
+        """
+        Returns:
+        - dict: A JSON-ready summary: per hex shares of every resource and number, the desert histogram, the 6/8
+          heatmap, per port shares of the resources and numbers on its hex, the per-board histograms and the
+          uniformity tests.
+        """
+        boards = max(self.boards, 1)
+        topology = get_topology(self.mode)
+        hexes = []
+        for hex_index, (row, col) in enumerate(topology.row_col):
+            hexes.append({
+                'hex': [row, col],
+                'resources': {name: self.resources[hex_index, resource_id] / boards
+                              for resource_id, name in enumerate(RESOURCE_NAMES)},
+                'numbers': {str(number): self.numbers[hex_index, number] / boards for number in range(2, 13)
+                            if number != 7},
+            })
+        ports = []
+        for hex_index, port_type in port_hexes(self.mode):
+            pips = sum(self.numbers[hex_index, number] * (6 - abs(7 - number)) for number in range(2, 13))
+            ports.append({
+                'hex': list(topology.row_col[hex_index]),
+                'type': port_type,
+                'resources': {name: self.resources[hex_index, resource_id] / boards
+                              for resource_id, name in enumerate(RESOURCE_NAMES)},
+                'mean_pips': pips / boards,
+            })
+        return {
+            'mode': self.mode,
+            'boards': self.boards,
+            'hexes': hexes,
+            'desert_histogram': self.resources[:, 0].tolist(),
+            'red_heatmap': (self.numbers[:, list(RED_NUMBERS)].sum(axis=1) / boards).tolist(),
+            'ports': ports,
+            'red_neighbour_pairs': self.red_pairs.tolist(),
+            'matching_ports': self.matching_ports.tolist(),
+            'uniformity': self.uniformity(),
+        }
+
+def chi2_tail(chi2, df):
+    """
+    Approximates the chance that a chi-square variable exceeds 'chi2', with the Wilson-Hilferty transform.
+
+    Parameters:
+    - chi2 (float): The statistic.
+    - df (int): The degrees of freedom.
+
+    Returns:
+    - float: The upper tail probability.
+    """
+    scale = 2 / (9 * df)
+    z = ((chi2 / df) ** (1 / 3) - (1 - scale)) / math.sqrt(scale)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def _analyse_chunk(mode, source, count, seed):
+    """
+    Worker task: generates and tallies one chunk of boards.
+
+    Parameters:
+    - mode (str): The game mode.
+    - source (str): One of SOURCES.
+    - count (int): The number of boards.
+    - seed (numpy.random.SeedSequence): The chunk's own random stream.
+
+    Returns:
+    - BoardStats: The counts of the chunk.
+    """
+    stats = BoardStats(mode)
+    if source == 'batch':
+        stats.update(generate_batch(mode, count, seed))
+    else:
+        generate = new_board if source == 'new_board' else new_valid_board
+        rng = random.Random(int(seed.generate_state(2, np.uint64)[0]))
+        stats.consume(generate(mode, rng) for _ in range(count))
+    return stats
+
+def analyse(mode, count, source='new_board', seed=None, workers=None, chunk=ANALYSIS_CHUNK):
+    """
+    Tallies 'count' freshly generated boards, spread over several processes.
+
+    Boards are generated and tallied inside the workers and only the counts travel back, so memory use does not
+    grow with 'count'. Every chunk has its own random stream spawned from the master seed, so the result is the
+    same for any number of workers.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - count (int): The number of boards.
+    - source (str): 'new_board' for the plain shuffle, 'new_valid_board' for boards passing the 6 and 8 rule,
+      or 'batch' for the NumPy generator of catan_batch.
+    - seed (int or numpy.random.SeedSequence, optional): The master seed.
+    - workers (int, optional): The number of worker processes. Defaults to the number of available cores.
+    - chunk (int): The number of boards per task.
+
+    Returns:
+    - BoardStats: The counts of every board.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source {source!r}, expected one of {SOURCES}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    starts = range(0, count, chunk)
+    tasks = zip(starts, seed_sequence.spawn(len(starts)))
+
+    stats = BoardStats(mode)
+    # A single worker needs no pool
+    if workers == 1:
+        for start, chunk_seed in tasks:
+            stats.merge(_analyse_chunk(mode, source, min(chunk, count - start), chunk_seed))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_analyse_chunk, mode, source, min(chunk, count - start), chunk_seed)
+                   for start, chunk_seed in tasks]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
+
+def _blend(color, share):
+    """
+    Parameters:
+    - color (str): A '#RRGGBB' color.
+    - share (float): How far from white towards 'color', from 0 to 1.
+
+    Returns:
+    - tuple of int: The blended RGB color.
+    """
+    rgb = [int(color[index:index + 2], 16) for index in (1, 3, 5)]
+    return tuple(round(255 + (channel - 255) * min(max(share, 0.0), 1.0)) for channel in rgb)
+
+def heatmap_image(values, mode, title, color, hex_size=HEX_SIZE):
+    """
+    Draws one value per hex on the board outline, with the same hex positions as draw_board_gui.
+
+    Hexes are shaded from white at the lowest value to 'color' at the highest and labelled with the value as a
+    percentage.
+
+    Parameters:
+    - values (sequence of float): One share per hex, in reading order.
+    - mode (str): The game mode, which gives the layout.
+    - title (str): Drawn above the legend.
+    - color (str): The '#RRGGBB' color of the highest value.
+    - hex_size (int): The radius of the hexagons.
+
+    Returns:
+    - Image: The heatmap in RGB mode.
+    """
+    frame = board_frame(tuple(BOARD_DATA[mode]['row_lengths']), hex_size)
+    image = Image.new('RGB', (frame['width'], frame['height']), 'white')
+    draw = ImageDraw.Draw(image)
+    font, title_font = load_font(13), load_font(18)
+
+    values = np.asarray(values, dtype=float)
+    low, high = float(values.min()), float(values.max())
+    spread = high - low or 1.0
+    for value, (x, y) in zip(values, frame['centers']):
+        draw.polygon(hex_corners(x, y, hex_size), fill=_blend(color, (value - low) / spread), outline='black', width=2)
+        draw.text((x, y), f"{value:.2%}", fill='black', font=font, anchor='mm')
+
+    draw.text((20, 20), title, fill='black', font=title_font)
+    draw.text((20, 50), f"min {low:.3%}  max {high:.3%}", fill='black', font=font)
+    return image
+
+def write_report(stats, out_dir):
+    """
+    Writes the JSON report and one heatmap image per entry of BoardStats.heatmaps.
+
+    Parameters:
+    - stats (BoardStats): The counts.
+    - out_dir (str): The output directory, created if needed.
+
+    Returns:
+    - list of str: The paths written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = [os.path.join(out_dir, 'report.json')]
+    with open(paths[0], 'w') as report_file:
+        json.dump(stats.report(), report_file, indent=1)
+    for name, values in stats.heatmaps().items():
+        title = f"{stats.mode}: {'6 or 8' if name == 'red' else name} share per hex, {stats.boards:,} boards"
+        paths.append(os.path.join(out_dir, f"heatmap-{name}.png"))
+        heatmap_image(values, stats.mode, title, HEATMAP_COLORS[name]).save(paths[-1])
+    return paths
+
+def main(argv=None):
+    """
+    Command line entry point: tallies N boards and writes the report and heatmaps.
+
+    Parameters:
+    - argv (list of str, optional): The command line arguments. Defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Check the distribution of generated Catan boards.")
+    parser.add_argument('-n', '--count', type=int, default=1_000_000, help="number of boards to tally")
+    parser.add_argument('-m', '--mode', choices=MODES, default='Regular', help="board layout")
+    parser.add_argument('--source', choices=SOURCES, default='new_board', help="generator the boards come from")
+    parser.add_argument('-s', '--seed', type=int, default=None, help="master seed for reproducible output")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes")
+    parser.add_argument('-o', '--output', default='analytics', help="output directory")
+    args = parser.parse_args(argv)
+
+    stats = analyse(args.mode, args.count, args.source, args.seed, args.workers)
+    for path in write_report(stats, args.output):
+        print(path)
+    for name, test in stats.uniformity().items():
+        print(f"{name}: chi2 {test['chi2']:.1f} on {test['df']} df, p = {test['p_value']:.3g}, "
+              f"largest residual {test['max_residual']:+.2f} ({test['value']} on hex {test['hex']})")
+
+if __name__ == "__main__":
+    main()
@@ -2,197 +2,413 @@
 ###     By Ari Asarch      ###
 
 # Import Necessary Packages
-import math # Math library for mathematical functions
-import random # Library for generating random numbers and choices
+import ctypes # Declares the process DPI aware on Windows
+import os # File system access to check for the tile images
+import queue # Hands opening search results from the worker thread to the Tk thread
+import sys # Platform check for the DPI setup
+import threading # Runs the opening search and the tile warmup off the Tk main thread
 import tkinter as tk # GUI library for creating graphical interfaces
-from PIL import Image, ImageDraw, ImageTk
+from PIL import ImageTk
 from tkinter import Canvas, Radiobutton, StringVar, Label # Imports Specific Widgets like Windows and Buttons
+from catan_core import MODES, new_valid_board # Headless board generation engine
+from catan_prefetch import BoardPrefetcher # Background queue of ready boards
+from catan_geometry import (HEX_SIZE, CANVAS_WIDTH, CANVAS_HEIGHT, NUMBER_RADIUS, PORT_RADIUS, LEGEND_RADIUS,
+                            board_size, hex_center, hex_corners, port_position, vertex_position,
+                            legend_positions) # Shared board geometry
+from functools import lru_cache # Bounded cache of the scaled tile images
+from catan_tiles import IMAGE_PATHS, load_tile, scaled_tile, warm_pyramids # Cached tile image preparation
+import catan_stats # Hot path timings shown in the status panel
+from catan_codes import encode_board, decode_board, code_mode, code_to_text, text_to_code # Shareable board codes
+from catan_openings import PLAYER_COLORS, solve_openings # Opening settlement search for the overlay
+
+# The fairness score needs NumPy, which is optional for the GUI
+try:
+    from catan_score import score_board
+except ImportError:
+    score_board = None
 
 # Initialize Variables
 reg_or_exp = "Regular" # Default to a regular Catan board layout
-root = tk.Tk() # Create the main window instance
-root.title("Catan Board Randomizer") # Set the title of the window
+root = None # The main window instance, created by create_window()
+canvas = None # The drawing canvas, created by create_window()
+prefetcher = None # Background board queue, started by start_gui()
+score_label = None # Label showing the fairness score of the current board, created by initialize_gui()
+stats_label = None # Status panel with the generation and drawing timings, created by initialize_gui() if enabled
+code_entry = None # Input box holding the code of the current board, created by initialize_gui()
+boards_drawn = 0 # Number of boards drawn since the window opened
+current_board = None # The (board_words, ports, colors) on the canvas, set by show_board()
 
-# Set up the drawing canvas within the main window
-canvas = Canvas(root, width=1000, height=700, bg='white')
+# Opening overlay settings: players in the snake draft and seconds the search may take per board
+opening_players = 4
+opening_budget = 0.3
 
-# Assuming the canvas is already created, you set its position with grid.
-canvas.grid(row=2, column=0, columnspan=2, sticky="nsew")
+# Number of opening searches started, so the overlay only draws the result of the latest one
+opening_request = 0
 
-# Configure the grid rows and columns to allocate space for the canvas.
-root.grid_rowconfigure(2, weight=1)
-root.grid_columnconfigure(0, weight=1)
+# Finished opening searches waiting for the Tk thread, and milliseconds between checks of the queue
+opening_results = queue.Queue()
+opening_poll_interval = 50
 
-# Set Hex Size
-hex_size = 50 
+# Time the generation and drawing phases and show them in a status panel, also turned on by --stats
+show_stats = False
 
-# Function to create a hexagonal mask
-def create_hexagonal_mask(image_size, hex_size):
-    """
-    Creates a hexagonal mask for an image.
+# Milliseconds between refreshes of the status panel, which also picks up the prefetch thread's timings
+stats_interval = 1000
 
-    This function generates a hexagonal mask to be applied to an image for creating a hexagonal crop. 
-    It first initializes a mask with the same dimensions as the target image but filled with zeros (transparent).
-    Then, it calculates the vertices of a hexagon based on the specified hexagon size and the center of the image. 
-    Using these vertices, the function draws a filled hexagon on the mask with white color (255), 
-    which represents the area to keep when the mask is applied to an image.
+# Prefetch settings: boards kept ready per mode, and seconds the worker rests after each board
+prefetch_depth = 4
+prefetch_interval = 0.0
 
-    Parameters:
-    - image_size (tuple of int): The dimensions (width, height) of the image for which the mask is created.
-    - hex_size (int): The radius of the hexagon, defined from the center to any vertex.
+# Screen pixels per layout pixel: the DPI scale of the screen at start, then whatever fits the window
+dpi_scale = 1.0
+view_scale = 1.0
 
-    Returns:
-    - hex_mask (Image): An image object representing the mask with a white hexagon on a transparent background.
+# Milliseconds the window size must stay put before the board is rescaled, and the pending rescale
+resize_delay = 150
+resize_job = None
+
+# Smallest relative change of the scale worth redrawing the board for
+resize_tolerance = 0.01
 
+def create_window():
     """
+    Creates the main window and the drawing canvas.
 
-    # Calculate the center of the image
-    w, h = image_size
-    x_center, y_center = w / 2, h / 2
+    The window is only built when the GUI actually starts so that importing this module does not need a display.
 
-    hex_mask = Image.new('L', image_size, 0)
-    hex_draw = ImageDraw.Draw(hex_mask)
+    Globals:
+    - root (Tk): Set to the main window instance.
+    - canvas (Canvas): Set to the drawing canvas placed within the main window.
+    """
+    global root, canvas, dpi_scale, view_scale
 
-    points = []
-    # Calculate the vertices of the hexagon
-    for i in range(6):
-        angle_deg = (60 * i) + 30 # Calculate the angle for each vertex in degrees
-        angle_rad = math.pi / 180 * angle_deg  # Converts the degree to radians
-        x = x_center + hex_size * math.cos(angle_rad)  # Calculate the x-coordinate of the vertex
-        y = y_center + hex_size * math.sin(angle_rad)  # Calculate the y-coordinate of the vertex
-        points.append((x, y))
+    # Ask Windows for real pixels, otherwise it stretches the whole window as a blurry bitmap on high DPI screens
+    if sys.platform == 'win32':
+        try:
+            ctypes.windll.shcore.SetProcessDpiAwareness(1)
+        except (AttributeError, OSError):
+            pass
 
-    # Draw the hexagon on the mask
-    hex_draw.polygon(points, fill=255, outline=0)
-    return hex_mask
+    root = tk.Tk() # Create the main window instance
+    root.title("Catan Board Randomizer") # Set the title of the window
 
-# Function to apply the hexagonal mask to an image
-def apply_hex_mask(image, mask):
+    # Start the board at the physical size it has on a 96 DPI screen
+    dpi_scale = view_scale = max(1.0, root.winfo_fpixels('1i') / 96)
 
-    """
-    Applies a hexagonal mask to an image.
+    # Set up the drawing canvas within the main window
+    canvas = Canvas(root, width=round(CANVAS_WIDTH * view_scale), height=round(CANVAS_HEIGHT * view_scale),
+                    bg='white', highlightthickness=0)
 
-    This function overlays a hexagonal mask onto an image to create a hexagonal crop effect. 
-    The mask determines which parts of the original image are visible in the final result, 
-    with the rest becoming transparent. The function uses the `Image.composite` method to apply this mask, 
-    which combines the original image with a fully transparent image (same size as the mask), 
-    using the mask to control the blending.
+    # Assuming the canvas is already created, you set its position with grid.
+    canvas.grid(row=2, column=0, columnspan=2, sticky="nsew")
 
-    Parameters:
-    - image (Image): The original image to which the hexagonal mask will be applied.
-    - mask (Image): The hexagonal mask image, where the white area represents the portion of the original image to retain.
+    # Configure the grid rows and columns to allocate space for the canvas.
+    root.grid_rowconfigure(2, weight=1)
+    root.grid_columnconfigure(0, weight=1)
 
-    Returns:
-    - Image: A new image with the hexagonal mask applied, where the area outside the hexagon is transparent.
-    """
+    # Scale the board to the canvas whenever the window is resized
+    canvas.bind('<Configure>', schedule_resize)
 
-    return Image.composite(image, Image.new('RGBA', mask.size, (0, 0, 0, 0)), mask)
-
-# The dictionary to hold the PhotoImage objects
-photo_images = {}
+# Set Hex Size, in layout pixels before 'view_scale' is applied
+hex_size = HEX_SIZE
 
 # Paths to  image files
-image_paths = {
-    'desert': 'desert.png',
-    'wheat': 'wheat.png',
-    'wood': 'wood.png',
-    'sheep': 'sheep.png',
-    'brick': 'brick.png',
-    'ore': 'ore.png',
-}
-
-# Set Image Size, should be much larger than the mask
-required_width = 4 * hex_size
-required_height = 2 * (int(math.sqrt(3) * hex_size))
+image_paths = dict(IMAGE_PATHS)
 
 # Define the global variable at the top level of your script
 show_ports = False  # This assumes ports are not shown by default
+show_openings = False # The best opening settlements are not shown by default
+
+@lru_cache(maxsize=48)
+def scaled_photo_image(resource, tile_hex_size):
+    """
+    Returns the PhotoImage of a resource tile at one hex size, keeping the 48 most recently used.
 
-# Load images, resize them, apply hexagonal mask, and convert them to a format Tkinter canvas can use
-for resource, path in image_paths.items():
-    # Open the image using PIL
-    original_image = Image.open(path)
-    
-    # Resize the image using PIL's resize method
-    resized_image = original_image.resize((required_width, required_height), Image.Resampling.LANCZOS)
-    
-    # Create hexagonal mask with the same size as the resized image
-    hex_mask = create_hexagonal_mask(resized_image.size, hex_size)
-    
-    # Apply the hexagonal mask
-    hex_image = apply_hex_mask(resized_image, hex_mask)
-    
-    # Convert the PIL image to a PhotoImage and store it in the dictionary
-    photo_images[resource] = ImageTk.PhotoImage(hex_image)
-
-def is_valid_board(board):
-    """
-    Validates the board configuration for a game which follows the rule that tiles numbered '6' or '8' 
-    must not be adjacent to each other on a hexagonal grid. This function iterates through each tile in a 2D list 
-    representing the game board and checks the six surrounding tiles for any '6' or '8' tiles, 
-    considering the offset nature of the hexagonal grid rows.
+    Tiles of the default size come from the on-disk tile cache, so only the first launch after a source image
+    changes pays for resizing and masking. Other sizes are resized from the in-memory pyramid of the source
+    image. The six tiles on the canvas are always the most recently used ones, so they are never evicted while
+    shown. Must be called after create_window() since PhotoImage needs a running Tk instance.
 
     Parameters:
-    - board (list of lists of str): A 2D list representing the game board, where each inner list is a row 
-      of tiles on the board, and each tile is represented by a string with the format "resource-number".
+    - resource (str): The resource name, such as "ore".
+    - tile_hex_size (int): The radius of the hexagon in screen pixels.
 
     Returns:
-    - bool: True if the board configuration is valid, meaning no '6' or '8' tiles are adjacent; 
-      False otherwise.
+    - PhotoImage or None: The tile image, or None if the resource has no image file.
     """
+    path = image_paths.get(resource)
+    if path is None or not os.path.exists(path):
+        return None
+    if tile_hex_size == HEX_SIZE:
+        return ImageTk.PhotoImage(load_tile(resource, path, tile_hex_size))
+    return ImageTk.PhotoImage(scaled_tile(path, tile_hex_size))
+
+def get_photo_image(resource):
+    """
+    Parameters:
+    - resource (str): The resource name, such as "ore".
+
+    Returns:
+    - PhotoImage or None: The tile image for the current 'view_scale', see scaled_photo_image.
+    """
+    return scaled_photo_image(resource, max(1, round(hex_size * view_scale)))
+
+def scaled_font(size, *style):
+    """
+    Parameters:
+    - size (int): The font size in points at the start scale.
+    - style (str): Font styles such as "bold".
 
-    # Initialize is_valid to True
-    is_valid = True
+    Returns:
+    - tuple: A Tk font description scaled with the board. Tk already applies the screen DPI to point sizes,
+      so only the scaling beyond 'dpi_scale' is added.
+    """
+    return ("Arial", max(1, round(size * view_scale / dpi_scale))) + style
 
-    # Go through each cell in the 2D board list.
-    for i in range(len(board)):
-        for j in range(len(board[i])):
-            current_tile = board[i][j]
+def schedule_resize(event):
+    """
+    Handles a <Configure> event of the canvas by (re)starting the timer of the rescale.
+
+    Dragging a window edge sends a stream of events; only the last one of a burst leads to a rescale, once the
+    size has been steady for 'resize_delay' milliseconds.
+
+    Parameters:
+    - event (Event): The Tk event, holding the new canvas width and height.
 
-            # Check if current tile is either 6 or 8
-            if '-6' in current_tile or '-8' in current_tile:
-                # Define neighbors based on column (even or odd)
-                neighbors = [
-                    (-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1)
-                ] if j % 2 == 0 else [
-                    (-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0)
-                ]
+    Globals:
+    - resize_job (str): The id of the pending after() call.
+    """
+    global resize_job
+    if resize_job is not None:
+        root.after_cancel(resize_job)
+    resize_job = root.after(resize_delay, apply_resize, event.width, event.height)
 
-                # Check all neighboring tiles
-                for x, y in neighbors:
-                    new_i, new_j = i + x, j + y
+def apply_resize(width, height):
+    """
+    Scales the board to fill a canvas of the given size.
 
-                    # Ensure new indices are within the board boundaries
-                    if 0 <= new_i < len(board) and 0 <= new_j < len(board[new_i]):
-                        neighboring_tile = board[new_i][new_j]
+    Every item is moved with a single canvas.scale call; the tiles are swapped for images of the new size and
+    the fonts are scaled, so nothing is rebuilt.
 
-                        # Check if neighboring tile has a number (6 or 8)
-                        if '-6' in neighboring_tile or '-8' in neighboring_tile:
-                            is_valid = False
-                            return is_valid  # Invalid adjacency found, return immediately
+    Parameters:
+    - width (int): The canvas width in screen pixels.
+    - height (int): The canvas height in screen pixels.
 
-    # If no invalid adjacencies are found, the board is valid
-    return is_valid
+    Globals:
+    - view_scale (float): Set to the scale at which the board fits the canvas.
+    - resize_job (str): Cleared.
+    """
+    global view_scale, resize_job
+    resize_job = None
+    row_lengths = board_items['layout'][0] if board_items['layout'] else ()
+    layout_width, layout_height = board_size(row_lengths, hex_size) if row_lengths else (CANVAS_WIDTH, CANVAS_HEIGHT)
+    scale = max(0.2, min(width / layout_width, height / layout_height))
+    if abs(scale / view_scale - 1) < resize_tolerance:
+        return
+
+    canvas.scale('all', 0, 0, scale / view_scale, scale / view_scale)
+    view_scale = scale
+    if current_board is not None:
+        draw_board_gui(*current_board) # Swap in the tiles of the new size
+    for items in board_items['hexes']:
+        canvas.itemconfigure(items['number'], font=scaled_font(16, 'bold'))
+    for item in board_items['legend'][1::2]:
+        canvas.itemconfigure(item, font=scaled_font(9))
+    for item in canvas.find_withtag('openings'):
+        if canvas.type(item) == 'text':
+            canvas.itemconfigure(item, font=scaled_font(10, 'bold'))
 
 def generate_and_draw_new_board():
     """
     Generates a new Catan board and draws it on a canvas.
 
-    This function loops indefinitely until a valid board is generated according to the rules.
-    It clears the previous drawing on the canvas, generates a new random board configuration, draws it, and checks for validity.
-    If the board is valid, it exits the loop, leaving the valid board displayed on the canvas.
+    The board is taken from the background prefetch queue, which holds boards already built by new_valid_board,
+    so the click returns without generating anything on the Tk main thread.
+    The existing canvas items are updated in place with the new board configuration by show_board.
     """
-    while True:         
-        canvas.delete("all")  # Clear the canvas of any previous drawings or elements.
-        board_words, ports, colors = new_board()  # Generate a new board layout
+    board_words, ports, colors = prefetcher.get(reg_or_exp)  # Take a ready board for the selected mode
+    show_board(board_words, ports, colors)
 
-        # Check if the newly generated board is valid
-        if is_valid_board(board_words):
-            print("Valid board generated.")
-            break  # Exit the loop if the board is valid
+def show_board(board_words, ports, colors):
+    """
+    Draws a board and updates its fairness score, its code in the input box and the status panel.
+
+    Parameters:
+    - board_words (list of lists of str): The board in text format.
+    - ports (list of tuples): The port locations.
+    - colors (list of str): The port colors.
+
+    Globals:
+    - boards_drawn (int): Incremented for every board drawn.
+    - current_board (tuple): Set to the board drawn.
+    """
+    global boards_drawn, current_board
 
     draw_board_gui(board_words, ports, colors)  # Draw the new board
-    print(f'Valid Board {board_words}')
+    boards_drawn += 1
+    current_board = (board_words, ports, colors)
+    draw_openings()
+
+    # Show how fair the new board is
+    if score_board is not None:
+        score_label.config(text=f"Fairness Score: {score_board(board_words, reg_or_exp):.1f}")
+
+    # Show the code that rebuilds this board
+    code_entry.delete(0, 'end')
+    code_entry.insert(0, code_to_text(encode_board(board_words)))
+    update_stats_panel()
+
+def update_stats_panel():
+    """
+    Shows the number of boards drawn and the recorded timings of the generation and drawing phases, if the
+    status panel is shown.
+    """
+    if stats_label is None:
+        return
+    lines = [f"{reg_or_exp} boards drawn: {boards_drawn}"] + catan_stats.summary_lines()
+    stats_label.config(text="\n".join(lines))
+
+def refresh_stats_panel():
+    """
+    Refreshes the status panel every 'stats_interval' milliseconds while the window is open.
+    """
+    update_stats_panel()
+    root.after(stats_interval, refresh_stats_panel)
+
+# Canvas item IDs of the current layout, created once by build_board_items and updated in place afterwards
+board_items = {
+    'layout': None, # The (row lengths, ports) the items were built for
+    'hexes': [], # One dict of item IDs per hex, in reading order
+    'ports': [], # Port circle item IDs
+    'legend': [], # Legend circle and text item IDs
+}
+
+def build_board_items(board, ports, colors):
+    """
+    Creates every canvas item for a board layout once.
+
+    Each hex gets an image, a border polygon, a number circle and a number text; the port circles and the legend
+    are created once as well and hidden while ports are turned off. Later boards with the same layout only
+    update these items, so the canvas item count stays flat.
+
+    Parameters:
+    - board (list of lists of str): A board of the layout, only its shape is used.
+    - ports (list of tuples): A list where each tuple contains the row and column indices where a port should be drawn.
+    - colors (list of str): A list of color strings to use for the ports.
+
+    Globals:
+    - board_items (dict): Replaced with the IDs of the new items.
+    """
+    row_lengths = [len(row) for row in board]
+    circle_radius = NUMBER_RADIUS # Radius of the tan number circles
+
+    canvas.delete("all")  # Clear the items of the previous layout
+    width, height = board_size(row_lengths, hex_size)
+    # Grow the canvas for layouts larger than the default area
+    canvas.config(width=round(width * view_scale), height=round(height * view_scale))
+    hexes = []
+    for row_index, row in enumerate(board):
+        for col_index in range(len(row)):
+            x, y = hex_center(row_index, col_index, row_lengths, hex_size)
+
+            # Calculate the vertices of the hexagon for the outline
+            points = hex_corners(x, y, hex_size)
+
+            hexes.append({
+                'image': canvas.create_image(x, y, anchor='center'),
+                'border': canvas.create_polygon(points, outline='black', fill='', width=2),
+                'circle': canvas.create_oval(x - circle_radius, y - circle_radius,
+                                             x + circle_radius, y + circle_radius,
+                                             fill="#FEE0AC", outline='black'),
+                'number': canvas.create_text(x, y, font=scaled_font(16, 'bold')),
+            })
+
+    board_items['layout'] = (tuple(len(row) for row in board), tuple(ports))
+    board_items['hexes'] = hexes
+    board_items['ports'] = draw_ports(canvas, ports, colors, row_lengths)
+    board_items['legend'] = draw_legend()
+    canvas.scale('all', 0, 0, view_scale, view_scale) # Items are laid out in layout pixels
+    update_port_visibility()
+
+def draw_openings():
+    """
+    Clears the opening overlay and, if it is turned on, searches the current board's best opening settlements.
+
+    The search takes up to 'opening_budget' seconds, so it runs on a worker thread and the window stays
+    responsive. The worker only puts its result on 'opening_results', which poll_openings drains on the Tk main
+    thread, since Tk may not be called from other threads.
+
+    Globals:
+    - show_openings (bool): Whether the overlay is shown.
+    - current_board (tuple): The board the settlements are searched for.
+    - opening_request (int): Incremented for every search, so results of older boards are dropped.
+    """
+    global opening_request
+
+    canvas.delete('openings')
+    opening_request += 1
+    if not show_openings or current_board is None:
+        return
+    threading.Thread(target=search_openings, args=(opening_request, current_board, reg_or_exp),
+                     name="OpeningSearch", daemon=True).start()
+
+def search_openings(request, board, mode):
+    """
+    Runs on a worker thread: searches the openings of a board and queues the result for the Tk main thread.
+
+    Parameters:
+    - request (int): The value of 'opening_request' when the search was started.
+    - board (tuple): The (board_words, ports, colors) to search.
+    - mode (str): The game mode of the board.
+    """
+    board_words, ports, colors = board
+    result = solve_openings(board_words, ports, colors, mode, opening_players, opening_budget)
+    opening_results.put((request, board_words, result))
+
+def poll_openings():
+    """
+    Draws the finished opening searches every 'opening_poll_interval' milliseconds while the window is open.
+    """
+    while True:
+        try:
+            request, board_words, result = opening_results.get_nowait()
+        except queue.Empty:
+            break
+        place_openings(request, board_words, result)
+    root.after(opening_poll_interval, poll_openings)
+
+def place_openings(request, board_words, result):
+    """
+    Marks the opening settlements found by search_openings, unless the board or the overlay changed meanwhile.
+
+    Every settlement is a circle in its player's color holding the pick number in the snake draft. The overlay
+    items carry the 'openings' tag and are replaced whenever the board changes.
+
+    Parameters:
+    - request (int): The search the result belongs to.
+    - board_words (list of lists of str): The board that was searched.
+    - result (dict): The output of solve_openings.
+    """
+    if request != opening_request or not show_openings:
+        return
+    row_lengths = [len(row) for row in board_words]
+
+    radius = NUMBER_RADIUS * 0.8
+    for pick, (player, vertex) in enumerate(result['picks'], start=1):
+        x, y = vertex_position(vertex, row_lengths, hex_size)
+        canvas.create_oval(x - radius, y - radius, x + radius, y + radius, fill=PLAYER_COLORS[player],
+                           outline='black', width=2, tags='openings')
+        canvas.create_text(x, y, text=str(pick), font=scaled_font(10, 'bold'),
+                           fill='black' if PLAYER_COLORS[player] == '#F4F4F4' else 'white', tags='openings')
+    canvas.scale('openings', 0, 0, view_scale, view_scale)
+
+def update_port_visibility():
+    """
+    Shows or hides the port circles and the legend to match the global 'show_ports' flag.
+    """
+    state = 'normal' if show_ports else 'hidden'
+    for item in board_items['ports'] + board_items['legend']:
+        canvas.itemconfigure(item, state=state)
 
 def draw_board_gui(board, ports, colors):
     """
@@ -200,101 +416,51 @@ def draw_board_gui(board, ports, colors):
 
     This function iterates over the `board` data structure (a list of lists containing strings) and
     uses information within each cell to set the photo and number of each hexagon representing
-    resources on the game board. Hexagons are drawn on a predefined `canvas`. Images are added via 
-    the create_image, sized via the create_polygon function, and resource numbers are added on top 
-    of them. Additionally, if the global variable `show_ports` is set to True, ports are drawn using 
-    the `draw_ports` function with the specified `colors`.
+    resources on the game board. The canvas items are created once per layout by build_board_items;
+    after that only the image references, number texts and fill colours are updated with itemconfigure,
+    so a redraw costs a handful of calls per hex and creates no new items.
 
     Parameters:
-    - board (list of lists of str): A 2D list where each element is a string with the resource type and 
+    - board (list of lists of str): A 2D list where each element is a string with the resource type and
     number separated by a dash (e.g., "wheat-8").
     - ports (list of tuples): A list where each tuple contains the row and column indices where a port should be drawn.
     - colors (list of str): A list of color strings to use for the ports.
 
     Globals:
     - show_ports (bool): A flag to determine whether ports should be drawn or not.
-    - reg_or_exp (str): A string indicating the mode of the game board ("Regular" or "Expansion") that can affect coloring.
-    """
-    
-    global show_ports  # Access the global variable
-    global reg_or_exp # Access the global variable
-    hex_height = int(math.sqrt(3) * hex_size) # Height of the hexagons
-    hex_width = 2 * hex_size # Width of the hexagons
-    offset_x = 375 # Intial x offset to center board
-    offset_y = 150 # Intial y offset to center board
-    circle_radius = 5  # Radius of the ports circles
-
-    # Iterate though each row and column in board to draw and color the hexagon
-    for row_index, row in enumerate(board):
-        for col_index, cell in enumerate(row):
-
-            refactor = 0.87
-
-            # Calculate the position for each hex
-            if (row_index % 2) == 0:
-                # For even rows, no x-offset
-                x = (offset_x + (col_index * hex_width)) * refactor
-            else:
-                # For odd rows, offset x by half the width of the hexagon
-                x = (offset_x + (col_index * hex_width) + (hex_width / 2)) * refactor
-            
-            # y is calculated by the row index, offset vertically by the hex height per row
-            y = (offset_y + row_index * (hex_height)) * refactor
-
-            # Shift top, bottom, and center (if expansion) rows one hex tile over
-            if len(row) == 6:
-                x -= hex_width * refactor
-            if row_index == 0:  # Top row
-                x += hex_width * refactor
-            elif row_index == len(board) - 1:  # Bottom row
-                x += hex_width * refactor
-
-            # Extract resource type and number from the cell string.
-            resource = cell.split('-')[0]
+    """
 
-            # Calculate the vertices of the hexagon for the outline
-            points = []
-            for i in range(6):
-                angle_deg = 60 * i - 30
-                angle_rad = math.pi / 180 * angle_deg
-                point_x = x + hex_size * math.cos(angle_rad)
-                point_y = y + hex_size * math.sin(angle_rad)
-                points.append((point_x, point_y))
-
-            if resource in photo_images:
-                # Create an image object on the canvas at the calculated position
-                canvas.create_image(x, y, image=photo_images[resource], anchor='center')
-
-                # Draw the hexagon border on the canvas using the points
-                canvas.create_polygon(points, outline='black', fill='', width=2)
-
-            # If there's a number, create text on top of the image
-            if '-' in cell:
-                number = cell.split('-')[1]
-
-                # Draw the tan circle slightly larger than the text
-                circle_radius = 15 
-                canvas.create_oval(x - circle_radius, y - circle_radius,
-                                x + circle_radius, y + circle_radius,
-                                fill="#FEE0AC", outline='black')
-                
-                # Color the 6's and 8's red
-                if number in ('6', '8'):
-                    canvas.create_text(x, y, text=number, fill='#B20909', font=("Arial", 16, "bold"))
-                else:
-                    canvas.create_text(x, y, text=number, fill='black', font=("Arial", 16, "bold"))
-
-            # After drawing hexagons and numbers, check if ports should be drawn
-            if show_ports:
-                draw_ports(canvas, ports, offset_x, offset_y, hex_width, hex_height, refactor, colors)
-                draw_legend()
+    # Build the items the first time a layout is drawn
+    if board_items['layout'] != (tuple(len(row) for row in board), tuple(ports)):
+        build_board_items(board, ports, colors)
+
+    cells = [cell for row in board for cell in row]
+    for items, cell in zip(board_items['hexes'], cells):
+        # Extract resource type and number from the cell string.
+        resource, _, number = cell.partition('-')
+
+        photo_image = get_photo_image(resource)
+        canvas.itemconfigure(items['image'], image=photo_image if photo_image is not None else '')
+
+        # Show the number circle only when there's a number, coloring the 6's and 8's red
+        if number:
+            canvas.itemconfigure(items['circle'], state='normal')
+            canvas.itemconfigure(items['number'], state='normal', text=number,
+                                 fill='#B20909' if number in ('6', '8') else 'black')
+        else:
+            canvas.itemconfigure(items['circle'], state='hidden')
+            canvas.itemconfigure(items['number'], state='hidden')
+
+    # Keep the port colors in step with the board
+    for index, item in enumerate(board_items['ports']):
+        canvas.itemconfigure(item, fill=colors[index % len(colors)])
 
 def initialize_gui():
     """
     Initializes the graphical user interface (GUI) for the board game.
 
     This function sets up the initial GUI elements including a label to instruct the user to select a mode,
-    radio buttons to choose between 'Regular' or 'Expansion' game modes, a button to generate a new board based
+    radio buttons to choose one of the game modes in MODES, a button to generate a new board based
     on the selected mode, and a toggle button to show or hide ports on the game board.
 
     Upon selecting a mode, the global variable 'reg_or_exp' is updated to reflect the chosen mode,
@@ -309,7 +475,11 @@ def initialize_gui():
     Globals:
     - reg_or_exp (str): Tracks the selected game mode ('Regular' or 'Expansion').
     - show_ports (bool): Determines whether ports should be displayed on the game board.
+    - score_label (Label): Set to the label showing the fairness score of the current board.
+    - stats_label (Label): Set to the status panel showing the timings, if 'show_stats' is set.
+    - code_entry (Entry): Set to the input box holding the code of the current board.
     """
+    global score_label, stats_label, code_entry
 
     # Create a label in the GUI to prompt the user to select a game mode
     label = Label(root, text="Select Mode:")
@@ -322,12 +492,13 @@ def initialize_gui():
     def update_reg_or_exp():
         global reg_or_exp
         reg_or_exp = reg_or_exp_var.get()
+        prefetcher.retarget(reg_or_exp) # Start preparing boards for the new mode
 
-    # Create a radio button for the 'Regular' game mode
-    rb_regular = Radiobutton(root, text="Regular", variable=reg_or_exp_var, value="Regular", command=update_reg_or_exp)
-
-    # Create a radio button for the 'Expansion' game mode
-    rb_expansion = Radiobutton(root, text="Expansion", variable=reg_or_exp_var, value="Expansion", command=update_reg_or_exp)
+    # Create a radio button for every game mode, stacked in a frame so layouts added later fit as well
+    mode_frame = tk.Frame(root)
+    for mode in MODES:
+        Radiobutton(mode_frame, text=mode, variable=reg_or_exp_var, value=mode,
+                    command=update_reg_or_exp).pack(anchor='w', pady=5)
 
     # Define a function to toggle button text
     def toggle_button_text():
@@ -339,22 +510,65 @@ def initialize_gui():
         # Update the button text based on the current state of show_ports
         toggle_button.config(text='Hide Ports' if show_ports else 'Show Ports')
 
+        # Show or hide the ports of the board currently drawn
+        update_port_visibility()
+
     # Create a button that, when clicked, will generate and draw a new game board
     new_board_button = tk.Button(root, text="Generate New Board", command=generate_and_draw_new_board)
 
     # Create the toggle button
     toggle_button = tk.Button(root, text="Show Ports", command=toggle_button_text)
 
+    # Define a function to toggle the opening overlay
+    def toggle_openings():
+        global show_openings
+        show_openings = not show_openings
+        openings_button.config(text='Hide Openings' if show_openings else 'Show Openings')
+        draw_openings()
+
+    # Create the button showing the best opening settlements
+    openings_button = tk.Button(root, text="Show Openings", command=toggle_openings)
+
+    # Create a label for the fairness score of the current board
+    score_label = Label(root, text="")
+
+    # Create the input box for board codes and a button to load the board a code describes
+    code_entry = tk.Entry(root, width=32)
+
+    def load_board_from_code():
+        global reg_or_exp
+        try:
+            code = text_to_code(code_entry.get())
+            board_words, ports, colors = decode_board(code)
+        except ValueError:
+            score_label.config(text="Invalid board code")
+            return
+        # Switch to the mode of the decoded board
+        reg_or_exp = code_mode(code)
+        reg_or_exp_var.set(reg_or_exp)
+        prefetcher.retarget(reg_or_exp)
+        show_board(board_words, ports, colors)
+
+    load_code_button = tk.Button(root, text="Load Code", command=load_board_from_code)
+
+    # Create the status panel for the generation and drawing timings
+    if show_stats:
+        stats_label = Label(root, text="", justify='left', anchor='w', font=("Courier", 9))
+        stats_label.grid(row=8, column=0, columnspan=2, padx=5, pady=5, sticky='w')
+
     # Place the label below the canvas
     label.grid(row=3, column=0, columnspan=1, padx=5, pady=5, sticky='w')
+    score_label.grid(row=3, column=1, padx=5, pady=5, sticky='e')
 
     # Other GUI elements follow in subsequent rows
-    rb_regular.grid(row=4, column=0, padx=5, pady=5, sticky='w')
-    rb_expansion.grid(row=5, column=0, padx=5, pady=5, sticky='w')
+    mode_frame.grid(row=4, column=0, rowspan=2, padx=5, sticky='w')
     new_board_button.grid(row=4, column=1, padx=(5), pady=5, sticky='e')
     toggle_button.grid(row=5, column=1, padx=(5), pady=5, sticky='e')
+    code_entry.grid(row=6, column=0, padx=5, pady=5, sticky='w')
+    load_code_button.grid(row=6, column=1, padx=(5), pady=5, sticky='e')
+    openings_button.grid(row=7, column=1, padx=(5), pady=5, sticky='e')
 
-def draw_ports(canvas, ports, offset_x, offset_y, hex_width, hex_height, refactor, colors):
+def draw_ports(canvas, ports, colors, row_lengths):
     """
     Draws the port locations on the game board.
 
@@ -366,250 +580,75 @@ def draw_ports(canvas, ports, offset_x, offset_y, hex_width, hex_height, refacto
     Parameters:
     - canvas (Canvas): The Tkinter canvas object where the ports will be drawn.
     - ports (list of tuples): A list of tuples where each tuple represents the (row, column) index of a port.
-    - offset_x (int or float): The horizontal offset to align the ports with the hexes on the board.
-    - offset_y (int or float): The vertical offset to align the ports with the hexes on the board.
-    - hex_width (int or float): The width of the hexes on the board. Used to calculate port positions.
-    - hex_height (int or float): The height of the hexes on the board. Used to calculate port positions.
-    - refactor (float): A scaling factor to adjust the size of the ports relative to the board.
     - colors (list of str): A list of color names or hexadecimal color codes to fill the ports. Each color corresponds to a different type of port.
+    - row_lengths (list of int): How many tiles are in each row of the board.
+
+    Returns:
+    - list of int: The canvas item IDs of the port circles.
     """
+    items = []
     for index, port in enumerate(ports):
-        # Determine the row and column from the port tuple
-        row_index, col_index = port
-
         # Calculate the x and y position like the hexes, including the refactor
-        x = (offset_x + (col_index * hex_width)) * refactor        
-        y = (offset_y + row_index * (hex_height)) * refactor
+        x, y = port_position(port, row_lengths, hex_size)
 
-        # Circle Radius
-        circle_radius = 7.5
-        
         # Choose a color for the port from the list, cycling back to the start if there are more ports than colors
         port_color = colors[index % len(colors)]
-        
+
         # Draw a circle at the port's location with the chosen color
-        canvas.create_oval(x - circle_radius, y - circle_radius,
-                        x + circle_radius, y + circle_radius,
-                        fill = port_color, outline = 'black') 
+        items.append(canvas.create_oval(x - PORT_RADIUS, y - PORT_RADIUS,
+                                        x + PORT_RADIUS, y + PORT_RADIUS,
+                                        fill = port_color, outline = 'black'))
+    return items
 
 def draw_legend():
     """
     Draws a legend on the canvas to represent the meaning of various colors used in the game.
 
-    This function iterates through a predefined dictionary of legend items, where each key-value
-    pair represents a resource or port type and its corresponding color. It uses this information
+    This function iterates through the legend entries laid out by legend_positions, where each entry
+    represents a resource or port type and its corresponding color. It uses this information
     to draw circles of specified colors with labels on the canvas to serve as a legend for the game board.
 
-    The legend starts at a fixed y-coordinate and displays each item with a specified padding
-    in between. The colors and resource or port types are hardcoded within the function.
-    """
-
-    # Define the legend items and their corresponding colors
-    legend_items = {
-        "Wheat": "#ECCF1B",
-        "Wood": "#1A4D00",
-        "Sheep": "#97E83A",
-        "Brick": "#BA0B0B",
-        "Ore": "#A0A0A0",
-        "3:1": "Black"
-    }
-
-    # Starting Y position for the legend items
-    y_start = 100
-
-    # Set a padding between items
-    padding = 20
-
-    # Circle Radius 
-    circle_radius = 7.5
-
-    # Offset to start drawing the legend text next to the rectangles
-    offset_x = 100
-    text_offset_x = offset_x + (circle_radius * 2) + 10
-
-    for item, color in legend_items.items():
-        # # Draw the rectangle for the legend color
-        # canvas.create_rectangle(offset_x, y_start, offset_x + rect_width, y_start + rect_height, 
-        #                         fill = color, outline = 'Black')
-        
-        canvas.create_oval(offset_x - circle_radius, y_start - circle_radius,
-                            offset_x + circle_radius, y_start + circle_radius,
-                            fill = color, outline = 'black') 
+    Returns:
+    - list of int: The canvas item IDs of the legend circles and texts.
+    """
+    items = []
+    for item, color, circle_x, text_x, y in legend_positions():
+        items.append(canvas.create_oval(circle_x - LEGEND_RADIUS, y - LEGEND_RADIUS,
+                                        circle_x + LEGEND_RADIUS, y + LEGEND_RADIUS,
+                                        fill = color, outline = 'black'))
         # Draw the legend text
-        canvas.create_text(text_offset_x, y_start, 
-                           text=item, anchor='w', fill = 'Black')
-        # Move the Y position for the next item
-        y_start += (circle_radius * 2) + padding
+        items.append(canvas.create_text(text_x, y, text=item, anchor='w', fill = 'Black', font=scaled_font(9)))
+    return items
 
-def populate_tiles(tiles, row_lengths):
+def start_gui():
     """
-    Populate the board with tiles based on the specified row lengths.
-
-    Parameteres:
-    - tiles (list): A list of tile identifiers that should be randomly placed on the board.
-    - row_lengths (list): A list indicating how many tiles should be in each row.
-
-    Returns:
-    - list: A 2D list representing the board with populated tiles.
-    """
-    board = []  # Initialize an empty board
-    for row_length in row_lengths:
-        row = []  # Initialize an empty row
-        # Continue to add tiles to the current row until it reaches the specified length
-        while len(row) < row_length:
-            tile = tiles.pop()  # Remove a tile from the end of the list
-            row.append(tile)  # Add the tile to the current row
-        board.append(row)  # Add the completed row to the board
-    return board  # Return the fully populated board
-
-def translate_to_text(board_list, rows):
-    """
-    Translates a board list with numeric representations into a list of text representations.
-    
-    Each number in the board_list corresponds to a resource or tile, which is represented as a string:
-    - 0 corresponds to 'desert'
-    - 1 corresponds to 'wheat'
-    - 2 corresponds to 'wood'
-    - 3 corresponds to 'sheep'
-    - 4 corresponds to 'brick'
-    - 5 corresponds to 'ore'
-
-    The function constructs a 2D list where each numeric value from the original board_list is replaced
-    with its corresponding text representation, based on the position of the resource in the 'text_list'.
-
-    Parameters: 
-    - board_list (list of lists of int): 2D list of integers where each integer represents a specific type of resource.
-    - rows (int): Integer representing the number of rows in the board list.
-    
-    Returns: 
-    A 2D list of strings where each string represents the name of a resource.
-    """
-
-    text_list = ['desert', 'wheat', 'wood', 'sheep', 'brick', 'ore'] # Define the mapping of numbers to resource names.
-    board_text = [] # Initialize an empty list to hold the translated board text.
-    
-    # Create an empty sublist for each row in the board.
-    for i in range(rows):
-        board_text.append([]) # Begin with an empty row.
-    
-    # Go through each cell in the 2D board list.
-    for i in range(rows):
-        for j in range(len(board_list[i])):
-            # Translate the numeric representation to text and add to the board text.
-            board_text[i].append(text_list[board_list[i][j]])
-    
-    # Return the fully translated board text list.
-    return board_text
-
-def add_numbers(board, numbers_list):
-    """
-    Add numbers to each tile on the board except for the desert tiles.
+    Builds the window, starts the board prefetcher and runs the Tkinter main loop.
 
-    Parameters:
-    - board (list): A 2D list representing the board with populated tiles.
-    - numbers_list (list): A list of numbers that need to be placed on the board.
-
-    Returns:
-    - list: A 2D list representing the board with numbers added to the tiles.
-    """
-    numbers_iter = iter(numbers_list)  # Create an iterator from the numbers list
-    for row in board:
-        for index, tile in enumerate(row):
-            if tile != 'desert':  # Check if the tile is not a desert
-                # Try to get a number from the iterator and add it to the tile, if no numbers left, break the loop
-                try:
-                    number = next(numbers_iter)
-                except StopIteration:
-                    break
-                row[index] = f"{tile}-{number}"  # Concatenate the tile type and the number with a dash
-    return board  # Return the board with numbers added
-
-def new_board():
-    """
-    Generates a new board configuration with random tile and number placement. This function supports
-    creating a board for either the Regular or Expansion game mode. The game mode is determined by a 
-    variable outside the function scope; 'reg_or_exp'.
-
-    Each game mode has a predefined set of tiles (with quantities and types), numbers for the tiles,
-    lengths of each row of the board to construct the appropriate hexagonal shape, and predefined port 
-    locations with their associated colors.
-
-    The function randomizes the tiles and numbers to provide a unique board configuration each time. It
-    then calls other functions (not defined within this code snippet) to populate the board with tiles,
-    convert the tiles to a text representation, and finally, add the numbers to the board.
+    With 'show_stats' set, timing is enabled first so that the prefetcher's generator is the timed one. The tile
+    pyramids are built on a background thread meanwhile, so the first resize of the window does not build them on
+    the Tk main thread.
+    """
+    global prefetcher
+
+    if show_stats:
+        catan_stats.enable()
+    prefetcher = BoardPrefetcher(reg_or_exp, depth=prefetch_depth, refill_interval=prefetch_interval,
+                                 generator=new_valid_board)
+    prefetcher.start()
+    threading.Thread(target=warm_pyramids, args=(list(image_paths.values()),), name="TileWarmup", daemon=True).start()
+    create_window()
+    initialize_gui()
+    if show_stats:
+        refresh_stats_panel()
+    poll_openings()
+    try:
+        root.mainloop()
+    finally:
+        prefetcher.stop()
 
-    Returns:
-    - board_words (list of lists of str): A 2D list representing the board with populated tiles and 
-      assigned numbers in a text format.
-    - ports (list of tuples): A list of tuples with floating-point values representing the coordinates 
-      for the ports.
-    - colors (list of strings): A list of strings representing the colors for the ports.
-    """
-
-    # Dictionaries to hold the different data for each mode.
-    data = {
-        'Regular': {
-            'tiles': [0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 5, 5, 5],
-            'numbers_list': [2, 3, 3, 4, 4, 5, 5, 6, 6, 8, 8, 9, 9, 10, 10, 11, 11, 12],
-            'row_lengths': [3, 4, 5, 4, 3],
-            'ports': [(-0.65, 1), (-0.35, 0.5), (-0.65, 2), (-0.35, 2.5), 
-                      (0.65, 4), (0.35, 3.5), (0.65, 0), (1.35, 0), 
-                      (1.65, 4.5), (2.35, 4.5), (3.35, 0), (2.65, 0),
-                      (3.35, 4), (3.65, 3.5), (4.65, 1), (4.35, 0.5), 
-                      (4.65, 2), (4.35, 2.5)],
-            'colors': ['Black', 'Black', 
-                       '#97E83A', '#97E83A', 
-                       'Black', 'Black', 
-                       '#A0A0A0', '#A0A0A0', 
-                       'Black', 'Black',
-                       '#ECCF1B', '#ECCF1B',
-                       '#BA0B0B', '#BA0B0B',
-                       'Black', 'Black',
-                       '#1A4D00', '#1A4D00']
-        },
-        'Expansion': {
-            'tiles': [0, 0, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 5, 5, 5, 5, 5],
-            'numbers_list': [2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 5, 6, 6, 6, 8, 8, 8, 9, 9, 9, 10, 10, 10, 11, 11, 11, 12, 12],
-            'row_lengths': [3, 4, 5, 6, 5, 4, 3],
-            'ports': [(-0.65, 1), (-0.35, 0.5), (-0.65, 2), (-0.35, 2.5), 
-                      (0.65, 4), (0.35, 3.5), (1.65, -0.5), (2.35, -0.5), 
-                      (3.35, 5), (2.65, 5), (4.35, -0.5), (3.65, -0.5),
-                      (5.35, 0), (4.65, 0), (4.65, 4), (4.35, 4.5),
-                      (6.65, 1), (6.35, 0.5), (6.65, 2), (6.35, 2.5),
-                      (5.65, 3.5), (6.35, 3.5)],
-            'colors': ['#BA0B0B', '#BA0B0B', 
-                       '#ECCF1B', '#ECCF1B', 
-                       'Black', 'Black', 
-                       '#A0A0A0', '#A0A0A0', 
-                       'Black', 'Black', 
-                       'Black', 'Black', 
-                       '#1A4D00', '#1A4D00',
-                       'Black', 'Black', 
-                       '#97E83A', '#97E83A',
-                       'Black', 'Black', 
-                       '#97E83A', '#97E83A']
-        }
-    }
-    
-    mode_data = data[reg_or_exp]  # Get data based on current mode.
-    ports = mode_data['ports'] # Define port locations
-    colors = mode_data['colors'] # Define port colors
-    
-    # Randomize the lists
-    random.shuffle(mode_data['tiles'])
-    random.shuffle(mode_data['numbers_list'])
-    
-    # Populate the board with tiles
-    board = populate_tiles(mode_data['tiles'], mode_data['row_lengths'])
-    
-    # Translate to text representation
-    board_words = translate_to_text(board, len(mode_data['row_lengths']))
-    
-    # Add numbers to the board
-    add_numbers(board_words, mode_data['numbers_list'])
-    
-    return board_words, ports, colors
+# Drawing phases timed while catan_stats is enabled
+catan_stats.register(__name__, ('draw_board_gui', 'build_board_items', 'draw_ports', 'draw_legend'))
 
 if __name__ == "__main__":
-    initialize_gui()
-    root.mainloop()
\ No newline at end of file
+    show_stats = '--stats' in sys.argv[1:]
+    start_gui()
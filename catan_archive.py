@@ -0,0 +1,264 @@
+### Catan Board Randomizer ###
+###  Memory Mapped Archive   ###
+
+# Import Necessary Packages
+import json # Archive metadata
+import os # Archive directory and file paths
+import numpy as np # Memory mapped record arrays and sorted indexes
+from catan_batch import RESOURCES, generate_batch, batch_to_words, shuffle_rows # Batch board arrays
+from catan_core import BOARD_DATA, LAYOUT_SPECS, MODES, get_topology, register_layout # Layout data and hex topology
+from catan_score import score_batch # Fairness scores and vertex pips
+
+# Version of the archive layout, stored in the metadata
+ARCHIVE_VERSION = 2
+
+# Boards generated, scored and indexed per chunk when building an archive
+CHUNK_SIZE = 1 << 16
+
+# Secondary indexes built for every archive: name -> function(boards, scores, mode) returning one or more keys
+# per board. Keys of shape (n, k) index a board under each of its k values, e.g. both deserts of an Expansion board
+INDEXES = {
+    'desert': lambda boards, scores, mode: np.nonzero(boards[:, RESOURCES] == 0)[1].reshape(len(boards), -1)
+                                           .astype(np.uint8),
+    'max_vertex_pips': lambda boards, scores, mode: scores['max_vertex_pips'],
+    'score': lambda boards, scores, mode: scores['score'],
+}
+
+def record_dtype(mode):
+    """
+    The fixed-size record of one board of a mode.
+
+    Fields:
+    - board (uint8, (2, hexes)): The resource ids and number tokens, laid out like one board of generate_batch.
+    - ports (uint8, (ports,)): For every port slot of the layout, the index of the layout port whose type is placed
+      there. Every port has two circles, so there is one slot per pair of entries in the layout's 'ports'.
+    - score (float32): The fairness score from score_batch.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - np.dtype: The record type.
+    """
+    hex_count = get_topology(mode).hex_count
+    port_count = len(BOARD_DATA[mode]['ports']) // 2
+    return np.dtype([('board', np.uint8, (2, hex_count)), ('ports', np.uint8, (port_count,)),
+                     ('score', np.float32)])
+
+def shuffle_ports(mode, n, rng):
+    """
+    Draws a uniform shuffle of the port types over the port slots of the layout for every board.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - n (int): The number of boards.
+    - rng (numpy.random.Generator): The random number generator to use.
+
+    Returns:
+    - ndarray of uint8: Shape (n, ports), the ports field of n records.
+    """
+    return shuffle_rows(rng, range(len(BOARD_DATA[mode]['ports']) // 2), n)
+
+def create_archive(path, mode, batches, count):
+    """
+    Writes boards into a new archive directory and builds its indexes.
+
+    The directory holds 'records.npy' (one record per board, memory mappable), 'meta.json' (the layout the
+    records refer to, with the layout description of a custom mode) and two sorted files per index: 'index_<name>_keys.npy' and 'index_<name>_ids.npy'.
+
+    Parameters:
+    - path (str): The archive directory, created if missing.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - batches (iterable of tuples): (boards, ports) pairs. The boards have shape (n, 2, hexes), such as
+      generate_batch output, and the ports shape (n, ports), such as shuffle_ports output. Ports of None keep the
+      layout's own port order on every board.
+    - count (int): The total number of boards in 'batches'.
+
+    Returns:
+    - BoardArchive: The new archive, opened for reading.
+    """
+    os.makedirs(path, exist_ok=True)
+    records = np.lib.format.open_memmap(os.path.join(path, 'records.npy'), mode='w+',
+                                        dtype=record_dtype(mode), shape=(count,))
+    keys = {name: [] for name in INDEXES}
+
+    start = 0
+    for boards, ports in batches:
+        stop = start + len(boards)
+        if stop > count:
+            raise ValueError(f"More than {count} boards were given")
+        scores = score_batch(boards, mode)
+        chunk = records[start:stop]
+        chunk['board'] = boards
+        chunk['ports'] = np.arange(len(BOARD_DATA[mode]['ports']) // 2) if ports is None else ports
+        chunk['score'] = scores['score']
+        for name, index in INDEXES.items():
+            keys[name].append(index(boards, scores, mode))
+        start = stop
+    if start != count:
+        raise ValueError(f"Expected {count} boards, got {start}")
+    records.flush()
+    del records
+
+    # Sort every index once: keys ascending, with the record id of every key alongside
+    for name, parts in keys.items():
+        values = np.concatenate(parts) if parts else np.empty(0)
+        ids = np.arange(count, dtype=np.int64)
+        if values.ndim == 2:
+            ids = np.repeat(ids, values.shape[1])
+            values = values.ravel()
+        order = np.argsort(values, kind='stable')
+        np.save(os.path.join(path, f'index_{name}_keys.npy'), values[order])
+        np.save(os.path.join(path, f'index_{name}_ids.npy'), ids[order])
+
+    meta = {
+        'version': ARCHIVE_VERSION,
+        'mode': mode,
+        'count': count,
+        'layout': LAYOUT_SPECS.get(mode),
+        'row_lengths': BOARD_DATA[mode]['row_lengths'],
+        'ports': BOARD_DATA[mode]['ports'],
+        'colors': BOARD_DATA[mode]['colors'],
+        'indexes': list(INDEXES),
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as out:
+        json.dump(meta, out, indent=2)
+    return BoardArchive(path)
+
+def generate_archive(path, mode, count, seed=None):
+    """
+    Generates 'count' valid boards with generate_batch, each with its own shuffle of the port types, and writes
+    them into a new archive.
+
+    Parameters:
+    - path (str): The archive directory.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - count (int): The number of boards.
+    - seed (int, optional): Seed of the archive; every chunk draws from its own child of np.random.SeedSequence(seed),
+      so the archive is reproducible and no two chunks or nearby seeds share a stream.
+
+    Returns:
+    - BoardArchive: The new archive, opened for reading.
+    """
+    starts = range(0, count, CHUNK_SIZE)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(len(starts))
+
+    def batches():
+        for start, chunk_seed in zip(starts, chunk_seeds):
+            rng = np.random.default_rng(chunk_seed)
+            n = min(CHUNK_SIZE, count - start)
+            boards = generate_batch(mode, n, rng)
+            yield boards, shuffle_ports(mode, n, rng)
+
+    return create_archive(path, mode, batches(), count)
+
+class BoardArchive:
+    """
+    Read-only access to an archive written by create_archive.
+
+    Every array is memory mapped, so opening an archive reads only its metadata, and records and index entries
+    are paged in as they are touched. Indexing returns NumPy views of the file, never copies. The layout of an
+    archive of a custom mode is registered again on opening when this process does not know it yet.
+
+    Attributes:
+    - path (str): The archive directory.
+    - mode (str): The game mode of every board.
+    - meta (dict): The archive metadata.
+    - records (ndarray): The memory mapped records, see record_dtype.
+    - boards (ndarray of uint8): Shape (n, 2, hexes), a view of the board field of every record.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as meta_file:
+            self.meta = json.load(meta_file)
+        if self.meta['version'] != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version {self.meta['version']}")
+        self.mode = self.meta['mode']
+        layout = self.meta.get('layout')
+        if layout is not None and self.mode not in MODES and LAYOUT_SPECS.get(self.mode) != layout:
+            register_layout(layout)
+        self.records = np.load(os.path.join(path, 'records.npy'), mmap_mode='r')
+        self.boards = self.records['board']
+        self._indexes = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, item):
+        """
+        Parameters:
+        - item (int, slice or array of int): Record numbers.
+
+        Returns:
+        - ndarray: The records, a view of the file for integers and slices.
+        """
+        return self.records[item]
+
+    def index(self, name):
+        """
+        Parameters:
+        - name (str): The name of an index in INDEXES.
+
+        Returns:
+        - keys (ndarray): The sorted keys, memory mapped.
+        - ids (ndarray of int64): The record number of every key, memory mapped.
+        """
+        if name not in self._indexes:
+            if name not in self.meta['indexes']:
+                raise KeyError(f"The archive has no index {name!r}")
+            self._indexes[name] = tuple(np.load(os.path.join(self.path, f'index_{name}_{part}.npy'), mmap_mode='r')
+                                        for part in ('keys', 'ids'))
+        return self._indexes[name]
+
+    def query(self, name, low=None, high=None):
+        """
+        Finds the records whose indexed value lies in [low, high] with two binary searches.
+
+        Parameters:
+        - name (str): The name of an index in INDEXES.
+        - low (number, optional): The smallest value to include. Unbounded by default.
+        - high (number, optional): The largest value to include. Unbounded by default.
+
+        Returns:
+        - ndarray of int64: The sorted, distinct record numbers.
+        """
+        keys, ids = self.index(name)
+        start = 0 if low is None else np.searchsorted(keys, low, side='left')
+        stop = len(keys) if high is None else np.searchsorted(keys, high, side='right')
+        return np.unique(ids[start:stop])
+
+    def select(self, **criteria):
+        """
+        Finds the records meeting every criterion.
+
+        Parameters:
+        - criteria: Index names mapped to a value to match exactly or a (low, high) pair where either side may be
+          None, e.g. select(desert=9, score=(80, None)).
+
+        Returns:
+        - ndarray of int64: The sorted record numbers.
+        """
+        result = None
+        for name, criterion in criteria.items():
+            low, high = criterion if isinstance(criterion, tuple) else (criterion, criterion)
+            found = self.query(name, low, high)
+            result = found if result is None else np.intersect1d(result, found, assume_unique=True)
+        return np.arange(len(self), dtype=np.int64) if result is None else result
+
+    def words(self, record):
+        """
+        Parameters:
+        - record (int): A record number.
+
+        Returns:
+        - board_words (list of lists of str): The board in text format.
+        - ports (list of tuples): The port locations of the layout.
+        - colors (list of str): The port colors, with the port types placed as stored in the record.
+        """
+        board_words = batch_to_words(self.boards[record:record + 1], self.mode)[0]
+        ports = [tuple(port) for port in self.meta['ports']]
+        colors = []
+        for port in self.records[record]['ports'].tolist():
+            colors += self.meta['colors'][2 * port:2 * port + 2] # Both circles of the port placed in this slot
+        return board_words, ports, colors
@@ -0,0 +1,199 @@
+### Catan Board Randomizer ###
+###   Vectorised Batch Mode  ###
+
+# Import Necessary Packages
+from functools import lru_cache # Caches the per mode placement tables
+from itertools import permutations # Distinct orders of the red numbers
+import numpy as np # Array library used to build whole batches of boards at once
+from catan_core import BOARD_DATA, RESOURCE_NAMES, get_topology, placement_table # Layout data, hex topology and red placements
+from catan_topology import RED_NUMBERS # Numbers that may not sit next to each other
+
+# Planes of a batch array: boards[:, RESOURCES] holds resource ids, boards[:, TOKENS] holds number tokens
+RESOURCES = 0
+TOKENS = 1
+
+# Mask of the random bits in the 32 bit sort keys, the low 8 bits of each key hold the value being shuffled
+KEY_MASK = np.uint32(0xFFFFFF00)
+
+@lru_cache(maxsize=None)
+def red_placements(mode):
+    """
+    Lists every way to put the 6's and 8's of a mode on hexes that are not neighbours.
+
+    A valid board is fully described by its red hexes, the order of the 6's and 8's on them, and an arbitrary
+    arrangement of everything else on the remaining hexes (deserts can never be red, so they go there too).
+    Every set of red hexes therefore has the same number of valid boards, and picking one uniformly from this
+    list gives exactly the distribution of the rejection loop.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - red_hexes (ndarray of uint8): Shape (placements, reds), the red hexes of each placement.
+    - other_hexes (ndarray of uint8): Shape (placements, hexes - reds), the remaining hexes of each placement.
+    - sources (ndarray of uint8): Shape (placements, hexes), for every hex its position in the red hexes
+      followed by the other hexes, used to gather per placement values back into hex order.
+    """
+    hex_count = get_topology(mode).hex_count
+
+    # The placement tables of new_valid_board list every valid set of red hexes in index order
+    placements = list(placement_table(mode)['dp'].placements())
+
+    red_hexes = np.array(placements, dtype=np.uint8)
+    other_hexes = np.array([[i for i in range(hex_count) if i not in placement] for placement in placements], dtype=np.uint8)
+    sources = np.argsort(np.concatenate([red_hexes, other_hexes], axis=1), axis=1).astype(np.uint8)
+    return red_hexes, other_hexes, sources
+
+@lru_cache(maxsize=None)
+def red_orders(mode):
+    """
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - ndarray of uint8: Every distinct order of the mode's 6's and 8's, one per row.
+    """
+    red_numbers = [number for number in BOARD_DATA[mode]['numbers_list'] if number in RED_NUMBERS]
+    return np.array(sorted(set(permutations(red_numbers))), dtype=np.uint8)
+
+def shuffle_rows(rng, values, n):
+    """
+    Returns n independent uniform shuffles of the same list of small values.
+
+    Each value is packed under a random key and the rows are sorted, which is much faster than shuffling row by
+    row. Rows where two random keys collide are drawn again so that the result stays exactly uniform.
+
+    Parameters:
+    - rng (numpy.random.Generator): The random number generator to draw keys from.
+    - values (sequence of int): The values to shuffle, each below 256.
+    - n (int): The number of shuffles.
+
+    Returns:
+    - ndarray of uint8: Shape (n, len(values)), one shuffle per row.
+    """
+    values = np.asarray(values, dtype=np.uint32)
+    shuffled = np.empty((n, len(values)), dtype=np.uint8)
+    rows = slice(None) # Start with every row, later passes only redraw the tied ones
+    while True:
+        # Draw raw 64 bit words from the generator and split each into two 32 bit keys
+        size = len(shuffled[rows]) * len(values)
+        keys = rng.bit_generator.random_raw((size + 1) // 2).view(np.uint32)[:size].reshape(-1, len(values))
+        keys &= KEY_MASK
+        keys |= values
+        keys.sort(axis=1)
+        shuffled[rows] = keys # Casting to uint8 keeps the low 8 bits, which hold the values
+
+        # Find rows with equal random keys, their order was decided by value instead of at random
+        keys >>= 8
+        tied = np.flatnonzero((keys[:, 1:] == keys[:, :-1]).any(axis=1))
+        if not len(tied):
+            return shuffled
+        rows = np.arange(n)[rows][tied]
+
+def generate_batch(mode, n, seed=None, out=None):
+    """
+    Generates n valid boards at once as a compact uint8 array.
+
+    Instead of shuffling whole boards and throwing most of them away, every board starts from a uniformly chosen
+    set of non-neighbouring red hexes, so all n boards are valid by construction and follow the same distribution
+    as new_board plus is_valid_board. The 6's and 8's, the remaining numbers with the deserts, and the resources
+    are then shuffled for all boards together.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - n (int): The number of boards to generate.
+    - seed (int, numpy.random.SeedSequence or numpy.random.Generator, optional): Seed of the random stream.
+    - out (ndarray of uint8, optional): Array of shape (n, 2, hexes) to write the boards into, such as a view of
+      a shared memory buffer. A new array is allocated if not given.
+
+    Returns:
+    - ndarray of uint8: Shape (n, 2, hexes). boards[:, RESOURCES] holds the resource ids (0 is the desert) and
+      boards[:, TOKENS] holds the number tokens (0 on the desert), with hexes in reading order.
+    """
+    rng = np.random.default_rng(seed)
+    mode_data = BOARD_DATA[mode]
+    red_hexes, other_hexes, sources = red_placements(mode)
+    orders = red_orders(mode)
+    hex_count = sources.shape[1]
+
+    boards = np.empty((n, 2, hex_count), dtype=np.uint8) if out is None else out
+    boards[:, RESOURCES] = 0 # Deserts keep resource 0, every other hex is filled below
+    tokens = boards[:, TOKENS]
+
+    # Choose the red hexes and the order of the 6's and 8's on them
+    placement = rng.integers(len(red_hexes), size=n)
+    red_tokens = orders[rng.integers(len(orders), size=n)]
+
+    # Shuffle the deserts (token 0) and every other number for the remaining hexes
+    deserts = mode_data['tiles'].count(0)
+    others = [0] * deserts + [number for number in mode_data['numbers_list'] if number not in RED_NUMBERS]
+    other_tokens = shuffle_rows(rng, others, n)
+
+    # Gather both lists into hex order in one pass
+    tokens[:] = np.take_along_axis(np.concatenate([red_tokens, other_tokens], axis=1), sources[placement], axis=1)
+
+    # Shuffle the resources onto every hex that has a number, the deserts keep resource 0
+    resources = [tile for tile in mode_data['tiles'] if tile != 0]
+    boards[:, RESOURCES][tokens != 0] = shuffle_rows(rng, resources, n).ravel()
+
+    return boards
+
+def valid_mask(boards, mode):
+    """
+    Checks the 6 and 8 rule for a whole batch of boards.
+
+    Parameters:
+    - boards (ndarray of uint8): Shape (n, 2, hexes), as returned by generate_batch.
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - ndarray of bool: Shape (n,), True for every board with no neighbouring 6's or 8's.
+    """
+    tokens = boards[:, TOKENS]
+    red = (tokens == 6) | (tokens == 8)
+    valid = np.ones(len(boards), dtype=bool)
+    for i, j in get_topology(mode).edges:
+        valid &= ~(red[:, i] & red[:, j])
+    return valid
+
+def batch_to_words(boards, mode):
+    """
+    Converts a batch array back to the 'board_words' format used by new_board and draw_board_gui.
+
+    Parameters:
+    - boards (ndarray of uint8): Shape (n, 2, hexes), as returned by generate_batch.
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - list: One 2D list of "resource-number" strings per board.
+    """
+    row_lengths = BOARD_DATA[mode]['row_lengths']
+    boards_words = []
+    for resources, tokens in boards.tolist():
+        cells = [f"{RESOURCE_NAMES[resource]}-{token}" if resource else RESOURCE_NAMES[resource]
+                 for resource, token in zip(resources, tokens)]
+        board_words = []
+        start = 0
+        for row_length in row_lengths:
+            board_words.append(cells[start:start + row_length])
+            start += row_length
+        boards_words.append(board_words)
+    return boards_words
+
+def words_to_batch(boards_words):
+    """
+    Converts boards in 'board_words' format into a batch array.
+
+    Parameters:
+    - boards_words (list): One 2D list of "resource-number" strings per board.
+
+    Returns:
+    - ndarray of uint8: Shape (n, 2, hexes), laid out like the output of generate_batch.
+    """
+    resource_ids = {name: index for index, name in enumerate(RESOURCE_NAMES)}
+    boards = []
+    for board_words in boards_words:
+        cells = [cell.partition('-') for row in board_words for cell in row]
+        boards.append(([resource_ids[resource] for resource, _, _ in cells],
+                       [int(token or 0) for _, _, token in cells]))
+    return np.array(boards, dtype=np.uint8)
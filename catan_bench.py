@@ -0,0 +1,442 @@
+### Catan Board Randomizer ###
+###     Benchmark Suite      ###
+
+# Import Necessary Packages
+import argparse # Command line argument parsing
+import json # JSON output of the results and loading of baselines
+import os # File system access for the tile images
+import platform # Machine description stored with the results
+import random # Seeding for reproducible boards
+import statistics # Medians of the repeated measurements
+import subprocess # Fresh interpreters for the startup measurements
+import sys # Access to the running interpreter and stdout
+import tempfile # Throwaway tile caches for cold starts
+import time # High resolution timers
+from catan_core import (MODES, PlacementDP, get_topology, is_valid_board, new_board, new_valid_board, placement_table,
+                        register_layout) # Headless board generation engine
+from catan_layouts import hexagon_layout # Synthetic maps of any size
+
+# Benchmark groups that can be selected on the command line
+GROUPS = ('startup', 'generation', 'render', 'scaling')
+
+# Radii of the hexagonal maps timed by the scaling group, from the Regular board to 217 hexes. Wider maps spend
+# seconds to minutes building their placement tables, see catan_core.PLACEMENT_BUDGET
+SCALING_RADII = (2, 4, 6, 8)
+
+# Repeats a run needs before it can be compared, so every metric has a median and a spread to judge noise by
+MIN_COMPARE_REPEAT = 3
+
+# Spreads of noise a metric may move by, on top of the threshold, before it counts as a regression
+NOISE_FACTOR = 3
+
+# Shortest time in seconds one throughput measurement may take, shorter ones repeat their work
+MIN_SAMPLE_TIME = 0.2
+
+# Work done per measurement; --quick divides every count by 10
+COUNTS = {
+    'boards': 5000, # boards generated per new_board and new_valid_board measurement
+    'checks': 20000, # boards checked per is_valid_board measurement
+    'valid_boards': 2000, # valid boards found per rejection-loop measurement
+    'redraws': 200, # boards drawn per draw_board_gui measurement
+    'renders': 20, # boards rendered per render_board measurement
+    'rolls': 10_000_000, # dice rolled per catan_dice measurement
+    'scaling_boards': 50, # boards generated, checked and rendered per map size in the scaling group
+}
+
+# Imports the GUI module and prepares every tile like the first board draw does, then prints the elapsed time
+STARTUP_SCRIPT = """
+import os, sys, time
+start = time.perf_counter()
+import catan_app
+from catan_tiles import load_tile
+for resource, path in catan_app.image_paths.items():
+    if os.path.exists(path):
+        load_tile(resource, path, catan_app.hex_size, cache_dir=sys.argv[1])
+print(time.perf_counter() - start)
+"""
+
+def metric(value, unit, higher_is_better, spread=0.0):
+    """
+    Parameters:
+    - value (float): The measured value.
+    - unit (str): The unit of the value, such as "boards/s".
+    - higher_is_better (bool): The direction in which the value improves.
+    - spread (float): The noise of the value relative to it, 0 for exact values such as item counts.
+
+    Returns:
+    - dict: One metric entry of the results.
+    """
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better, 'spread': spread}
+
+def timing_metric(samples, unit, higher_is_better):
+    """
+    Summarises repeated measurements by their median and their median absolute deviation.
+
+    Parameters:
+    - samples (list of float): One value per measurement.
+    - unit (str): The unit of the values.
+    - higher_is_better (bool): The direction in which the value improves.
+
+    Returns:
+    - dict: One metric entry of the results, with the deviation relative to the median as its 'spread'.
+    """
+    median = statistics.median(samples)
+    deviation = statistics.median(abs(sample - median) for sample in samples)
+    return metric(median, unit, higher_is_better, deviation / median if median else 0.0)
+
+def measure_rates(function, count, repeat):
+    """
+    Measures the throughput of 'function' 'repeat' times. A measurement calls it again until it has run for at
+    least MIN_SAMPLE_TIME, so short quick runs are not dominated by scheduler and clock noise.
+
+    Parameters:
+    - function (callable): Called with no arguments, does 'count' operations.
+    - count (int): The number of operations per call.
+    - repeat (int): The number of measurements.
+
+    Returns:
+    - list of float: The operations per second of every measurement.
+    """
+    rates = []
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            function()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_SAMPLE_TIME:
+                break
+        rates.append(calls * count / elapsed)
+    return rates
+
+def bench_startup(repeat):
+    """
+    Times a fresh interpreter importing catan_app and preparing every tile image, with an empty tile cache (cold)
+    and with the cache already filled (warm).
+
+    Parameters:
+    - repeat (int): The number of interpreters started per measurement.
+
+    Returns:
+    - dict: The startup metrics.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for state in ('cold', 'warm'):
+        walls, insides = [], []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as cache_dir:
+                command = [sys.executable, '-c', STARTUP_SCRIPT, cache_dir]
+                if state == 'warm':
+                    subprocess.run(command, cwd=here, check=True, capture_output=True)
+                start = time.perf_counter()
+                output = subprocess.run(command, cwd=here, check=True, capture_output=True, text=True).stdout
+                walls.append(time.perf_counter() - start)
+                insides.append(float(output))
+        results[f"startup.{state}.wall_s"] = timing_metric(walls, 's', False)
+        results[f"startup.{state}.import_and_tiles_s"] = timing_metric(insides, 's', False)
+    return results
+
+def bench_generation(mode, repeat, counts, seed):
+    """
+    Measures board generation and validation throughput for one mode.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - repeat (int): The number of measurements, the median is reported.
+    - counts (dict): The work per measurement, see COUNTS.
+    - seed (int): The seed of the random boards.
+
+    Returns:
+    - dict: The generation metrics of the mode.
+    """
+    random.seed(seed)
+    boards = [new_board(mode)[0] for _ in range(counts['checks'])]
+
+    def generate_boards():
+        for _ in range(counts['boards']):
+            new_board(mode)
+
+    def check_boards():
+        for board in boards:
+            is_valid_board(board)
+
+    def generate_valid_boards():
+        for _ in range(counts['boards']):
+            new_valid_board(mode)
+
+    # Count the new_board calls the original rejection loop needs per valid board
+    attempts = 0
+    for _ in range(counts['valid_boards']):
+        attempts += 1
+        while not is_valid_board(new_board(mode)[0]):
+            attempts += 1
+
+    return {
+        f"{mode}.new_board_per_s": timing_metric(measure_rates(generate_boards, counts['boards'], repeat),
+                                                 'boards/s', True),
+        f"{mode}.is_valid_board_per_s": timing_metric(measure_rates(check_boards, len(boards), repeat),
+                                                      'checks/s', True),
+        f"{mode}.new_valid_board_per_s": timing_metric(measure_rates(generate_valid_boards, counts['boards'], repeat),
+                                                       'boards/s', True),
+        f"{mode}.attempts_per_valid_board": metric(attempts / counts['valid_boards'], 'attempts', False),
+    }
+
+def bench_render(mode, repeat, counts, seed):
+    """
+    Measures draw_board_gui latency and canvas item counts, and render_board latency.
+
+    The Tk measurements need a display and are left out without one; the Pillow measurements need Pillow only.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - repeat (int): The number of measurements, the median is reported.
+    - counts (dict): The work per measurement, see COUNTS.
+    - seed (int): The seed of the random boards.
+
+    Returns:
+    - dict: The render metrics of the mode.
+    - list of str: Why measurements were skipped.
+    """
+    rng = random.Random(seed)
+    boards = [new_valid_board(mode, rng) for _ in range(counts['redraws'])]
+    results = {}
+    skipped = []
+
+    try:
+        import catan_app
+        catan_app.create_window()
+    except Exception as error:
+        skipped.append(f"{mode} draw_board_gui: {error}")
+    else:
+        try:
+            # The first draw builds the canvas items and loads the tiles
+            start = time.perf_counter()
+            catan_app.draw_board_gui(*boards[0])
+            catan_app.root.update()
+            results[f"{mode}.draw_board_gui.first_ms"] = metric((time.perf_counter() - start) * 1000, 'ms', False)
+            results[f"{mode}.draw_board_gui.items_first"] = metric(len(catan_app.canvas.find_all()), 'items', False)
+
+            def redraw():
+                for board in boards:
+                    catan_app.draw_board_gui(*board)
+                    catan_app.root.update()
+
+            rates = measure_rates(redraw, len(boards), repeat)
+            results[f"{mode}.draw_board_gui.redraw_ms"] = timing_metric([1000 / rate for rate in rates], 'ms', False)
+            results[f"{mode}.draw_board_gui.items_after_redraws"] = metric(len(catan_app.canvas.find_all()),
+                                                                           'items', False)
+        finally:
+            catan_app.root.destroy()
+            catan_app.board_items['layout'] = None
+            catan_app.scaled_photo_image.cache_clear()
+
+    try:
+        from catan_render import TileAtlas, load_font, render_board
+    except ImportError as error:
+        skipped.append(f"{mode} render_board: {error}")
+    else:
+        atlas = TileAtlas()
+        font = load_font(16)
+        renders = boards[:counts['renders']]
+
+        def render():
+            for board in renders:
+                render_board(*board, atlas, font=font)
+
+        rates = measure_rates(render, len(renders), repeat)
+        results[f"{mode}.render_board_ms"] = timing_metric([1000 / rate for rate in rates], 'ms', False)
+
+    return results, skipped
+
+def bench_scaling(repeat, counts, seed):
+    """
+    Measures how generation, validation and rendering grow with the number of hexes, on hexagonal maps of
+    SCALING_RADII. Costs are reported per hex, so they stay flat where the work grows linearly. The one-off build
+    of each map's placement tables is reported in seconds, it grows with the width of the map rather than linearly.
+
+    Parameters:
+    - repeat (int): The number of measurements, the median is reported.
+    - counts (dict): The work per measurement, see COUNTS.
+    - seed (int): The seed of the random boards.
+
+    Returns:
+    - dict: The scaling metrics.
+    - list of str: Why measurements were skipped.
+    """
+    try:
+        from catan_render import TileAtlas, load_font, render_board
+        atlas, font = TileAtlas(), load_font(16)
+    except ImportError as error:
+        render_board = None
+        skipped = [f"scaling render_board: {error}"]
+    else:
+        skipped = []
+
+    results = {}
+    count = counts['scaling_boards']
+    for radius in SCALING_RADII:
+        mode = register_layout(hexagon_layout(radius))
+        table = placement_table(mode) # Build the placement tables outside the per board measurements
+        builds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            PlacementDP(get_topology(mode), table['reds'], table['deserts'])
+            builds.append(time.perf_counter() - start)
+        rng = random.Random(seed)
+        boards = [new_valid_board(mode, rng) for _ in range(count)]
+        hexes = sum(len(row) for row in boards[0][0])
+
+        def generate_boards():
+            for _ in range(count):
+                new_valid_board(mode, rng)
+
+        def check_boards():
+            for board, _, _ in boards:
+                is_valid_board(board)
+
+        timed = [('new_valid_board', generate_boards), ('is_valid_board', check_boards)]
+        if render_board is not None:
+            def render():
+                for board in boards[:max(count // 10, 1)]:
+                    render_board(*board, atlas, font=font)
+            timed.append(('render_board', render))
+
+        for name, function in timed:
+            calls = max(count // 10, 1) if name == 'render_board' else count
+            per_hex = [1e6 / rate / hexes for rate in measure_rates(function, calls, repeat)]
+            results[f"scaling.{hexes}_hexes.{name}_us_per_hex"] = timing_metric(per_hex, 'us/hex', False)
+        results[f"scaling.{hexes}_hexes.placement_table_s"] = timing_metric(builds, 's', False)
+    return results, skipped
+
+def run(groups=GROUPS, repeat=5, quick=False, seed=0):
+    """
+    Runs the selected benchmark groups.
+
+    Parameters:
+    - groups (iterable of str): Which of GROUPS to run.
+    - repeat (int): The number of measurements per metric.
+    - quick (bool): Do a tenth of the work per measurement, for a fast smoke run.
+    - seed (int): The seed of every random board, so runs measure the same work.
+
+    Returns:
+    - dict: 'meta' describing the run and machine, 'metrics' mapping names to metric entries, and 'skipped'.
+    """
+    counts = {name: max(count // 10, 1) if quick else count for name, count in COUNTS.items()}
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'repeat': repeat,
+            'quick': quick,
+            'seed': seed,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'metrics': {},
+        'skipped': [],
+    }
+
+    if 'startup' in groups:
+        results['metrics'].update(bench_startup(repeat))
+    for mode in MODES:
+        if 'generation' in groups:
+            results['metrics'].update(bench_generation(mode, repeat, counts, seed))
+        if 'render' in groups:
+            metrics, skipped = bench_render(mode, repeat, counts, seed)
+            results['metrics'].update(metrics)
+            results['skipped'].extend(skipped)
+    if 'generation' in groups:
+        try:
+            from catan_dice import rolling_throughput
+        except ImportError as error:
+            results['skipped'].append(f"dice rolling: {error}")
+        else:
+            rates = [rolling_throughput(counts['rolls'], seed) for _ in range(repeat)]
+            results['metrics']['dice.rolls_per_s'] = timing_metric(rates, 'rolls/s', True)
+    if 'scaling' in groups:
+        metrics, skipped = bench_scaling(repeat, counts, seed)
+        results['metrics'].update(metrics)
+        results['skipped'].extend(skipped)
+    return results
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Compares every metric present in both runs.
+
+    A metric only counts as a regression when it gets worse by more than the threshold plus NOISE_FACTOR times
+    the larger of its two spreads, so a noisy timing has to move further than a steady one.
+
+    Parameters:
+    - results (dict): The current run, as returned by run().
+    - baseline (dict): A saved earlier run.
+    - threshold (float): The relative change in the bad direction above which a steady metric counts as a
+      regression.
+
+    Returns:
+    - list of tuples: (name, baseline value, current value, relative change, regressed) for every shared metric,
+      where a positive change is always an improvement.
+    """
+    rows = []
+    for name, current in results['metrics'].items():
+        previous = baseline['metrics'].get(name)
+        if previous is None or not previous['value']:
+            continue
+        change = (current['value'] - previous['value']) / previous['value']
+        if not current['higher_is_better']:
+            change = -change
+        noise = NOISE_FACTOR * max(current.get('spread', 0.0), previous.get('spread', 0.0))
+        rows.append((name, previous['value'], current['value'], change, change < -(threshold + noise)))
+    return rows
+
+def main(argv=None):
+    """
+    Command line entry point: runs the benchmarks, writes the results as JSON and optionally compares them.
+
+    Parameters:
+    - argv (list of str, optional): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+    - int: 1 if a metric regressed against the baseline, 2 if either run has too few repeats to compare,
+      otherwise 0.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark board generation, validation, tile loading, drawing and scaling.")
+    parser.add_argument('-g', '--group', action='append', choices=GROUPS, help="benchmark group, may be repeated")
+    parser.add_argument('-r', '--repeat', type=int, default=5, help="measurements per metric, the median is kept")
+    parser.add_argument('-s', '--seed', type=int, default=0, help="seed of the benchmark boards")
+    parser.add_argument('-o', '--output', default='-', help="JSON results file, '-' for stdout")
+    parser.add_argument('-c', '--compare', metavar='BASELINE', help="JSON results of an earlier run to compare with")
+    parser.add_argument('-t', '--threshold', type=float, default=0.1, help="relative slowdown counted as regression")
+    parser.add_argument('--quick', action='store_true', help="do a tenth of the work per measurement")
+    args = parser.parse_args(argv)
+
+    results = run(args.group or GROUPS, args.repeat, args.quick, args.seed)
+    text = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as out:
+            out.write(text + '\n')
+
+    for reason in results['skipped']:
+        print(f"skipped {reason}", file=sys.stderr)
+
+    if not args.compare:
+        return 0
+
+    # Print the comparison to stderr so stdout stays valid JSON
+    with open(args.compare) as baseline_file:
+        baseline = json.load(baseline_file)
+    if min(args.repeat, baseline['meta'].get('repeat', 1)) < MIN_COMPARE_REPEAT:
+        print(f"comparing needs at least {MIN_COMPARE_REPEAT} repeats in both runs, to tell changes from noise",
+              file=sys.stderr)
+        return 2
+    rows = compare(results, baseline, args.threshold)
+    for name, previous, current, change, regressed in rows:
+        print(f"{name:45s} {previous:14.4g} -> {current:14.4g} {change:+8.1%}{'  REGRESSION' if regressed else ''}",
+              file=sys.stderr)
+    return 1 if any(row[4] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
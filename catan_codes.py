@@ -0,0 +1,229 @@
+### Catan Board Randomizer ###
+###       Board Codes        ###
+
+# Import Necessary Packages
+from collections import Counter # Counts of every tile and number in a layout
+from functools import lru_cache # Caches the per mode symbol tables
+from math import factorial, prod # Multinomial coefficients
+from catan_core import BOARD_DATA, MODES, RESOURCE_NAMES # Layout data
+
+# Crockford's base 32 alphabet, which leaves out I, L, O and U so codes are easy to read out loud
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+# Characters accepted when reading a code that look like digits of the alphabet
+ALIASES = {'I': '1', 'L': '1', 'O': '0'}
+
+@lru_cache(maxsize=None)
+def code_tables(mode):
+    """
+    Precomputes what ranking needs for one layout.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - dict: 'tile_counts' and 'number_counts' (sorted (symbol, count) pairs of the multisets), 'tile_total' and
+      'number_total' (how many distinct arrangements each has), and 'count' (how many boards the layout has).
+    """
+    mode_data = BOARD_DATA[mode]
+    tables = {}
+    for name, values in (('tile', mode_data['tiles']), ('number', mode_data['numbers_list'])):
+        counts = sorted(Counter(values).items())
+        tables[f'{name}_counts'] = tuple(counts)
+        tables[f'{name}_total'] = factorial(len(values)) // prod(factorial(count) for _, count in counts)
+    tables['count'] = tables['tile_total'] * tables['number_total']
+    return tables
+
+def rank_multiset(sequence, symbol_counts, total):
+    """
+    Ranks an arrangement of a multiset in lexicographic order.
+
+    Walking the sequence, the arrangements starting with a smaller symbol than the one placed are skipped. With
+    'remaining' symbols left and 'total' arrangements of them, those number total * (count of smaller symbols)
+    / remaining, so every position costs one multiplication and one division.
+
+    Parameters:
+    - sequence (list): The arrangement.
+    - symbol_counts (tuple of tuples): The sorted (symbol, count) pairs of the multiset.
+    - total (int): The number of distinct arrangements of the multiset.
+
+    Returns:
+    - int: The rank, from 0 to total - 1.
+
+    Raises:
+    - ValueError: If the sequence is not an arrangement of the multiset.
+    """
+    position = {symbol: index for index, (symbol, _) in enumerate(symbol_counts)}
+    counts = [count for _, count in symbol_counts]
+    remaining = len(sequence)
+    if remaining != sum(counts):
+        raise ValueError("The sequence does not use every symbol of the multiset")
+    rank = 0
+    for value in sequence:
+        index = position.get(value)
+        if index is None or not counts[index]:
+            raise ValueError(f"{value!r} appears more often than the multiset allows")
+        rank += total * sum(counts[:index]) // remaining
+        total = total * counts[index] // remaining
+        counts[index] -= 1
+        remaining -= 1
+    return rank
+
+def unrank_multiset(rank, symbol_counts, total):
+    """
+    Rebuilds the arrangement of a multiset with the given rank, the inverse of rank_multiset.
+
+    At every position the symbol is the one whose running count of smaller symbols brackets
+    rank * remaining // total.
+
+    Parameters:
+    - rank (int): The rank, from 0 to total - 1.
+    - symbol_counts (tuple of tuples): The sorted (symbol, count) pairs of the multiset.
+    - total (int): The number of distinct arrangements of the multiset.
+
+    Returns:
+    - list: The arrangement.
+    """
+    symbols = [symbol for symbol, _ in symbol_counts]
+    counts = [count for _, count in symbol_counts]
+    remaining = sum(counts)
+    sequence = []
+    while remaining:
+        target = rank * remaining // total
+        smaller = 0
+        index = 0
+        while smaller + counts[index] <= target:
+            smaller += counts[index]
+            index += 1
+        rank -= total * smaller // remaining
+        total = total * counts[index] // remaining
+        sequence.append(symbols[index])
+        counts[index] -= 1
+        remaining -= 1
+    return sequence
+
+def encode_board(board_words):
+    """
+    Maps a board to its integer code.
+
+    The code combines the rank of the tile arrangement, the rank of the numbers in reading order and the mode,
+    so that every board of every mode has its own code.
+
+    Parameters:
+    - board_words (list of lists of str): The board in text format.
+
+    Returns:
+    - int: The board code.
+
+    Raises:
+    - ValueError: If the board does not use exactly the tiles and numbers of a mode.
+    """
+    row_lengths = [len(row) for row in board_words]
+    mode = next((mode for mode in MODES if BOARD_DATA[mode]['row_lengths'] == row_lengths), None)
+    if mode is None:
+        raise ValueError(f"No mode has rows of length {row_lengths}")
+    tables = code_tables(mode)
+
+    cells = [cell.partition('-') for row in board_words for cell in row]
+    tiles = [RESOURCE_NAMES.index(resource) for resource, _, _ in cells]
+    numbers = [int(number) for _, _, number in cells if number]
+
+    tile_rank = rank_multiset(tiles, tables['tile_counts'], tables['tile_total'])
+    number_rank = rank_multiset(numbers, tables['number_counts'], tables['number_total'])
+    return (tile_rank * tables['number_total'] + number_rank) * len(MODES) + MODES.index(mode)
+
+def decode_board(code):
+    """
+    Rebuilds a board directly from its integer code.
+
+    Parameters:
+    - code (int): The board code, as returned by encode_board.
+
+    Returns:
+    - board_words (list of lists of str): The board in text format.
+    - ports (list of tuples): The port locations of its mode.
+    - colors (list of str): The port colors of its mode.
+
+    Raises:
+    - ValueError: If the code does not belong to any board.
+    """
+    rank, mode_index = divmod(code, len(MODES))
+    mode = MODES[mode_index]
+    tables = code_tables(mode)
+    if not 0 <= rank < tables['count']:
+        raise ValueError(f"{code} is not a board code")
+
+    tile_rank, number_rank = divmod(rank, tables['number_total'])
+    tiles = unrank_multiset(tile_rank, tables['tile_counts'], tables['tile_total'])
+    numbers = iter(unrank_multiset(number_rank, tables['number_counts'], tables['number_total']))
+
+    # Build the text board row by row, the numbers go onto every hex that is not a desert
+    mode_data = BOARD_DATA[mode]
+    board_words = []
+    tiles_iter = iter(tiles)
+    for row_length in mode_data['row_lengths']:
+        row = []
+        for _ in range(row_length):
+            tile = next(tiles_iter)
+            row.append(f"{RESOURCE_NAMES[tile]}-{next(numbers)}" if tile else RESOURCE_NAMES[tile])
+        board_words.append(row)
+    return board_words, mode_data['ports'], mode_data['colors']
+
+def code_mode(code):
+    """
+    Parameters:
+    - code (int): A board code.
+
+    Returns:
+    - str: The game mode of the board the code describes.
+    """
+    return MODES[code % len(MODES)]
+
+def code_bytes(mode):
+    """
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - int: The number of bytes that holds any code of the mode, 11 for Regular and 18 for Expansion.
+    """
+    return ((code_tables(mode)['count'] * len(MODES) - 1).bit_length() + 7) // 8
+
+def code_to_text(code):
+    """
+    Parameters:
+    - code (int): A board code.
+
+    Returns:
+    - str: The code written in base 32 with ALPHABET.
+    """
+    digits = []
+    while True:
+        code, digit = divmod(code, 32)
+        digits.append(ALPHABET[digit])
+        if not code:
+            return ''.join(reversed(digits))
+
+def text_to_code(text):
+    """
+    Reads a base 32 code, ignoring case, spaces and dashes.
+
+    Parameters:
+    - text (str): The code as shown by code_to_text.
+
+    Returns:
+    - int: The board code.
+
+    Raises:
+    - ValueError: If the text contains a character outside ALPHABET.
+    """
+    code = 0
+    cleaned = text.strip().upper().replace('-', '').replace(' ', '')
+    if not cleaned:
+        raise ValueError("Empty board code")
+    for character in cleaned:
+        digit = ALPHABET.find(ALIASES.get(character, character))
+        if digit < 0:
+            raise ValueError(f"Invalid character {character!r} in board code")
+        code = code * 32 + digit
+    return code
@@ -0,0 +1,356 @@
+### Catan Board Randomizer ###
+###    Board Constraints     ###
+
+# Import Necessary Packages
+import random # Library for generating random numbers and choices
+import time # Timing of every constraint check
+import catan_stats # Optional hot path statistics
+from catan_core import BOARD_DATA, RESOURCE_NAMES, get_topology # Layout data and hex topology
+from catan_topology import RED_NUMBERS # Numbers that may not sit next to each other
+
+def centre_order(topology):
+    """
+    Parameters:
+    - topology (BoardTopology): The layout's precomputed hex index.
+
+    Returns:
+    - list of int: The hex indices sorted from the middle of the board outwards, ties in reading order.
+    """
+    # Distances are measured on the doubled grid, where rows are sqrt(3) apart for every two doubled columns
+    mean_x = sum(x for x, _ in topology.doubled) / topology.hex_count
+    mean_r = sum(r for _, r in topology.doubled) / topology.hex_count
+    return sorted(range(topology.hex_count),
+                  key=lambda i: ((topology.doubled[i][0] - mean_x) ** 2 + 3 * (topology.doubled[i][1] - mean_r) ** 2, i))
+
+class Constraint:
+    """
+    A declarative board rule.
+
+    Subclasses say which assignment they react to in 'phase' ("resources" or "numbers") and build a check in
+    compile(). The check is called as soon as a hex gets its resource or number, and only looks at that hex and
+    the hexes already assigned around it, so a board that breaks the rule is dropped at the first bad hex instead
+    of after it is complete. Checks in the "numbers" phase may read where the deserts are but no other resources.
+    """
+    name = 'constraint'
+    phase = 'numbers'
+    pins_deserts = False # True if the rule leaves only one possible set of desert hexes
+
+    def compile(self, topology, mode_data):
+        """
+        Builds the check for one layout.
+
+        Parameters:
+        - topology (BoardTopology): The layout's precomputed hex and vertex index.
+        - mode_data (dict): The layout's entry in BOARD_DATA.
+
+        Returns:
+        - callable: check(index, resources, tokens) -> bool, called after hex 'index' is assigned. Unassigned
+          hexes hold None in 'resources' and 'tokens'; deserts hold resource 0 and token 0.
+        """
+        raise NotImplementedError
+
+class NoAdjacentNumbers(Constraint):
+    """
+    No two neighbouring hexes may both hold a number from 'numbers', such as the 6's and 8's, or the 2's and 12's.
+    """
+    phase = 'numbers'
+
+    def __init__(self, numbers=RED_NUMBERS):
+        self.numbers = frozenset(numbers)
+        self.name = f"no adjacent {'/'.join(str(number) for number in sorted(self.numbers))}"
+
+    def compile(self, topology, mode_data):
+        numbers = self.numbers
+        neighbours = topology.neighbours
+
+        def check(index, resources, tokens):
+            if tokens[index] not in numbers:
+                return True
+            return not any(tokens[neighbour] in numbers for neighbour in neighbours[index])
+        return check
+
+class NoAdjacentSameNumber(Constraint):
+    """
+    No two neighbouring hexes may hold the same number.
+    """
+    name = 'no adjacent identical numbers'
+    phase = 'numbers'
+
+    def compile(self, topology, mode_data):
+        neighbours = topology.neighbours
+
+        def check(index, resources, tokens):
+            token = tokens[index]
+            return not token or all(tokens[neighbour] != token for neighbour in neighbours[index])
+        return check
+
+class MaxTouchingResource(Constraint):
+    """
+    No group of touching hexes with the same resource may be larger than 'limit'.
+    """
+    phase = 'resources'
+
+    def __init__(self, limit=2):
+        self.limit = limit
+        self.name = f"at most {limit} touching same-resource hexes"
+
+    def compile(self, topology, mode_data):
+        limit = self.limit
+        neighbours = topology.neighbours
+
+        def check(index, resources, tokens):
+            resource = resources[index]
+            if not resource:
+                return True
+
+            # Walk the group of touching hexes with this resource, stopping as soon as it is too large
+            group = {index}
+            frontier = [index]
+            while frontier:
+                for neighbour in neighbours[frontier.pop()]:
+                    if neighbour not in group and resources[neighbour] == resource:
+                        group.add(neighbour)
+                        if len(group) > limit:
+                            return False
+                        frontier.append(neighbour)
+            return True
+        return check
+
+class DesertInCenter(Constraint):
+    """
+    The deserts must sit on the hexes closest to the middle of the board.
+    """
+    name = 'desert in the centre'
+    phase = 'resources'
+    pins_deserts = True
+
+    def compile(self, topology, mode_data):
+        centre = frozenset(centre_order(topology)[:mode_data['tiles'].count(0)])
+
+        def check(index, resources, tokens):
+            return (resources[index] == 0) == (index in centre)
+        return check
+
+# Named rules for the command line tools
+RULES = {
+    'no-adjacent-6-8': lambda: NoAdjacentNumbers(RED_NUMBERS),
+    'no-adjacent-2-12': lambda: NoAdjacentNumbers((2, 12)),
+    'no-adjacent-same-number': NoAdjacentSameNumber,
+    'max-2-touching-resource': lambda: MaxTouchingResource(2),
+    'desert-in-center': DesertInCenter,
+}
+
+class ConstraintSet:
+    """
+    A set of constraints compiled per layout, with a generator that prunes partial boards.
+
+    The generator draws the tiles hex by hex, then the numbers hex by hex, exactly like shuffling them for
+    new_board, and runs the checks after every draw. Hexes are filled from the middle outwards, so neighbours are
+    assigned early and conflicts show up after only a few draws. A board is abandoned at the first broken rule and
+    a new one is started from scratch, which keeps the uniform distribution of rejection sampling while skipping
+    most of the work on bad boards.
+    The 6 and 8 rule of is_valid_board is always included.
+
+    Attributes:
+    - constraints (list of Constraint): The rules, in evaluation order.
+    - stats (dict): Per constraint name, the number of 'evaluations', 'rejections' and total 'seconds'.
+    """
+
+    def __init__(self, constraints=()):
+        self.constraints = [NoAdjacentNumbers(RED_NUMBERS)]
+        for constraint in constraints:
+            if constraint.name != self.constraints[0].name:
+                self.constraints.append(constraint)
+        self.stats = {constraint.name: {'evaluations': 0, 'rejections': 0, 'seconds': 0.0}
+                      for constraint in self.constraints}
+        self._compiled = {}
+
+    def _checks(self, mode):
+        """
+        Parameters:
+        - mode (str): The game mode.
+
+        Returns:
+        - dict: For each phase, a list of (stats entry, check) pairs compiled for the mode's layout, the hex fill
+          'order', and whether the deserts are pinned to fixed hexes.
+        """
+        if mode not in self._compiled:
+            topology = get_topology(mode)
+            phases = {'resources': [], 'numbers': [], 'order': centre_order(topology),
+                      'deserts_pinned': any(constraint.pins_deserts for constraint in self.constraints)}
+            for constraint in self.constraints:
+                check = constraint.compile(topology, BOARD_DATA[mode])
+                phases[constraint.phase].append((self.stats[constraint.name], check))
+            self._compiled[mode] = phases
+        return self._compiled[mode]
+
+    def _passes(self, checks, index, resources, tokens):
+        """
+        Runs the checks of one phase for a newly assigned hex and records their statistics.
+
+        Returns:
+        - bool: True if every check passes.
+        """
+        for stats, check in checks:
+            start = time.perf_counter()
+            ok = check(index, resources, tokens)
+            stats['seconds'] += time.perf_counter() - start
+            stats['evaluations'] += 1
+            if not ok:
+                stats['rejections'] += 1
+                return False
+        return True
+
+    def check_tokens(self, mode, resources, tokens):
+        """
+        Checks a complete board given as flat resource ids and number tokens.
+
+        Parameters:
+        - mode (str): The game mode.
+        - resources (list of int): The resource id on every hex in index order.
+        - tokens (list of int): The number on every hex in index order, 0 on the desert.
+
+        Returns:
+        - bool: True if the board satisfies every constraint.
+        """
+        checks = self._checks(mode)
+        return all(self._passes(checks[phase], index, resources, tokens)
+                   for phase in ('resources', 'numbers') for index in range(len(resources)))
+
+    def __call__(self, board_words, mode):
+        """
+        Checks a complete board in 'board_words' format.
+
+        The mode is given rather than looked up from the row lengths, which custom layouts may share with a
+        built-in one while placing the deserts or ports differently.
+
+        Parameters:
+        - board_words (list of lists of str): The board in text format.
+        - mode (str): The game mode the board belongs to.
+
+        Returns:
+        - bool: True if the board satisfies every constraint.
+
+        Raises:
+        - ValueError: If the board does not have the rows of the mode's layout.
+        """
+        if [len(row) for row in board_words] != BOARD_DATA[mode]['row_lengths']:
+            raise ValueError(f"The board does not have the rows of a {mode} board")
+        cells = [cell.partition('-') for row in board_words for cell in row]
+        return self.check_tokens(mode, [RESOURCE_NAMES.index(resource) for resource, _, _ in cells],
+                                 [int(token or 0) for _, _, token in cells])
+
+    def generate(self, mode="Regular", rng=None, max_attempts=None):
+        """
+        Generates a board satisfying every constraint, pruning partial boards as soon as a rule breaks.
+
+        Parameters:
+        - mode (str): The game mode ("Regular" or "Expansion").
+        - rng (random.Random, optional): The random number generator to use. Defaults to the module level
+          generator of the 'random' library.
+        - max_attempts (int, optional): Give up after this many abandoned boards. Unlimited by default.
+
+        Returns:
+        - board_words (list of lists of str): The board in text format.
+        - ports (list of tuples): The port locations.
+        - colors (list of str): The port colors.
+
+        Raises:
+        - RuntimeError: If no board was found within 'max_attempts'.
+        """
+        if rng is None:
+            rng = random # Fall back to the shared module level generator
+
+        mode_data = BOARD_DATA[mode]
+        checks = self._checks(mode)
+        hex_count = sum(mode_data['row_lengths'])
+        order = checks['order']
+        attempts = 0
+
+        while max_attempts is None or attempts < max_attempts:
+            attempts += 1
+            resources = [None] * hex_count
+            tokens = [None] * hex_count
+
+            # Draw the tiles one hex at a time, like a shuffle, checking the resource rules after each draw
+            tiles = list(mode_data['tiles'])
+            ok = True
+            for index in order:
+                pick = rng.randrange(len(tiles))
+                tiles[pick], tiles[-1] = tiles[-1], tiles[pick]
+                resources[index] = tiles.pop()
+                if resources[index] == 0:
+                    tokens[index] = 0
+                if not self._passes(checks['resources'], index, resources, tokens):
+                    ok = False
+                    break
+            if not ok:
+                continue
+
+            # Draw the numbers for every hex that is not a desert. The number rules only see the tiles through
+            # where the deserts are, so when a rule pins the deserts every accepted tile layout admits the same
+            # number draws and only the numbers need to be drawn again after a failure
+            while not self._draw_numbers(mode_data, checks, resources, tokens, rng):
+                if not checks['deserts_pinned'] or (max_attempts is not None and attempts >= max_attempts):
+                    ok = False
+                    break
+                attempts += 1
+            if not ok:
+                continue
+
+            # Build the text board row by row
+            board_words = []
+            index = 0
+            for row_length in mode_data['row_lengths']:
+                row = []
+                for _ in range(row_length):
+                    resource = RESOURCE_NAMES[resources[index]]
+                    row.append(f"{resource}-{tokens[index]}" if resources[index] else resource)
+                    index += 1
+                board_words.append(row)
+            if catan_stats.enabled:
+                catan_stats.observe('constraint attempts', attempts)
+            return board_words, mode_data['ports'], mode_data['colors']
+
+        raise RuntimeError(f"No board satisfying the constraints found in {max_attempts} attempts")
+
+    def _draw_numbers(self, mode_data, checks, resources, tokens, rng):
+        """
+        Draws the numbers onto the hexes that are not deserts, checking the number rules after each draw.
+
+        Returns:
+        - bool: True if every number was placed; False if a rule broke, with the numbers cleared again.
+        """
+        numbers = list(mode_data['numbers_list'])
+        for index in checks['order']:
+            if resources[index] == 0:
+                continue
+            pick = rng.randrange(len(numbers))
+            numbers[pick], numbers[-1] = numbers[-1], numbers[pick]
+            tokens[index] = numbers.pop()
+            if not self._passes(checks['numbers'], index, resources, tokens):
+                for index in checks['order']:
+                    if resources[index] != 0:
+                        tokens[index] = None
+                return False
+        return True
+
+    def report(self):
+        """
+        Summarises how often every constraint ran, how often it rejected a board, and what it cost.
+
+        Returns:
+        - list of dicts: Per constraint, its 'name', 'evaluations', 'rejections', 'rejection_rate' and mean
+          'microseconds' per evaluation.
+        """
+        rows = []
+        for name, stats in self.stats.items():
+            evaluations = stats['evaluations']
+            rows.append({
+                'name': name,
+                'evaluations': evaluations,
+                'rejections': stats['rejections'],
+                'rejection_rate': stats['rejections'] / evaluations if evaluations else 0.0,
+                'microseconds': stats['seconds'] / evaluations * 1e6 if evaluations else 0.0,
+            })
+        return rows
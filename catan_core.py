@@ -0,0 +1,555 @@
+### Catan Board Randomizer ###
+###   Headless Board Core    ###
+
+# Import Necessary Packages
+import random # Library for generating random numbers and choices
+from functools import partial # Binds the attempt limit of constrained generators
+from math import comb # Desert choices per red placement
+from catan_layouts import RESOURCE_NAMES, build_layout, load_builtin_layouts # Layout files
+from catan_topology import RED_NUMBERS, topology_for_rows # Precomputed hex coordinates and neighbours
+import catan_stats # Optional hot path timings
+
+# Dictionaries to hold the different data for each mode, loaded from the layout files
+BOARD_DATA = load_builtin_layouts()
+
+# Names of the supported game modes
+MODES = tuple(BOARD_DATA)
+
+# Descriptions of the custom layouts added with register_layout, keyed by mode, so they can be registered again
+# in another process
+LAYOUT_SPECS = {}
+
+# Largest size in bytes the packed placement counts of one layout may take. The counts grow about 1.6 times with
+# every hex of the widest row: a radius 9 hexagon (19 hexes wide) needs about 1.3 GiB, a radius 10 one 5.7 GiB
+PLACEMENT_BUDGET = 1 << 31
+
+def get_topology(mode):
+    """
+    Returns the precomputed topology of a game mode's layout.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - BoardTopology: The hex coordinates and neighbour index shared by every board of the mode.
+    """
+    return topology_for_rows(tuple(BOARD_DATA[mode]['row_lengths']))
+
+def is_valid_board(board):
+    """
+    Validates the board configuration for a game which follows the rule that tiles numbered '6' or '8'
+    must not be adjacent to each other on a hexagonal grid.
+
+    The board is converted once into a flat list of number tokens, and the check is done with the frozen
+    neighbour index of the board's layout, so every hex is compared with the six hexes around it exactly
+    as draw_board_gui places them.
+
+    Parameters:
+    - board (list of lists of str): A 2D list representing the game board, where each inner list is a row
+      of tiles on the board, and each tile is represented by a string with the format "resource-number".
+
+    Returns:
+    - bool: True if the board configuration is valid, meaning no '6' or '8' tiles are adjacent;
+      False otherwise.
+    """
+    topology = topology_for_rows(tuple(len(row) for row in board))
+    return topology.is_valid(topology.tokens(board))
+
+class PlacementDP:
+    """
+    Exact counts and uniform samples of desert and 6/8 placements, by dynamic programming over the hexes.
+
+    The hexes are swept in reading order, row by row. After hex h, the only thing the rest of the board needs to
+    know is which of the swept hexes that still have unswept neighbours hold a red number: the frontier, which is
+    never much longer than one row. Each step is therefore a small transfer from the frontier states before a hex
+    to those after it, where the hex either stays plain or takes a red number if no frontier neighbour holds one.
+
+    A backward sweep stores, for every hex and frontier state, how many ways the remaining hexes can take each
+    number of remaining red numbers. The counts for 0 to 'reds' red numbers are packed into one integer, 'width'
+    bits per count, so a step is one addition and one shift. Sampling then walks forward once and picks each
+    option with probability proportional to its count, so every valid placement is equally likely and nothing is
+    ever rejected.
+
+    Building the tables costs one step per hex and frontier state, and the number of frontier states grows about
+    1.6 times with every hex of the widest row, so they are built once per layout and layouts whose tables would
+    outgrow PLACEMENT_BUDGET are refused. Drawing a placement afterwards costs one step per hex.
+
+    Deserts never take a number and may go on any hex without a red number, so every red placement leaves the
+    same C(hexes - reds, deserts) desert choices. They are drawn uniformly after the red hexes.
+
+    Attributes:
+    - topology (BoardTopology): The layout.
+    - reds (int): The number of red numbers to place.
+    - deserts (int): The number of deserts to place.
+    - width (int): The bits per packed count.
+    - red_count (int): The number of valid red placements.
+    - count (int): The number of valid (desert hexes, red hexes) placements.
+
+    Raises:
+    - ValueError: If the tables of the layout would take more than PLACEMENT_BUDGET bytes.
+    """
+
+    def __init__(self, topology, reds, deserts=0):
+        self.topology = topology
+        self.reds = reds
+        self.deserts = deserts
+        hex_count = topology.hex_count
+
+        # Hexes stay on the frontier until their last neighbour has been swept
+        last_neighbour = [max(neighbours, default=-1) for neighbours in topology.neighbours]
+        leaving = [[] for _ in range(hex_count)]
+        for hex_index, last in enumerate(last_neighbour):
+            leaving[max(last, hex_index)].append(hex_index)
+        keep = []
+        frontier = 0
+        for hex_index in range(hex_count):
+            frontier |= 1 << hex_index
+            for swept in leaving[hex_index]:
+                frontier &= ~(1 << swept)
+            keep.append(frontier)
+
+        # Bits k * width onwards of a packed count hold the count for k red numbers. No count exceeds the number
+        # of ways to pick k of the hexes
+        self.width = width = max(comb(hex_count, k) for k in range(reds + 1)).bit_length()
+
+        # Forward sweep: the frontier states that can occur before every hex, and where each option leads
+        states = {0: 0}
+        table_bytes = 0
+        self._moves = []
+        for hex_index in range(hex_count):
+            after = {}
+            moves = []
+            for state in states:
+                plain = after.setdefault(state & keep[hex_index], len(after))
+                red = -1
+                if not state & topology.neighbour_masks[hex_index]:
+                    red = after.setdefault((state | 1 << hex_index) & keep[hex_index], len(after))
+                moves.append((plain, red))
+            self._moves.append(moves)
+            states = after
+            table_bytes += len(states) * (reds + 1) * width // 8
+        if table_bytes > PLACEMENT_BUDGET:
+            raise ValueError(f"The layout is too wide for exact placement tables, they would take "
+                             f"{table_bytes / 2 ** 30:.1f} GiB")
+
+        # Backward sweep: ways[h][s] packs the completions of hexes h.. from state s for every number of red
+        # numbers left
+        full = (1 << (reds + 1) * width) - 1
+        self._ways = [None] * hex_count + [[1] * len(states)]
+        for hex_index in reversed(range(hex_count)):
+            after = self._ways[hex_index + 1]
+            self._ways[hex_index] = [after[plain] + (after[red] << width & full if red >= 0 else 0)
+                                     for plain, red in self._moves[hex_index]]
+
+        self.red_count = self._count(0, 0, reds)
+        self.count = self.red_count * comb(hex_count - reds, deserts)
+
+    def _count(self, hex_index, state, reds):
+        """
+        Returns:
+        - int: The completions of hexes 'hex_index'.. from frontier state 'state' with 'reds' red numbers left.
+        """
+        return self._ways[hex_index][state] >> reds * self.width & (1 << self.width) - 1
+
+    def sample_reds(self, rng=None):
+        """
+        Draws one valid set of red hexes uniformly at random.
+
+        Hexes are decided in order, and each one that no red neighbour blocks takes a red number if
+        rng.randrange(completions from here) falls below the completions that make it red.
+
+        Parameters:
+        - rng (random.Random, optional): The random number generator to use. Defaults to the module level
+          generator of the 'random' library.
+
+        Returns:
+        - list of int: The hexes taking a 6 or an 8, in index order.
+
+        Raises:
+        - ValueError: If the red numbers do not fit on the layout.
+        """
+        if not self.red_count:
+            raise ValueError("The red numbers do not fit on the layout")
+        if rng is None:
+            rng = random # Fall back to the shared module level generator
+
+        state, reds = 0, self.reds
+        red_hexes = []
+        for hex_index, moves in enumerate(self._moves):
+            if not reds:
+                break
+            plain, red = moves[state]
+            if red >= 0 and rng.randrange(self._count(hex_index, state, reds)) < self._count(hex_index + 1, red,
+                                                                                             reds - 1):
+                red_hexes.append(hex_index)
+                state, reds = red, reds - 1
+            else:
+                state = plain
+        return red_hexes
+
+    def sample(self, rng=None):
+        """
+        Draws one valid placement uniformly at random.
+
+        Parameters:
+        - rng (random.Random, optional): The random number generator to use. Defaults to the module level
+          generator of the 'random' library.
+
+        Returns:
+        - desert_hexes (tuple of int): The desert hexes, in index order.
+        - red_hexes (tuple of int): The hexes taking a 6 or an 8, in index order.
+
+        Raises:
+        - ValueError: If the layout has no valid placement.
+        """
+        if rng is None:
+            rng = random # Fall back to the shared module level generator
+        red_hexes = self.sample_reds(rng)
+        taken = set(red_hexes)
+        free = [hex_index for hex_index in range(self.topology.hex_count) if hex_index not in taken]
+        return tuple(sorted(rng.sample(free, self.deserts))), tuple(red_hexes)
+
+    def placements(self):
+        """
+        Lists every valid set of red hexes, in lexicographic order, without visiting dead ends.
+
+        Yields:
+        - tuple of int: The red hexes of each placement, in index order.
+        """
+        chosen = []
+        def extend(hex_index, state, reds):
+            if not reds:
+                yield tuple(chosen)
+                return
+            plain, red = self._moves[hex_index][state]
+            # Hexes are visited only while some completion is left, so every branch ends in a placement
+            if red >= 0 and self._count(hex_index + 1, red, reds - 1):
+                chosen.append(hex_index)
+                yield from extend(hex_index + 1, red, reds - 1)
+                chosen.pop()
+            if self._count(hex_index + 1, plain, reds):
+                yield from extend(hex_index + 1, plain, reds)
+        if self.red_count:
+            yield from extend(0, 0, self.reds)
+
+# Cache of the precomputed placement tables for each mode
+_placement_tables = {}
+
+def placement_table(mode):
+    """
+    Builds, once per mode, the tables used by new_valid_board to place the red numbers directly.
+
+    Every valid set of red hexes leaves the same number of hexes for the deserts, so the red hexes can be drawn
+    first and the deserts afterwards without changing the distribution of boards.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - dict: The layout's PlacementDP 'dp', the number of red numbers 'reds' and of deserts 'deserts'.
+    """
+    if mode not in _placement_tables:
+        mode_data = BOARD_DATA[mode]
+        reds = sum(1 for number in mode_data['numbers_list'] if number in RED_NUMBERS)
+        deserts = mode_data['tiles'].count(0)
+        _placement_tables[mode] = {
+            'dp': PlacementDP(get_topology(mode), reds, deserts),
+            'reds': reds,
+            'deserts': deserts,
+        }
+    return _placement_tables[mode]
+
+def register_layout(spec):
+    """
+    Adds a custom layout as a new game mode for new_board, new_valid_board and everything built on them.
+
+    Custom modes are not part of MODES, which numbers the board codes, so the codes of the built-in boards
+    stay the same.
+
+    Parameters:
+    - spec (dict): A layout description, see catan_layouts.build_layout, e.g. from hexagon_layout.
+
+    Returns:
+    - str: The name of the new mode.
+
+    Raises:
+    - ValueError: If the name is taken by a built-in mode or the layout is inconsistent.
+    """
+    layout = build_layout(spec)
+    name = layout.pop('name')
+    if name in MODES:
+        raise ValueError(f"{name} is a built-in mode")
+    BOARD_DATA[name] = layout
+    LAYOUT_SPECS[name] = spec
+    _placement_tables.pop(name, None) # Drop the tables of a layout registered earlier under the same name
+    return name
+
+def draw_red_hexes(table, rng):
+    """
+    Draws the hexes taking a 6 or an 8 so that no two of them are neighbours.
+
+    The hexes are walked in order and each takes a red number with probability equal to the share of remaining
+    valid placements that use it, as counted by the layout's PlacementDP, so every valid placement is equally
+    likely on layouts of any size.
+
+    Parameters:
+    - table (dict): The tables of the layout from placement_table.
+    - rng (random.Random): The random number generator to use.
+
+    Returns:
+    - list of int: The red hexes.
+
+    Raises:
+    - ValueError: If no placement of the red numbers fits on the layout.
+    """
+    return table['dp'].sample_reds(rng)
+
+def populate_tiles(tiles, row_lengths):
+    """
+    Populate the board with tiles based on the specified row lengths.
+
+    Parameteres:
+    - tiles (list): A list of tile identifiers that should be randomly placed on the board.
+    - row_lengths (list): A list indicating how many tiles should be in each row.
+
+    Returns:
+    - list: A 2D list representing the board with populated tiles.
+    """
+    board = []  # Initialize an empty board
+    for row_length in row_lengths:
+        row = []  # Initialize an empty row
+        # Continue to add tiles to the current row until it reaches the specified length
+        while len(row) < row_length:
+            tile = tiles.pop()  # Remove a tile from the end of the list
+            row.append(tile)  # Add the tile to the current row
+        board.append(row)  # Add the completed row to the board
+    return board  # Return the fully populated board
+
+def translate_to_text(board_list, rows):
+    """
+    Translates a board list with numeric representations into a list of text representations.
+
+    Each number in the board_list corresponds to a resource or tile, which is represented as a string:
+    - 0 corresponds to 'desert'
+    - 1 corresponds to 'wheat'
+    - 2 corresponds to 'wood'
+    - 3 corresponds to 'sheep'
+    - 4 corresponds to 'brick'
+    - 5 corresponds to 'ore'
+
+    The function constructs a 2D list where each numeric value from the original board_list is replaced
+    with its corresponding text representation, based on the position of the resource in 'RESOURCE_NAMES'.
+
+    Parameters:
+    - board_list (list of lists of int): 2D list of integers where each integer represents a specific type of resource.
+    - rows (int): Integer representing the number of rows in the board list.
+
+    Returns:
+    A 2D list of strings where each string represents the name of a resource.
+    """
+
+    board_text = [] # Initialize an empty list to hold the translated board text.
+
+    # Create an empty sublist for each row in the board.
+    for i in range(rows):
+        board_text.append([]) # Begin with an empty row.
+
+    # Go through each cell in the 2D board list.
+    for i in range(rows):
+        for j in range(len(board_list[i])):
+            # Translate the numeric representation to text and add to the board text.
+            board_text[i].append(RESOURCE_NAMES[board_list[i][j]])
+
+    # Return the fully translated board text list.
+    return board_text
+
+def add_numbers(board, numbers_list):
+    """
+    Add numbers to each tile on the board except for the desert tiles.
+
+    Parameters:
+    - board (list): A 2D list representing the board with populated tiles.
+    - numbers_list (list): A list of numbers that need to be placed on the board.
+
+    Returns:
+    - list: A 2D list representing the board with numbers added to the tiles.
+    """
+    numbers_iter = iter(numbers_list)  # Create an iterator from the numbers list
+    for row in board:
+        for index, tile in enumerate(row):
+            if tile != 'desert':  # Check if the tile is not a desert
+                # Try to get a number from the iterator and add it to the tile, if no numbers left, break the loop
+                try:
+                    number = next(numbers_iter)
+                except StopIteration:
+                    break
+                row[index] = f"{tile}-{number}"  # Concatenate the tile type and the number with a dash
+    return board  # Return the board with numbers added
+
+def new_board(mode="Regular", rng=None):
+    """
+    Generates a new board configuration with random tile and number placement. This function supports
+    creating a board for either the Regular or Expansion game mode, selected by the 'mode' argument.
+
+    Each game mode has a predefined set of tiles (with quantities and types), numbers for the tiles,
+    lengths of each row of the board to construct the appropriate hexagonal shape, and predefined port
+    locations with their associated colors, all held in 'BOARD_DATA'.
+
+    The function randomizes copies of the tiles and numbers to provide a unique board configuration each
+    time. It then populates the board with tiles, converts the tiles to a text representation, and
+    finally, adds the numbers to the board.
+
+    Parameters:
+    - mode (str): The game mode to generate a board for ("Regular" or "Expansion").
+    - rng (random.Random, optional): The random number generator to shuffle with. Defaults to the
+      module level generator of the 'random' library.
+
+    Returns:
+    - board_words (list of lists of str): A 2D list representing the board with populated tiles and
+      assigned numbers in a text format.
+    - ports (list of tuples): A list of tuples with floating-point values representing the coordinates
+      for the ports.
+    - colors (list of strings): A list of strings representing the colors for the ports.
+    """
+
+    if rng is None:
+        rng = random # Fall back to the shared module level generator
+
+    mode_data = BOARD_DATA[mode]  # Get data based on the requested mode.
+    ports = mode_data['ports'] # Define port locations
+    colors = mode_data['colors'] # Define port colors
+
+    # Copy the lists so the shared layout data is never modified
+    tiles = list(mode_data['tiles'])
+    numbers_list = list(mode_data['numbers_list'])
+
+    # Randomize the lists
+    rng.shuffle(tiles)
+    rng.shuffle(numbers_list)
+
+    # Populate the board with tiles
+    board = populate_tiles(tiles, mode_data['row_lengths'])
+
+    # Translate to text representation
+    board_words = translate_to_text(board, len(mode_data['row_lengths']))
+
+    # Add numbers to the board
+    add_numbers(board_words, numbers_list)
+
+    return board_words, ports, colors
+
+def new_valid_board(mode="Regular", rng=None):
+    """
+    Generates a board that already satisfies is_valid_board, without retrying whole boards.
+
+    The 6's and 8's are placed first by draw_red_hexes, and the deserts are then drawn uniformly from the hexes
+    without a red number. Finally the remaining numbers and resources are shuffled onto the free hexes. This gives
+    exactly the same distribution of boards as calling new_board until is_valid_board passes, in a single pass
+    whose cost grows linearly with the number of hexes once placement_table has been built for the mode.
+
+    Parameters:
+    - mode (str): The game mode to generate a board for ("Regular" or "Expansion").
+    - rng (random.Random, optional): The random number generator to use. Defaults to the module level
+      generator of the 'random' library.
+
+    Returns:
+    - board_words (list of lists of str): A 2D list representing the valid board in text format.
+    - ports (list of tuples): A list of tuples with floating-point values representing the coordinates
+      for the ports.
+    - colors (list of strings): A list of strings representing the colors for the ports.
+    """
+
+    if rng is None:
+        rng = random # Fall back to the shared module level generator
+
+    mode_data = BOARD_DATA[mode]
+    table = placement_table(mode)
+    hex_count = table['dp'].topology.hex_count
+
+    # Place the red hexes, then the deserts on any hex left without a red number
+    red_hexes = draw_red_hexes(table, rng)
+    is_red = [False] * hex_count
+    for hex_index in red_hexes:
+        is_red[hex_index] = True
+    is_desert = [False] * hex_count
+    for hex_index in rng.sample([hex_index for hex_index in range(hex_count) if not is_red[hex_index]],
+                                table['deserts']):
+        is_desert[hex_index] = True
+
+    # Shuffle the 6's and 8's onto the red hexes and every other number onto the remaining hexes
+    red_numbers = [number for number in mode_data['numbers_list'] if number in RED_NUMBERS]
+    other_numbers = [number for number in mode_data['numbers_list'] if number not in RED_NUMBERS]
+    rng.shuffle(red_numbers)
+    rng.shuffle(other_numbers)
+    numbers = [0] * hex_count
+    for hex_index, number in zip(red_hexes, red_numbers):
+        numbers[hex_index] = number
+    other_numbers_iter = iter(other_numbers)
+    for hex_index in range(hex_count):
+        if not is_desert[hex_index] and not numbers[hex_index]:
+            numbers[hex_index] = next(other_numbers_iter)
+
+    # Shuffle the remaining resources onto every hex that is not a desert
+    resources = [tile for tile in mode_data['tiles'] if tile != 0]
+    rng.shuffle(resources)
+    resources_iter = iter(resources)
+    tiles = [0 if is_desert[hex_index] else next(resources_iter) for hex_index in range(hex_count)]
+
+    # Build the text board row by row
+    board_words = []
+    hex_index = 0
+    for row_length in mode_data['row_lengths']:
+        row = []
+        for _ in range(row_length):
+            resource = RESOURCE_NAMES[tiles[hex_index]]
+            row.append(f"{resource}-{numbers[hex_index]}" if tiles[hex_index] else resource)
+            hex_index += 1
+        board_words.append(row)
+
+    return board_words, mode_data['ports'], mode_data['colors']
+
+def iter_boards(mode="Regular", seed=None, constraints=(), max_attempts=None):
+    """
+    Lazily yields valid boards forever, using constant memory.
+
+    Every board is generated from its own seed, drawn from a master generator seeded with 'seed', so any board
+    can be rebuilt later with new_valid_board(mode, random.Random(board_seed)).
+
+    Parameters:
+    - mode (str): The game mode to generate boards for ("Regular" or "Expansion").
+    - seed (int, optional): The master seed. Without it the sequence is different every run.
+    - constraints (iterable of callables, optional): Extra checks, each called with 'board_words' and returning
+      True to keep the board. Boards failing any of them are skipped. A ConstraintSet from catan_constraints
+      builds the boards itself with its pruning generator instead, and a board is then rebuilt with
+      constraints.generate(mode, random.Random(board_seed)).
+    - max_attempts (int, optional): Give up after this many rejected boards in a row, or with a ConstraintSet
+      after this many abandoned boards within one board seed. Unlimited by default.
+
+    Yields:
+    - tuple: (board_words, ports, colors, board_seed) for every valid board.
+
+    Raises:
+    - RuntimeError: If no board satisfying the constraints was found within 'max_attempts'.
+    """
+    master = random.Random(seed)
+    if hasattr(constraints, 'generate'):
+        # A constraint set only yields boards that already satisfy it, and gives up on its own
+        generate, constraints = partial(constraints.generate, max_attempts=max_attempts), ()
+    else:
+        generate, constraints = new_valid_board, tuple(constraints)
+    attempts = 0
+    while True:
+        if max_attempts is not None and attempts >= max_attempts:
+            raise RuntimeError(f"No board satisfying the constraints found in {max_attempts} attempts")
+        attempts += 1
+        board_seed = master.getrandbits(64)
+        board_words, ports, colors = generate(mode, random.Random(board_seed))
+        if all(constraint(board_words) for constraint in constraints):
+            if catan_stats.enabled:
+                catan_stats.observe('iter_boards attempts', attempts)
+            attempts = 0
+            yield board_words, ports, colors, board_seed
+
+# Generation phases timed while catan_stats is enabled
+catan_stats.register(__name__, ('new_board', 'new_valid_board', 'populate_tiles', 'translate_to_text',
+                                'add_numbers', 'is_valid_board'))
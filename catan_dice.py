@@ -0,0 +1,276 @@
+### Catan Board Randomizer ###
+###   Dice Income Simulator  ###
+
+# Import Necessary Packages
+import copy # Private copies of cached results
+import os # Used to find the number of available cores
+import time # Rolling throughput measurements
+from concurrent.futures import ProcessPoolExecutor # Pool of worker processes for many boards
+from functools import lru_cache # Caches results per board code
+import numpy as np # Array library used to roll and tally whole batches of dice at once
+from catan_batch import RESOURCES, TOKENS, words_to_batch # Batch board arrays
+from catan_codes import decode_board, encode_board # Board codes used as cache keys
+from catan_core import MODES, RESOURCE_NAMES, get_topology # Layout data and hex topology
+
+# The 36 equally likely outcomes of two dice, as their sums
+DICE_SUMS = np.add.outer(np.arange(1, 7), np.arange(1, 7)).ravel().astype(np.uint8)
+
+# Dice rolled per batch, which bounds the size of the intermediate arrays
+ROLL_BATCH = 1 << 22
+
+# Rolls simulated per board unless asked otherwise
+DEFAULT_ROLLS = 10_000_000
+
+# Games simulated per starting spot for the time to first build, and the rolls each game lasts at most
+BUILD_TRIALS = 2000
+MAX_TURNS = 100
+
+# Resources needed for every build, in the order of RESOURCE_NAMES[1:]: wheat, wood, sheep, brick, ore
+BUILD_COSTS = {
+    'road': (0, 1, 0, 1, 0),
+    'settlement': (1, 1, 1, 1, 0),
+    'city': (2, 0, 0, 0, 3),
+    'development': (1, 0, 1, 0, 1),
+}
+
+# Simulated boards kept per process, keyed by board code and settings
+CACHE_SIZE = 4096
+
+def income_table(board, mode):
+    """
+    Precomputes what every dice sum pays out, from the index of which hexes carry each number.
+
+    Parameters:
+    - board (ndarray of uint8): Shape (2, hexes), one board as in generate_batch.
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - ndarray of uint8: Shape (13, vertices, 5), the resources of every type a settlement on each vertex
+      receives when the dice show each sum, in the order of RESOURCE_NAMES[1:].
+    """
+    topology = get_topology(mode)
+    hex_vertices = np.array(topology.hex_vertices, dtype=np.intp)
+    table = np.zeros((13, topology.vertex_count, len(RESOURCE_NAMES) - 1), dtype=np.uint8)
+    resources, tokens = board[RESOURCES], board[TOKENS]
+    for number in np.unique(tokens[tokens > 0]):
+        # Every hex with this number pays one resource to each of its six corners
+        for hex_index in np.flatnonzero(tokens == number):
+            table[number, hex_vertices[hex_index], resources[hex_index] - 1] += 1
+    return table
+
+def roll_counts(rolls, rng):
+    """
+    Rolls two dice 'rolls' times in batches and tallies the sums.
+
+    Parameters:
+    - rolls (int): The number of rolls.
+    - rng (numpy.random.Generator): The random number generator.
+
+    Returns:
+    - ndarray of int64: Shape (13,), how often every sum came up.
+    """
+    counts = np.zeros(13, dtype=np.int64)
+    for start in range(0, rolls, ROLL_BATCH):
+        outcomes = rng.integers(0, 36, size=min(ROLL_BATCH, rolls - start), dtype=np.uint8)
+        counts += np.bincount(DICE_SUMS[outcomes], minlength=13)
+    return counts
+
+def time_to_build(table, rng, trials=BUILD_TRIALS, max_turns=MAX_TURNS):
+    """
+    Simulates how many rolls a single settlement needs to collect the resources of every build on its own.
+
+    All games share one set of rolls. What a vertex has collected of a resource is a weighted sum of the running
+    counts of the few sums that pay it, so the roll at which it first holds k of that resource is found once per
+    resource and k, and a build is ready at the latest of these over the resources it costs.
+
+    Parameters:
+    - table (ndarray of uint8): The income table of the board, see income_table.
+    - rng (numpy.random.Generator): The random number generator.
+    - trials (int): The number of games simulated, shared by every vertex.
+    - max_turns (int): The number of rolls a game lasts at most.
+
+    Returns:
+    - mean (dict): For every build in BUILD_COSTS, shape (vertices,), the mean number of rolls over the games
+      that finished, NaN if none did.
+    - unfinished (dict): For every build, shape (vertices,), the share of games without the build after
+      max_turns rolls.
+    """
+    sums = DICE_SUMS[rng.integers(0, 36, size=(trials, max_turns), dtype=np.uint8)]
+    counts = np.stack([np.cumsum(sums == number, axis=1, dtype=np.uint16) for number in range(13)])
+    most = max(max(cost) for cost in BUILD_COSTS.values())
+
+    vertex_count = table.shape[1]
+    mean = {build: np.full(vertex_count, np.nan) for build in BUILD_COSTS}
+    unfinished = {build: np.ones(vertex_count) for build in BUILD_COSTS}
+    for vertex in range(vertex_count):
+        # First roll at which the vertex holds k of a resource, max_turns + 1 if it never does
+        first = {}
+        for resource in range(table.shape[2]):
+            pays = table[:, vertex, resource]
+            numbers = np.flatnonzero(pays)
+            if not len(numbers):
+                continue
+            collected = np.tensordot(pays[numbers], counts[numbers], axes=1)
+            for k in range(1, most + 1):
+                reached = collected >= k
+                first[resource, k] = np.where(reached[:, -1], reached.argmax(axis=1) + 1, max_turns + 1)
+
+        for build, cost in BUILD_COSTS.items():
+            needed = [(resource, k) for resource, k in enumerate(cost) if k]
+            if any(need not in first for need in needed):
+                continue # The vertex never receives one of the resources
+            ready = np.max([first[need] for need in needed], axis=0)
+            finished = ready <= max_turns
+            unfinished[build][vertex] = 1 - finished.mean()
+            if finished.any():
+                mean[build][vertex] = ready[finished].mean()
+    return mean, unfinished
+
+def simulate(board, mode, rolls=DEFAULT_ROLLS, seed=None, trials=BUILD_TRIALS):
+    """
+    Simulates the income of every starting spot of one board.
+
+    Each roll pays a settlement on a vertex one resource per touching hex carrying the rolled number, so the
+    income of every vertex follows from the counts of each sum through the income table. The mean and variance
+    per roll come from these counts; the time to first build plays out individual games.
+
+    Parameters:
+    - board (ndarray of uint8): Shape (2, hexes), one board as in generate_batch.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - rolls (int): The number of rolls for the income estimates.
+    - seed (int or numpy.random.SeedSequence, optional): The seed of the dice.
+    - trials (int): The number of games per vertex for the time to first build.
+
+    Returns:
+    - dict: 'rolls', 'income' (shape (vertices, 5), mean resources of each type per roll), 'total' and 'variance'
+      (shape (vertices,), mean and variance of all resources per roll), 'ranking' (vertices from the highest
+      mean income down), and 'time_to_build' and 'unfinished' from time_to_build.
+    """
+    rng = np.random.default_rng(seed)
+    table = income_table(board, mode)
+    counts = roll_counts(rolls, rng)
+
+    share = counts / max(rolls, 1)
+    income = np.tensordot(share, table, axes=1)
+    per_sum = table.sum(axis=2, dtype=np.float64) # Resources of every sum, shape (13, vertices)
+    total = share @ per_sum
+    variance = share @ per_sum ** 2 - total ** 2
+    mean, unfinished = time_to_build(table, rng, trials)
+
+    return {
+        'rolls': rolls,
+        'income': income,
+        'total': total,
+        'variance': variance,
+        'ranking': np.argsort(-total, kind='stable'),
+        'time_to_build': mean,
+        'unfinished': unfinished,
+    }
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _simulate_code(code, mode, rolls, seed, trials):
+    """
+    Parameters:
+    - code (int): The board code, see encode_board.
+    - mode (str): The game mode.
+    - rolls (int), seed (int), trials (int): As for simulate.
+
+    Returns:
+    - dict: The results of simulate for the board with this code.
+    """
+    return simulate(words_to_batch([decode_board(code)[0]])[0], mode, rolls, seed, trials)
+
+def simulate_board(board_words, mode, rolls=DEFAULT_ROLLS, seed=None, trials=BUILD_TRIALS):
+    """
+    Simulates one board given in 'board_words' format, as returned by new_board.
+
+    Results with an integer seed are cached per board code and settings, so a board that is looked at again
+    costs nothing. Without a seed every call rolls new dice, and boards of custom layouts have no code, so both
+    are simulated every time.
+
+    Parameters:
+    - board_words (list of lists of str): The board in text format.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - rolls (int), seed (int, optional), trials (int): As for simulate.
+
+    Returns:
+    - dict: The results of simulate, a copy the caller may modify.
+
+    Raises:
+    - ValueError: If the board is not a board of 'mode'.
+    """
+    if mode not in MODES:
+        return simulate(words_to_batch([board_words])[0], mode, rolls, seed, trials)
+    code = encode_board(board_words)
+    code_mode = MODES[code % len(MODES)]
+    if code_mode != mode:
+        raise ValueError(f"The board is a {code_mode} board, not a {mode} board")
+    if not isinstance(seed, (int, np.integer)):
+        return simulate(words_to_batch([board_words])[0], mode, rolls, seed, trials)
+    return copy.deepcopy(_simulate_code(code, mode, rolls, int(seed), trials))
+
+def _simulate_chunk(boards, mode, rolls, seeds, trials):
+    """
+    Worker task: simulates a run of boards one after the other.
+
+    Parameters:
+    - boards (ndarray of uint8): Shape (n, 2, hexes).
+    - mode (str): The game mode.
+    - rolls (int): The number of rolls per board.
+    - seeds (list of numpy.random.SeedSequence): One seed per board.
+    - trials (int): The number of games per vertex for the time to first build.
+
+    Returns:
+    - list of dict: The results of simulate for every board.
+    """
+    return [simulate(board, mode, rolls, seed, trials) for board, seed in zip(boards, seeds)]
+
+def simulate_batch(boards, mode, rolls=DEFAULT_ROLLS, seed=None, trials=BUILD_TRIALS, workers=None):
+    """
+    Simulates a whole batch of boards, spread over several processes.
+
+    Every board gets its own random stream spawned from the master seed, so the results do not depend on the
+    number of workers.
+
+    Parameters:
+    - boards (ndarray of uint8): Shape (n, 2, hexes), as returned by generate_batch.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - rolls (int): The number of rolls per board.
+    - seed (int or numpy.random.SeedSequence, optional): The master seed.
+    - trials (int): The number of games per vertex for the time to first build.
+    - workers (int, optional): The number of worker processes. Defaults to the number of available cores.
+
+    Returns:
+    - list of dict: The results of simulate for every board, in input order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seeds = seed_sequence.spawn(len(boards))
+
+    # A single worker needs no pool
+    if workers == 1 or len(boards) < 2:
+        return _simulate_chunk(boards, mode, rolls, seeds, trials)
+
+    size = -(-len(boards) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tasks = [executor.submit(_simulate_chunk, boards[start:start + size], mode, rolls,
+                                 seeds[start:start + size], trials)
+                 for start in range(0, len(boards), size)]
+        return [result for task in tasks for result in task.result()]
+
+def rolling_throughput(rolls=DEFAULT_ROLLS, seed=None):
+    """
+    Measures how fast roll_counts rolls and tallies dice on one core.
+
+    Parameters:
+    - rolls (int): The number of rolls.
+    - seed (int, optional): Seed of the random number generator.
+
+    Returns:
+    - float: Rolls per second.
+    """
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    roll_counts(rolls, rng)
+    return rolls / (time.perf_counter() - start)
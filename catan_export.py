@@ -0,0 +1,183 @@
+### Catan Board Randomizer ###
+###    Board Export (CLI)    ###
+
+# Import Necessary Packages
+import argparse # Command line argument parsing
+import itertools # Slicing the endless board stream
+import json # JSON encoding of records and headers
+import struct # Packing of the fixed-width binary records
+import sys # Access to stdout
+from catan_constraints import RULES, ConstraintSet # Declarative house rules
+from catan_core import BOARD_DATA, MODES, RESOURCE_NAMES, iter_boards, register_layout # Headless board generation engine
+from catan_layouts import read_layout # Custom map files
+
+# First bytes of every binary board file
+BINARY_MAGIC = b'CATANBRD'
+
+# Version of the binary layout, stored in the header
+BINARY_VERSION = 1
+
+# Number of records collected in memory before they are written out in one call
+DEFAULT_BUFFER_SIZE = 4096
+
+def board_record(board_words, ports, colors, board_seed):
+    """
+    Builds the JSON record of one board.
+
+    Parameters:
+    - board_words (list of lists of str): The board in text format.
+    - ports (list of tuples): The port locations used with the board.
+    - colors (list of str): The port colors used with the board.
+    - board_seed (int): The seed the board was generated from.
+
+    Returns:
+    - dict: The record with the keys 'board_words', 'ports', 'colors' and 'seed'.
+    """
+    return {'board_words': board_words, 'ports': ports, 'colors': colors, 'seed': board_seed}
+
+def binary_header(mode):
+    """
+    Builds the header of a binary board file.
+
+    The header holds the magic bytes, the length of a JSON description, and the description itself with the
+    mode, its row lengths, ports and colors, and the size of every record that follows. Every record is an 8 byte
+    little endian seed followed by one resource id byte and one number token byte per hex.
+
+    Parameters:
+    - mode (str): The game mode of every board in the file.
+
+    Returns:
+    - bytes: The encoded header.
+    """
+    mode_data = BOARD_DATA[mode]
+    hex_count = sum(mode_data['row_lengths'])
+    description = json.dumps({
+        'version': BINARY_VERSION,
+        'mode': mode,
+        'row_lengths': mode_data['row_lengths'],
+        'ports': mode_data['ports'],
+        'colors': mode_data['colors'],
+        'record_size': 8 + 2 * hex_count,
+    }).encode()
+    return BINARY_MAGIC + struct.pack('<I', len(description)) + description
+
+def pack_board(board_words, board_seed):
+    """
+    Packs one board into a fixed-width binary record.
+
+    Parameters:
+    - board_words (list of lists of str): The board in text format.
+    - board_seed (int): The seed the board was generated from.
+
+    Returns:
+    - bytes: The seed, then the resource ids, then the number tokens.
+    """
+    cells = [cell.partition('-') for row in board_words for cell in row]
+    resources = bytes(RESOURCE_NAMES.index(resource) for resource, _, _ in cells)
+    tokens = bytes(int(token or 0) for _, _, token in cells)
+    return struct.pack('<Q', board_seed) + resources + tokens
+
+def read_binary(stream):
+    """
+    Reads back a binary board file written by write_boards.
+
+    Parameters:
+    - stream (binary file): The open file, positioned at its start.
+
+    Yields:
+    - tuple: (board_words, ports, colors, board_seed) for every record in the file.
+    """
+    if stream.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Not a binary board file")
+    (length,) = struct.unpack('<I', stream.read(4))
+    header = json.loads(stream.read(length))
+    row_lengths = header['row_lengths']
+    ports = [tuple(port) for port in header['ports']]
+    hex_count = sum(row_lengths)
+
+    while True:
+        record = stream.read(header['record_size'])
+        if len(record) < header['record_size']:
+            return
+        (board_seed,) = struct.unpack_from('<Q', record)
+        resources, tokens = record[8:8 + hex_count], record[8 + hex_count:]
+        cells = [f"{RESOURCE_NAMES[resource]}-{token}" if resource else RESOURCE_NAMES[resource]
+                 for resource, token in zip(resources, tokens)]
+        board_words = []
+        start = 0
+        for row_length in row_lengths:
+            board_words.append(cells[start:start + row_length])
+            start += row_length
+        yield board_words, ports, header['colors'], board_seed
+
+def write_boards(out, mode, count, seed=None, fmt='jsonl', buffer_size=DEFAULT_BUFFER_SIZE, constraints=()):
+    """
+    Streams boards from iter_boards to a binary file object.
+
+    Records are collected into a buffer and written out with one call every 'buffer_size' boards, so memory use
+    stays constant however many boards are written.
+
+    Parameters:
+    - out (binary file): Where to write the boards.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - count (int): The number of boards to write.
+    - seed (int, optional): The master seed passed to iter_boards.
+    - fmt (str): "jsonl" for one JSON record per line, or "binary" for the fixed-width record format.
+    - buffer_size (int): The number of records written out per call.
+    - constraints (iterable of callables or ConstraintSet, optional): Extra rules passed to iter_boards.
+    """
+    if fmt == 'binary':
+        out.write(binary_header(mode))
+
+    buffer = []
+    for board_words, ports, colors, board_seed in itertools.islice(iter_boards(mode, seed, constraints), count):
+        if fmt == 'binary':
+            buffer.append(pack_board(board_words, board_seed))
+        else:
+            buffer.append(json.dumps(board_record(board_words, ports, colors, board_seed)).encode() + b'\n')
+
+        # Write the buffered records out in bulk
+        if len(buffer) >= buffer_size:
+            out.write(b''.join(buffer))
+            buffer.clear()
+
+    out.write(b''.join(buffer))
+    out.flush()
+
+def main(argv=None):
+    """
+    Command line entry point: streams N boards to stdout or a file.
+
+    Parameters:
+    - argv (list of str, optional): The command line arguments. Defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Stream random valid Catan boards as JSONL or binary records.")
+    parser.add_argument('-n', '--count', type=int, default=1, help="number of boards to generate")
+    parser.add_argument('-m', '--mode', choices=MODES, default='Regular', help="board layout")
+    parser.add_argument('-l', '--layout', default=None, help="layout file of a custom map, used instead of --mode")
+    parser.add_argument('-s', '--seed', type=int, default=None, help="master seed for reproducible output")
+    parser.add_argument('-f', '--format', choices=('jsonl', 'binary'), default='jsonl', help="output format")
+    parser.add_argument('-o', '--output', default='-', help="output file, '-' for stdout")
+    parser.add_argument('--buffer-size', type=int, default=DEFAULT_BUFFER_SIZE, help="records written per call")
+    parser.add_argument('-r', '--rule', action='append', choices=sorted(RULES), default=[],
+                        help="house rule every board must satisfy, may be repeated")
+    parser.add_argument('--report', action='store_true', help="print per-rule rejection statistics to stderr")
+    args = parser.parse_args(argv)
+    if args.layout:
+        args.mode = register_layout(read_layout(args.layout))
+
+    constraints = ConstraintSet([RULES[rule]() for rule in args.rule]) if args.rule else ()
+    if args.output == '-':
+        write_boards(sys.stdout.buffer, args.mode, args.count, args.seed, args.format, args.buffer_size, constraints)
+    else:
+        with open(args.output, 'wb') as out:
+            write_boards(out, args.mode, args.count, args.seed, args.format, args.buffer_size, constraints)
+
+    # Report how often every rule threw a partial board away and how long its checks took
+    if args.report and constraints:
+        for row in constraints.report():
+            print(f"{row['name']}\t{row['evaluations']} checks\t{row['rejection_rate']:.2%} rejected\t"
+                  f"{row['microseconds']:.2f} us/check", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
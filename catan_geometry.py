@@ -0,0 +1,198 @@
+### Catan Board Randomizer ###
+###      Board Geometry      ###
+
+# Import Necessary Packages
+import math # Math library for mathematical functions
+from functools import lru_cache # Caches the hex positions of every layout
+from catan_topology import topology_for_rows # Doubled coordinates of every hex
+
+# Set Hex Size
+HEX_SIZE = 50
+
+# Size of the drawing area the board is laid out for
+CANVAS_WIDTH = 1000
+CANVAS_HEIGHT = 700
+
+# Intial offsets to center the board, and the factor that packs the hexes edge to edge
+OFFSET_X = 375
+OFFSET_Y = 150
+REFACTOR = 0.87
+
+# Hex radii from OFFSET_X to the middle column of the built-in boards
+CENTER_COLUMNS = 4
+
+# Space kept free for the legend on the left, and around boards that need a larger drawing area
+LEGEND_WIDTH = 200
+BOARD_MARGIN = 20
+
+# Radius of the tan number circles, the port circles and the legend circles
+NUMBER_RADIUS = 15
+PORT_RADIUS = 7.5
+LEGEND_RADIUS = 7.5
+
+# Define the legend items and their corresponding colors
+LEGEND_ITEMS = {
+    "Wheat": "#ECCF1B",
+    "Wood": "#1A4D00",
+    "Sheep": "#97E83A",
+    "Brick": "#BA0B0B",
+    "Ore": "#A0A0A0",
+    "3:1": "Black"
+}
+
+@lru_cache(maxsize=None)
+def board_frame(row_lengths, hex_size=HEX_SIZE):
+    """
+    Works out where a layout sits on the drawing area.
+
+    Hex positions come from the doubled coordinates of the layout's topology, so every row is centred on the
+    middle column without any per-row special cases. The built-in boards keep the position they have always
+    been drawn at; a board too wide for it moves right so it clears the legend, and the drawing area grows to
+    fit boards larger than CANVAS_WIDTH by CANVAS_HEIGHT.
+
+    Parameters:
+    - row_lengths (tuple of int): How many tiles are in each row of the board.
+    - hex_size (int): The radius of the hexagons.
+
+    Returns:
+    - dict: 'center_x' (the x position of the middle column), 'middle' (the doubled column of the middle
+      column), 'row_starts' (the index of the first hex of every row), 'centers' (the (x, y) position of every
+      hex in reading order), 'width' and 'height' (the size of the drawing area).
+    """
+    topology = topology_for_rows(tuple(row_lengths))
+    hex_height = int(math.sqrt(3) * hex_size) # Height of the hexagons
+    step = hex_size * REFACTOR # Horizontal distance between doubled columns
+    middle = max(row_lengths) - 1
+
+    # Keep the built-in position unless the left edge of the board would run into the legend
+    center_x = max((OFFSET_X + CENTER_COLUMNS * hex_size) * REFACTOR, LEGEND_WIDTH + middle * step + hex_size)
+    centers = tuple((center_x + (x - middle) * step, (OFFSET_Y + r * hex_height) * REFACTOR)
+                    for x, r in topology.doubled)
+
+    row_starts = [0]
+    for row_length in row_lengths[:-1]:
+        row_starts.append(row_starts[-1] + row_length)
+
+    return {
+        'center_x': center_x,
+        'middle': middle,
+        'row_starts': tuple(row_starts),
+        'centers': centers,
+        'width': max(CANVAS_WIDTH, math.ceil(center_x + middle * step + hex_size + BOARD_MARGIN)),
+        'height': max(CANVAS_HEIGHT, math.ceil(centers[-1][1] + hex_size + BOARD_MARGIN)),
+    }
+
+def board_size(row_lengths, hex_size=HEX_SIZE):
+    """
+    Parameters:
+    - row_lengths (list of int): How many tiles are in each row of the board.
+    - hex_size (int): The radius of the hexagons.
+
+    Returns:
+    - tuple of int: The (width, height) of the drawing area the board needs.
+    """
+    frame = board_frame(tuple(row_lengths), hex_size)
+    return frame['width'], frame['height']
+
+def hex_center(row_index, col_index, row_lengths, hex_size=HEX_SIZE):
+    """
+    Calculates the drawing position of a hex.
+
+    Parameters:
+    - row_index (int): The row of the hex.
+    - col_index (int): The column of the hex within its row.
+    - row_lengths (list of int): How many tiles are in each row of the board.
+    - hex_size (int): The radius of the hexagons.
+
+    Returns:
+    - tuple of float: The (x, y) position of the hex's center.
+    """
+    frame = board_frame(tuple(row_lengths), hex_size)
+    return frame['centers'][frame['row_starts'][row_index] + col_index]
+
+def hex_corners(x, y, hex_size=HEX_SIZE):
+    """
+    Calculates the vertices of a hexagon for its outline.
+
+    Parameters:
+    - x (float): The x position of the hex's center.
+    - y (float): The y position of the hex's center.
+    - hex_size (int): The radius of the hexagon.
+
+    Returns:
+    - list of tuples: The six (x, y) vertices.
+    """
+    points = []
+    for i in range(6):
+        angle_deg = 60 * i - 30
+        angle_rad = math.pi / 180 * angle_deg
+        point_x = x + hex_size * math.cos(angle_rad)
+        point_y = y + hex_size * math.sin(angle_rad)
+        points.append((point_x, point_y))
+    return points
+
+def vertex_position(vertex, row_lengths, hex_size=HEX_SIZE):
+    """
+    Calculates the drawing position of a vertex (intersection) of the board.
+
+    Parameters:
+    - vertex (int): The vertex index in the layout's topology.
+    - row_lengths (list of int): How many tiles are in each row of the board.
+    - hex_size (int): The radius of the hexagons.
+
+    Returns:
+    - tuple of float: The (x, y) position of the vertex, a corner of the hexes around it.
+    """
+    topology = topology_for_rows(tuple(row_lengths))
+    hex_index = topology.vertex_hexes[vertex][0]
+    corner = topology.hex_vertices[hex_index].index(vertex)
+    return hex_corners(*board_frame(tuple(row_lengths), hex_size)['centers'][hex_index], hex_size)[corner]
+
+def port_position(port, row_lengths, hex_size=HEX_SIZE):
+    """
+    Calculates the drawing position of a port circle.
+
+    Parameters:
+    - port (tuple): The (row, column) of the port, where the column is half the doubled column, so a port on
+      a corner of the hex at doubled (x, r) has column (x + dx) / 2 and row r + dy / 3 for a CORNER_OFFSETS
+      entry (dx, dy).
+    - row_lengths (list of int): How many tiles are in each row of the board.
+    - hex_size (int): The radius of the hexagons.
+
+    Returns:
+    - tuple of float: The (x, y) position of the port's center.
+    """
+    frame = board_frame(tuple(row_lengths), hex_size)
+    hex_height = int(math.sqrt(3) * hex_size) # Height of the hexagons
+
+    # Determine the row and column from the port tuple
+    row_index, col_index = port
+
+    # Calculate the x and y position like the hexes, including the refactor
+    x = frame['center_x'] + (2 * col_index - frame['middle']) * hex_size * REFACTOR
+    y = (OFFSET_Y + row_index * (hex_height)) * REFACTOR
+    return x, y
+
+def legend_positions():
+    """
+    Calculates where every legend entry is drawn.
+
+    Returns:
+    - list of tuples: (label, color, circle x, text x, y) for every entry of LEGEND_ITEMS.
+    """
+    # Starting Y position for the legend items
+    y_start = 100
+
+    # Set a padding between items
+    padding = 20
+
+    # Offset to start drawing the legend text next to the circles
+    offset_x = 100
+    text_offset_x = offset_x + (LEGEND_RADIUS * 2) + 10
+
+    positions = []
+    for item, color in LEGEND_ITEMS.items():
+        positions.append((item, color, offset_x, text_offset_x, y_start))
+        # Move the Y position for the next item
+        y_start += (LEGEND_RADIUS * 2) + padding
+    return positions
@@ -0,0 +1,203 @@
+### Catan Board Randomizer ###
+###      Board Layouts       ###
+
+# Import Necessary Packages
+import json # Layout files
+import os # Location of the layout directory
+from catan_geometry import LEGEND_ITEMS # Port colors
+from catan_topology import CORNER_OFFSETS, DOUBLED_DIRECTIONS, topology_for_rows # Doubled coordinates of every hex
+
+# Mapping of resource ids to resource names, the index in the list is the id
+RESOURCE_NAMES = ['desert', 'wheat', 'wood', 'sheep', 'brick', 'ore']
+
+# Directory holding the layout files, and the files of the built-in modes in the order their codes number them
+LAYOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layouts')
+BUILTIN_LAYOUTS = ('regular.json', 'expansion.json')
+
+# Names of the six sides of a hex. Side e runs from corner e to corner e + 1 of CORNER_OFFSETS, so it faces the
+# neighbour in direction e of DOUBLED_DIRECTIONS
+EDGE_NAMES = ('E', 'SE', 'SW', 'W', 'NW', 'NE')
+
+# Port types handed out around the coast of a generated layout, in the order of the Regular board
+PORT_CYCLE = ('3:1', 'sheep', '3:1', 'ore', '3:1', 'wheat', 'brick', '3:1', 'wood')
+
+def port_color(port_type):
+    """
+    Parameters:
+    - port_type (str): A resource name such as "wheat", or "3:1".
+
+    Returns:
+    - str: The color the port is drawn with, the one of its legend entry.
+
+    Raises:
+    - ValueError: If the legend has no entry for the port type.
+    """
+    for label, color in LEGEND_ITEMS.items():
+        if label.lower() == port_type.lower():
+            return color
+    raise ValueError(f"Unknown port type {port_type!r}")
+
+def build_layout(spec):
+    """
+    Turns a layout description into the data new_board works from.
+
+    The description gives the hex shape as row lengths, the tile and number pools as counts, and every port as
+    the side of a coastal hex it sits on. Port circles are placed on the two corners of that side, worked out
+    from the doubled coordinates of the hex, so no drawing positions are stored in the layout.
+
+    Parameters:
+    - spec (dict): 'name', 'rows' (list of row lengths), 'tiles' (resource name -> count), 'numbers' (number ->
+      count) and 'ports' (list of {'hex': [row, column], 'edge': one of EDGE_NAMES, 'type': resource or "3:1"}).
+
+    Returns:
+    - dict: 'name', 'tiles' and 'numbers_list' (sorted lists of resource ids and numbers), 'row_lengths',
+      'ports' (the (row, column) of every port circle, two per port) and 'colors' (one per port circle).
+
+    Raises:
+    - ValueError: If the pools do not fit the shape or a port is not on the coast.
+    """
+    row_lengths = [int(length) for length in spec['rows']]
+    topology = topology_for_rows(tuple(row_lengths))
+    hex_count = topology.hex_count
+
+    tiles = []
+    for resource, count in spec['tiles'].items():
+        if resource not in RESOURCE_NAMES:
+            raise ValueError(f"Unknown resource {resource!r}")
+        tiles += [RESOURCE_NAMES.index(resource)] * count
+    numbers_list = sorted(int(number) for number, count in spec['numbers'].items() for _ in range(count))
+    if len(tiles) != hex_count:
+        raise ValueError(f"{spec['name']} has {len(tiles)} tiles for {hex_count} hexes")
+    if len(numbers_list) != hex_count - tiles.count(0):
+        raise ValueError(f"{spec['name']} has {len(numbers_list)} numbers for {hex_count - tiles.count(0)} "
+                         "hexes that are not deserts")
+
+    index_of = {position: index for index, position in enumerate(topology.row_col)}
+    occupied = set(topology.doubled)
+    ports, colors = [], []
+    for port in spec['ports']:
+        hex_index = index_of.get(tuple(port['hex']))
+        if hex_index is None:
+            raise ValueError(f"Port on missing hex {port['hex']}")
+        edge = EDGE_NAMES.index(port['edge'])
+        x, r = topology.doubled[hex_index]
+        dx, dr = DOUBLED_DIRECTIONS[edge]
+        if (x + dx, r + dr) in occupied:
+            raise ValueError(f"Side {port['edge']} of hex {port['hex']} is not on the coast")
+        # One circle on each corner of the side, in (row, half doubled column) units
+        for corner in (edge, (edge + 1) % 6):
+            cx, cy = CORNER_OFFSETS[corner]
+            ports.append((round(r + cy / 3, 4), (x + cx) / 2))
+            colors.append(port_color(port['type']))
+
+    return {
+        'name': spec['name'],
+        'tiles': sorted(tiles),
+        'numbers_list': numbers_list,
+        'row_lengths': row_lengths,
+        'ports': ports,
+        'colors': colors,
+    }
+
+def read_layout(path):
+    """
+    Parameters:
+    - path (str): A layout file, see build_layout for its fields.
+
+    Returns:
+    - dict: The layout description.
+    """
+    with open(path) as layout_file:
+        return json.load(layout_file)
+
+def load_builtin_layouts():
+    """
+    Returns:
+    - dict: The data of every built-in mode, keyed by its name, in the order of BUILTIN_LAYOUTS.
+    """
+    layouts = {}
+    for file_name in BUILTIN_LAYOUTS:
+        layout = build_layout(read_layout(os.path.join(LAYOUT_DIR, file_name)))
+        layouts[layout.pop('name')] = layout
+    return layouts
+
+def coast_sides(row_lengths):
+    """
+    Walks once around the coast of a layout.
+
+    Parameters:
+    - row_lengths (list of int): How many tiles are in each row.
+
+    Returns:
+    - list of tuples: (hex index, side) of every side without a neighbour, clockwise from the top left.
+    """
+    topology = topology_for_rows(tuple(row_lengths))
+    occupied = set(topology.doubled)
+
+    # Every coastal side runs clockwise from one corner to the next, so chaining them follows the coast
+    side_from = {}
+    for hex_index, (x, r) in enumerate(topology.doubled):
+        for edge, (dx, dr) in enumerate(DOUBLED_DIRECTIONS):
+            if (x + dx, r + dr) not in occupied:
+                cx, cy = CORNER_OFFSETS[edge]
+                side_from[(x + cx, 3 * r + cy)] = (hex_index, edge)
+
+    start = min(side_from, key=lambda corner: (corner[1], corner[0]))
+    sides = []
+    corner = start
+    while True:
+        hex_index, edge = side_from[corner]
+        sides.append((hex_index, edge))
+        x, r = topology.doubled[hex_index]
+        cx, cy = CORNER_OFFSETS[(edge + 1) % 6]
+        corner = (x + cx, 3 * r + cy)
+        if corner == start:
+            return sides
+
+def _spread(counts, total):
+    """
+    Scales a pool to a new size, keeping the share of every entry as close as possible.
+
+    Parameters:
+    - counts (dict): The pool, entry -> count.
+    - total (int): The size of the scaled pool.
+
+    Returns:
+    - dict: The scaled pool, entry -> count.
+    """
+    size = sum(counts.values())
+    scaled = {key: count * total // size for key, count in counts.items()}
+    # Hand the remainder to the entries that lost the largest fractions
+    for key in sorted(counts, key=lambda key: -(counts[key] * total % size))[:total - sum(scaled.values())]:
+        scaled[key] += 1
+    return scaled
+
+def hexagon_layout(radius, name=None, template='regular.json'):
+    """
+    Describes a hexagonal map of any size, with the tile and number pools of a built-in layout scaled up.
+
+    Parameters:
+    - radius (int): The number of rings around the centre hex, 2 for a Regular sized board.
+    - name (str, optional): The mode name. Defaults to "Hexagon-<radius>".
+    - template (str): The built-in layout file whose pools are scaled.
+
+    Returns:
+    - dict: A layout description for build_layout or register_layout.
+    """
+    base = read_layout(os.path.join(LAYOUT_DIR, template))
+    rows = [radius + 1 + row for row in range(radius)] + [2 * radius + 1] + \
+           [2 * radius - row for row in range(radius)]
+    hex_count = sum(rows)
+
+    deserts = max(1, round(base['tiles']['desert'] * hex_count / sum(base['tiles'].values())))
+    tiles = {'desert': deserts} | _spread({resource: count for resource, count in base['tiles'].items()
+                                           if resource != 'desert'}, hex_count - deserts)
+    numbers = _spread(base['numbers'], hex_count - deserts)
+
+    # Keep roughly the built-in share of coastal sides with a port
+    row_col = topology_for_rows(tuple(rows)).row_col
+    every = max(1, round(len(coast_sides(base['rows'])) / len(base['ports'])))
+    ports = [{'hex': list(row_col[hex_index]), 'edge': EDGE_NAMES[edge], 'type': PORT_CYCLE[position % len(PORT_CYCLE)]}
+             for position, (hex_index, edge) in enumerate(coast_sides(rows)[1::every])]
+
+    return {'name': name or f"Hexagon-{radius}", 'rows': rows, 'tiles': tiles, 'numbers': numbers, 'ports': ports}
@@ -0,0 +1,303 @@
+### Catan Board Randomizer ###
+###      Opening Solver      ###
+
+# Import Necessary Packages
+import time # Time budget of the search
+from functools import lru_cache # Caches the per mode vertex and road graphs
+from catan_core import get_topology # Hex topology
+from catan_geometry import LEGEND_ITEMS # Port types of the port colors
+
+# Number of dice combinations (pips) that roll each number token, indexed by the token
+PIPS = (0, 0, 1, 2, 3, 4, 5, 0, 5, 4, 3, 2, 1)
+
+# Weights of the parts of a player's opening score
+WEIGHTS = {
+    'pips': 1.0, # per pip of every hex touching one of the player's settlements
+    'diversity': 1.5, # per distinct resource the settlements receive
+    'generic_port': 1.0, # for reaching a 3:1 port
+    'resource_port': 0.25, # per pip of its own resource, for reaching a 2:1 port
+}
+
+# Candidates tried per pick by the first pass of the search; every later pass doubles it
+START_WIDTH = 4
+
+# Default time budget of a search, in seconds
+TIME_BUDGET = 0.5
+
+# Colors of the players' settlements in the GUI overlay
+PLAYER_COLORS = ('#D62828', '#1D4ED8', '#F4F4F4', '#F77F00')
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when its time budget runs out.
+    """
+
+@lru_cache(maxsize=None)
+def opening_graph(mode):
+    """
+    Precomputes the vertex graph of a layout.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - dict: 'vertex_hexes' (the hexes touching every vertex), 'blocks' (for every vertex, a bitmask of itself and
+      its neighbours, which the distance rule closes once it holds a settlement) and 'vertex_of' (vertex index by
+      (doubled column, 3 * row) lattice position).
+    """
+    topology = get_topology(mode)
+    blocks = tuple((1 << vertex) | sum(1 << other for other in others)
+                   for vertex, others in enumerate(topology.vertex_neighbours))
+    return {
+        'vertex_hexes': topology.vertex_hexes,
+        'blocks': blocks,
+        'vertex_of': {coords: vertex for vertex, coords in enumerate(topology.vertex_coords)},
+    }
+
+def port_vertices(ports, colors, mode):
+    """
+    Finds the vertices every port can be used from.
+
+    Port circles sit on the corners of coastal hexes, at (row, column) = (lattice row / 3, doubled column / 2),
+    so each circle gives one vertex.
+
+    Parameters:
+    - ports (list of tuples): The (row, column) of every port circle.
+    - colors (list of str): The color of every port circle.
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - dict: Vertex -> port type, "3:1" or a resource name.
+    """
+    vertex_of = opening_graph(mode)['vertex_of']
+    port_types = {color: label if label == '3:1' else label.lower() for label, color in LEGEND_ITEMS.items()}
+    found = {}
+    for (row, col), color in zip(ports, colors):
+        vertex = vertex_of.get((round(2 * col), round(3 * row)))
+        if vertex is not None and color in port_types:
+            found[vertex] = port_types[color]
+    return found
+
+def vertex_table(board_words, mode):
+    """
+    Works out once what a settlement on every vertex receives.
+
+    Parameters:
+    - board_words (list of lists of str): The board in text format.
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - list of dicts: For every vertex, resource name -> pips per 36 rolls.
+    """
+    cells = [cell.partition('-') for row in board_words for cell in row]
+    table = []
+    for hexes in opening_graph(mode)['vertex_hexes']:
+        income = {}
+        for hex_index in hexes:
+            resource, _, number = cells[hex_index]
+            if number:
+                income[resource] = income.get(resource, 0) + PIPS[int(number)]
+        table.append(income)
+    return table
+
+class OpeningSolver:
+    """
+    Searches the best opening settlements for every player of a snake draft.
+
+    Players place one settlement each in order, then a second one each in reverse order. Every player wants the
+    highest score for their own pair of settlements: the pips they touch, the number of distinct resources, and
+    the ports they reach. No settlement may sit on or next to one already placed.
+
+    Scores only depend on a player's own settlements, so a second settlement is simply the best open vertex:
+    every later pick can only close vertices the player no longer needs. The search therefore branches on the
+    first round only, where each player picks the vertex that leaves them the best pair once every later player
+    has placed both settlements. Candidates are tried best single vertex first and a branch stops as soon as no
+    remaining candidate can beat the best pair found. Outcomes are memoised by the set of closed vertices.
+
+    The search widens its candidate lists pass by pass, doubling the width until the whole first round fits or
+    the time budget runs out, and keeps the result of the last complete pass.
+
+    Attributes:
+    - mode (str): The game mode.
+    - players (int): The number of players, 3 or 4.
+    - income (list of dicts): The output of vertex_table.
+    - ports (dict): The output of port_vertices.
+    """
+
+    def __init__(self, board_words, ports, colors, mode, players=4):
+        if players not in (3, 4):
+            raise ValueError("Openings are searched for 3 or 4 players")
+        self.mode = mode
+        self.players = players
+        self.income = vertex_table(board_words, mode)
+        self.ports = port_vertices(ports, colors, mode)
+        self._blocks = opening_graph(mode)['blocks']
+        self._pair_scores = {}
+
+        # Single vertices ordered by score. A pair scores at most the sum of its two singles plus what a 2:1 port
+        # on each of them can gain from the other's pips, twice the single slack when they sit on two different
+        # 2:1 ports, which bounds every branch of the search
+        self._singles = [self.score((vertex,)) for vertex in range(len(self.income))]
+        self._order = sorted(range(len(self.income)), key=lambda vertex: -self._singles[vertex])
+        self._slack = WEIGHTS['resource_port'] * max(sum(income.values()) for income in self.income)
+        self._best_single = self._singles[self._order[0]]
+
+    def score(self, vertices):
+        """
+        Scores a player's settlements, memoised per pair.
+
+        Parameters:
+        - vertices (tuple of int): The player's settlements.
+
+        Returns:
+        - float: The opening score, see WEIGHTS.
+        """
+        key = tuple(sorted(vertices))
+        if key not in self._pair_scores:
+            income = {}
+            for vertex in key:
+                for resource, pips in self.income[vertex].items():
+                    income[resource] = income.get(resource, 0) + pips
+            value = WEIGHTS['pips'] * sum(income.values()) + WEIGHTS['diversity'] * len(income)
+            for port_type in {self.ports[vertex] for vertex in key if vertex in self.ports}:
+                if port_type == '3:1':
+                    value += WEIGHTS['generic_port']
+                else:
+                    value += WEIGHTS['resource_port'] * income.get(port_type, 0)
+            self._pair_scores[key] = value
+        return self._pair_scores[key]
+
+    def _best_second(self, first, blocked):
+        """
+        Parameters:
+        - first (int): The player's first settlement.
+        - blocked (int): Bitmask of the vertices the distance rule has closed.
+
+        Returns:
+        - int: The open vertex making the best pair with 'first'.
+        """
+        best_score, best = float('-inf'), -1
+        bound = self._singles[first] + 2 * self._slack
+        for vertex in self._order:
+            if bound + self._singles[vertex] <= best_score:
+                break # Every remaining vertex scores lower on its own
+            if not blocked >> vertex & 1:
+                value = self.score((first, vertex))
+                if value > best_score:
+                    best_score, best = value, vertex
+        return best
+
+    def _search(self, player, blocked, width, deadline, memo):
+        """
+        Finds how the draft ends from the first pick of 'player' on.
+
+        Later players neither see nor care who closed which vertex, so the outcome only depends on the closed
+        vertices and is memoised by them.
+
+        Parameters:
+        - player (int): The player about to place a first settlement.
+        - blocked (int): Bitmask of the closed vertices.
+        - width (int): The number of candidates tried per pick.
+        - deadline (float): The perf_counter time at which the search gives up.
+        - memo (dict): Outcomes already searched, keyed by (blocked, player).
+
+        Returns:
+        - pairs (tuple of tuples): (first, second) settlements of this and every later player.
+        - blocked (int): The closed vertices once they have all placed both settlements.
+        """
+        if player == self.players:
+            return (), blocked
+        key = (blocked, player)
+        if key in memo:
+            return memo[key]
+        if time.perf_counter() > deadline:
+            raise SearchTimeout
+
+        best, best_score = None, float('-inf')
+        tried = 0
+        for vertex in self._order:
+            if blocked >> vertex & 1:
+                continue
+            if tried == width or self._singles[vertex] + self._best_single + 2 * self._slack <= best_score:
+                break
+            tried += 1
+            pairs, after = self._search(player + 1, blocked | self._blocks[vertex], width, deadline, memo)
+            # The second round runs in reverse, so this player picks a second settlement after all later players
+            second = self._best_second(vertex, after)
+            value = self.score((vertex, second))
+            if value > best_score:
+                best_score, best = value, (((vertex, second),) + pairs, after | self._blocks[second])
+        memo[key] = best
+        return best
+
+    def solve(self, budget=TIME_BUDGET):
+        """
+        Runs the widening search within a time budget.
+
+        Parameters:
+        - budget (float): Seconds the search may take; the first pass always completes.
+
+        Returns:
+        - dict: 'settlements' (the (first, second) vertices of every player), 'picks' ((player, vertex) in draft
+          order), 'scores' (the opening score of every player), 'width' (candidates per pick of the last complete
+          pass) and 'complete' (True if that pass tried every vertex).
+        """
+        deadline = time.perf_counter() + budget
+        width, result = START_WIDTH, None
+        while True:
+            try:
+                # The first pass has no deadline, so there is always a result
+                settlements, _ = self._search(0, 0, width, deadline if result else float('inf'), {})
+            except SearchTimeout:
+                break
+            result = (settlements, width)
+            if width >= len(self.income):
+                break
+            width *= 2
+
+        settlements, width = result
+        order = list(range(self.players)) + list(reversed(range(self.players)))
+        picks = [(player, settlements[player][0 if round_index < self.players else 1])
+                 for round_index, player in enumerate(order)]
+        return {
+            'settlements': settlements,
+            'picks': picks,
+            'scores': [self.score(pair) for pair in settlements],
+            'width': width,
+            'complete': width >= len(self.income),
+        }
+
+def solve_openings(board_words, ports, colors, mode, players=4, budget=TIME_BUDGET):
+    """
+    Parameters:
+    - board_words (list of lists of str): The board in text format, as returned by new_board.
+    - ports (list of tuples): The port locations.
+    - colors (list of str): The port colors.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - players (int): The number of players, 3 or 4.
+    - budget (float): Seconds the search may take.
+
+    Returns:
+    - dict: The result of OpeningSolver.solve.
+    """
+    return OpeningSolver(board_words, ports, colors, mode, players).solve(budget)
+
+def solve_archive(archive, records=None, players=4, budget=TIME_BUDGET):
+    """
+    Solves the openings of boards stored in an archive, one at a time.
+
+    Parameters:
+    - archive (BoardArchive): An archive from catan_archive.
+    - records (iterable of int, optional): The record numbers, such as the output of archive.select. Defaults to
+      every record.
+    - players (int): The number of players, 3 or 4.
+    - budget (float): Seconds the search may take per board.
+
+    Yields:
+    - tuple: (record number, result of OpeningSolver.solve) for every record.
+    """
+    if records is None:
+        records = range(len(archive))
+    for record in records:
+        board_words, ports, colors = archive.words(int(record))
+        yield int(record), solve_openings(board_words, ports, colors, archive.mode, players, budget)
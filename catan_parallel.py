@@ -0,0 +1,83 @@
+### Catan Board Randomizer ###
+###  Multi-Core Generation   ###
+
+# Import Necessary Packages
+import os # Used to find the number of available cores
+from concurrent.futures import ProcessPoolExecutor # Pool of worker processes
+from multiprocessing import shared_memory # Buffer the workers write boards into without pickling them
+import numpy as np # Array library used for the board buffer and the seed sequences
+from catan_batch import generate_batch # Vectorised generator run inside every worker
+from catan_core import get_topology # Hex count of every layout
+
+# Number of boards generated from each random stream. The output only depends on this and the master seed,
+# never on how many workers share the chunks.
+CHUNK_SIZE = 1 << 16
+
+def _fill_chunk(shm_name, mode, n, start, stop, seed):
+    """
+    Worker task: generates boards start to stop of the batch straight into the shared buffer.
+
+    Parameters:
+    - shm_name (str): Name of the shared memory block holding the whole batch.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - n (int): The size of the whole batch, needed to view the buffer with the right shape.
+    - start (int): Index of the first board of the chunk.
+    - stop (int): Index after the last board of the chunk.
+    - seed (numpy.random.SeedSequence): The chunk's own random stream.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        boards = np.ndarray((n, 2, get_topology(mode).hex_count), dtype=np.uint8, buffer=shm.buf)
+        generate_batch(mode, stop - start, seed, out=boards[start:stop])
+        del boards # Release the view before closing the buffer
+    finally:
+        shm.close()
+
+def generate_parallel(mode, n, seed=None, workers=None):
+    """
+    Generates n valid boards spread over several processes.
+
+    The batch is cut into chunks of CHUNK_SIZE boards, and every chunk gets its own independent random stream
+    spawned from the master seed with numpy.random.SeedSequence. Workers write their chunks directly into a
+    shared memory buffer, so only the small task descriptions are pickled. For the same master seed the result
+    is identical for any number of workers, including a single in-process run.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - n (int): The number of boards to generate.
+    - seed (int or numpy.random.SeedSequence, optional): The master seed. A fresh one is drawn if not given.
+    - workers (int, optional): The number of worker processes. Defaults to the number of available cores.
+
+    Returns:
+    - ndarray of uint8: Shape (n, 2, hexes), laid out like the output of generate_batch.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    starts = range(0, n, CHUNK_SIZE)
+    chunk_seeds = seed_sequence.spawn(len(starts))
+    hex_count = get_topology(mode).hex_count
+
+    # A single worker needs no pool, the chunks are filled in order in this process
+    if workers == 1:
+        boards = np.empty((n, 2, hex_count), dtype=np.uint8)
+        for start, chunk_seed in zip(starts, chunk_seeds):
+            stop = min(start + CHUNK_SIZE, n)
+            generate_batch(mode, stop - start, chunk_seed, out=boards[start:stop])
+        return boards
+
+    shm = shared_memory.SharedMemory(create=True, size=max(n * 2 * hex_count, 1))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tasks = [executor.submit(_fill_chunk, shm.name, mode, n, start, min(start + CHUNK_SIZE, n), chunk_seed)
+                     for start, chunk_seed in zip(starts, chunk_seeds)]
+            for task in tasks:
+                task.result() # Raise any error from the workers
+
+        # Copy the boards out so the shared block can be released
+        boards = np.ndarray((n, 2, hex_count), dtype=np.uint8, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return boards
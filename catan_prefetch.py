@@ -0,0 +1,114 @@
+### Catan Board Randomizer ###
+###   Background Prefetcher  ###
+
+# Import Necessary Packages
+import queue # Thread-safe bounded queues of ready boards
+import threading # Background worker thread
+from catan_core import new_valid_board # Headless board generation engine
+
+class BoardPrefetcher:
+    """
+    Keeps a small queue of ready, valid boards per mode, filled by a background thread.
+
+    The worker only fills the queue of the current target mode, and sleeps while that queue is full. Taking a
+    board pops it from the queue without generating anything, so the caller (such as a Tk button) returns at
+    once; if the queue ever runs dry the board is generated on the spot instead.
+
+    Attributes:
+    - mode (str): The mode the worker is currently filling.
+    - depth (int): The maximum number of boards kept per mode.
+    - refill_interval (float): Seconds the worker pauses after every board, to limit its CPU use.
+    - generator (callable): Called with a mode, returns (board_words, ports, colors).
+    """
+
+    def __init__(self, mode="Regular", depth=4, refill_interval=0.0, generator=new_valid_board):
+        self.mode = mode
+        self.depth = depth
+        self.refill_interval = refill_interval
+        self.generator = generator
+        self.queues = {} # One bounded queue per mode, created on first use
+        self._wake = threading.Event() # Set when a board is taken or the target mode changes
+        self._stop = threading.Event() # Set to end the worker thread
+        self._thread = None
+
+    def _queue(self, mode):
+        """
+        Parameters:
+        - mode (str): The game mode.
+
+        Returns:
+        - queue.Queue: The bounded queue of ready boards for the mode.
+        """
+        board_queue = self.queues.get(mode)
+        if board_queue is None:
+            board_queue = self.queues.setdefault(mode, queue.Queue(self.depth))
+        return board_queue
+
+    def start(self):
+        """
+        Starts the background worker thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="BoardPrefetcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background worker thread and waits for it to finish.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def retarget(self, mode):
+        """
+        Switches the worker to filling the queue of another mode. Boards already queued for other modes are kept.
+
+        Parameters:
+        - mode (str): The game mode to prefetch boards for.
+        """
+        self.mode = mode
+        self._wake.set()
+
+    def get(self, mode=None):
+        """
+        Takes a ready board.
+
+        Parameters:
+        - mode (str, optional): The game mode. Defaults to the current target mode.
+
+        Returns:
+        - tuple: (board_words, ports, colors), as returned by the generator.
+        """
+        mode = mode or self.mode
+        try:
+            board = self._queue(mode).get_nowait()
+        except queue.Empty:
+            board = self.generator(mode) # Nothing ready yet, build one right away
+        self._wake.set() # Let the worker refill the queue
+        return board
+
+    def _run(self):
+        """
+        Worker loop: fills the queue of the target mode and sleeps while it is full.
+        """
+        while not self._stop.is_set():
+            mode = self.mode
+            board_queue = self._queue(mode)
+
+            # Clear before checking so a wake-up between the check and the wait is not lost
+            self._wake.clear()
+            if board_queue.full():
+                self._wake.wait()
+                continue
+
+            board = self.generator(mode)
+            try:
+                board_queue.put_nowait(board)
+            except queue.Full:
+                pass
+
+            if self.refill_interval:
+                self._stop.wait(self.refill_interval)
@@ -0,0 +1,228 @@
+### Catan Board Randomizer ###
+###  Headless PNG Renderer   ###
+
+# Import Necessary Packages
+import argparse # Command line argument parsing
+import io # In-memory buffers for encoding images
+import itertools # Slicing the endless board stream
+import os # File system access for the output directory
+import time # Per-image timing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor # Parallel rendering
+from PIL import Image, ImageDraw, ImageFont # Image composition and drawing
+from catan_core import MODES, iter_boards, register_layout # Headless board generation engine
+from catan_layouts import read_layout # Custom map files
+from catan_geometry import (HEX_SIZE, NUMBER_RADIUS, PORT_RADIUS, LEGEND_RADIUS,
+                            board_size, hex_center, hex_corners, port_position, legend_positions) # Shared board geometry
+from catan_tiles import IMAGE_PATHS, load_tile, tile_size # Cached tile image preparation
+
+# Fill colors used for a hex whose resource has no image file
+FALLBACK_COLORS = {
+    'desert': '#E4C98F',
+    'wheat': '#ECCF1B',
+    'wood': '#1A4D00',
+    'sheep': '#97E83A',
+    'brick': '#BA0B0B',
+    'ore': '#A0A0A0',
+}
+
+def load_font(size):
+    """
+    Loads a bold font for the number tokens, falling back to Pillow's built-in font.
+
+    Parameters:
+    - size (int): The font size in pixels.
+
+    Returns:
+    - ImageFont: The loaded font.
+    """
+    for name in ('arialbd.ttf', 'Arial Bold.ttf', 'DejaVuSans-Bold.ttf'):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+class TileAtlas:
+    """
+    Every masked resource tile pasted once into a single RGBA image.
+
+    The tiles come from the on-disk tile cache and are masked exactly once; renders only paste regions of the
+    atlas, so no resampling or masking happens per board.
+
+    Attributes:
+    - image (Image): The atlas, one tile per column.
+    - boxes (dict): The (left, top, right, bottom) box of every resource in the atlas.
+    - tiles (dict): A cropped view of every resource, ready to paste.
+    - hex_size (int): The radius of the hexagons the tiles were made for.
+    """
+
+    def __init__(self, image_paths=IMAGE_PATHS, hex_size=HEX_SIZE):
+        self.hex_size = hex_size
+        width, height = tile_size(hex_size)
+        available = [(resource, path) for resource, path in image_paths.items() if os.path.exists(path)]
+
+        self.image = Image.new('RGBA', (max(width * len(available), 1), height), (0, 0, 0, 0))
+        self.boxes = {}
+        for column, (resource, path) in enumerate(available):
+            box = (column * width, 0, (column + 1) * width, height)
+            self.image.paste(load_tile(resource, path, hex_size), box)
+            self.boxes[resource] = box
+        self.tiles = {resource: self.image.crop(box) for resource, box in self.boxes.items()}
+
+def render_board(board, ports, colors, atlas, show_ports=True, font=None):
+    """
+    Draws a board to a PIL image the same way draw_board_gui draws it on the canvas.
+
+    Parameters:
+    - board (list of lists of str): A 2D list where each element is a string with the resource type and
+      number separated by a dash (e.g., "wheat-8").
+    - ports (list of tuples): The port locations.
+    - colors (list of str): The port colors.
+    - atlas (TileAtlas): The preloaded tiles.
+    - show_ports (bool): Whether to draw the ports and the legend.
+    - font (ImageFont, optional): The font of the number tokens.
+
+    Returns:
+    - Image: The rendered board in RGB mode.
+    """
+    font = font or load_font(16)
+    hex_size = atlas.hex_size
+    row_lengths = [len(row) for row in board]
+
+    image = Image.new('RGBA', board_size(row_lengths, hex_size), 'white')
+    draw = ImageDraw.Draw(image)
+
+    for row_index, row in enumerate(board):
+        for col_index, cell in enumerate(row):
+            x, y = hex_center(row_index, col_index, row_lengths, hex_size)
+            resource, _, number = cell.partition('-')
+            points = hex_corners(x, y, hex_size)
+
+            # Paste the tile centred on the hex, or fill the hex if the resource has no image
+            tile = atlas.tiles.get(resource)
+            if tile is not None:
+                image.alpha_composite(tile, (round(x - tile.width / 2), round(y - tile.height / 2)))
+            else:
+                draw.polygon(points, fill=FALLBACK_COLORS.get(resource, 'white'))
+            draw.polygon(points, outline='black', width=2)
+
+            # If there's a number, draw the tan circle and the number on top of the image
+            if number:
+                draw.ellipse((x - NUMBER_RADIUS, y - NUMBER_RADIUS, x + NUMBER_RADIUS, y + NUMBER_RADIUS),
+                             fill="#FEE0AC", outline='black')
+                draw.text((x, y), number, fill='#B20909' if number in ('6', '8') else 'black', font=font, anchor='mm')
+
+    if show_ports:
+        for index, port in enumerate(ports):
+            x, y = port_position(port, row_lengths, hex_size)
+            draw.ellipse((x - PORT_RADIUS, y - PORT_RADIUS, x + PORT_RADIUS, y + PORT_RADIUS),
+                         fill=colors[index % len(colors)], outline='black')
+        for item, color, circle_x, text_x, y in legend_positions():
+            draw.ellipse((circle_x - LEGEND_RADIUS, y - LEGEND_RADIUS, circle_x + LEGEND_RADIUS, y + LEGEND_RADIUS),
+                         fill=color, outline='black')
+            draw.text((text_x, y), item, fill='black', anchor='lm')
+
+    return image.convert('RGB')
+
+# Per-process state used by the render workers
+_worker_atlas = None
+_worker_font = None
+
+def _init_worker(hex_size):
+    """
+    Loads the atlas and the font once in every worker process.
+
+    Parameters:
+    - hex_size (int): The radius of the hexagons.
+    """
+    global _worker_atlas, _worker_font
+    _worker_atlas = TileAtlas(hex_size=hex_size)
+    _worker_font = load_font(16)
+
+def _render_to_file(task):
+    """
+    Renders one board and writes it to disk.
+
+    Parameters:
+    - task (tuple): (board_words, ports, colors, path, image format, show_ports).
+
+    Returns:
+    - tuple: (path, render seconds, output bytes).
+    """
+    board, ports, colors, path, fmt, show_ports = task
+    start = time.perf_counter()
+    image = render_board(board, ports, colors, _worker_atlas, show_ports, _worker_font)
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    elapsed = time.perf_counter() - start
+    with open(path, 'wb') as out:
+        out.write(buffer.getvalue())
+    return path, elapsed, buffer.tell()
+
+def render_boards(boards, out_dir, fmt='PNG', workers=4, processes=False, show_ports=True, hex_size=HEX_SIZE):
+    """
+    Renders many boards to image files in parallel.
+
+    Parameters:
+    - boards (iterable of tuples): (board_words, ports, colors) for every board.
+    - out_dir (str): The directory to write board_00000.png, board_00001.png, ... into.
+    - fmt (str): The image format, "PNG" or "WEBP".
+    - workers (int): The number of threads, or processes if 'processes' is True.
+    - processes (bool): Use a process pool instead of a thread pool.
+    - show_ports (bool): Whether to draw the ports and the legend.
+    - hex_size (int): The radius of the hexagons.
+
+    Returns:
+    - list of tuples: (path, render seconds, output bytes) for every board, in input order.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    extension = fmt.lower()
+    tasks = (
+        (board, ports, colors, os.path.join(out_dir, f"board_{index:05d}.{extension}"), fmt, show_ports)
+        for index, (board, ports, colors) in enumerate(boards)
+    )
+
+    if processes:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(hex_size,))
+    else:
+        _init_worker(hex_size) # Threads share one atlas, it is only read while rendering
+        executor = ThreadPoolExecutor(max_workers=workers)
+    with executor:
+        return list(executor.map(_render_to_file, tasks))
+
+def main(argv=None):
+    """
+    Command line entry point: renders N random valid boards and reports timings and sizes.
+
+    Parameters:
+    - argv (list of str, optional): The command line arguments. Defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Render random valid Catan boards to image files.")
+    parser.add_argument('-n', '--count', type=int, default=10, help="number of boards to render")
+    parser.add_argument('-m', '--mode', choices=MODES, default='Regular', help="board layout")
+    parser.add_argument('-l', '--layout', default=None, help="layout file of a custom map, used instead of --mode")
+    parser.add_argument('-s', '--seed', type=int, default=None, help="master seed for reproducible output")
+    parser.add_argument('-f', '--format', choices=('PNG', 'WEBP'), default='PNG', help="image format")
+    parser.add_argument('-o', '--output', default='renders', help="output directory")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="parallel workers")
+    parser.add_argument('--processes', action='store_true', help="use processes instead of threads")
+    parser.add_argument('--no-ports', action='store_true', help="leave out the ports and the legend")
+    args = parser.parse_args(argv)
+    if args.layout:
+        args.mode = register_layout(read_layout(args.layout))
+
+    boards = ((board, ports, colors) for board, ports, colors, _ in
+              itertools.islice(iter_boards(args.mode, args.seed), args.count))
+    start = time.perf_counter()
+    results = render_boards(boards, args.output, args.format, args.workers, args.processes, not args.no_ports)
+    elapsed = time.perf_counter() - start
+
+    for path, seconds, size in results:
+        print(f"{path}\t{seconds * 1000:.1f} ms\t{size} bytes")
+    if results:
+        print(f"Rendered {len(results)} boards in {elapsed:.2f} s "
+              f"(mean {sum(r[1] for r in results) / len(results) * 1000:.1f} ms, "
+              f"mean {sum(r[2] for r in results) / len(results) / 1024:.1f} KiB per image)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+### Catan Board Randomizer ###
+###   Board Fairness Scores  ###
+
+# Import Necessary Packages
+from functools import lru_cache # Caches the per mode incidence matrices
+import numpy as np # Array library used to score whole batches of boards at once
+from catan_batch import RESOURCES, TOKENS, generate_batch, words_to_batch # Batch board arrays
+from catan_core import BOARD_DATA, RESOURCE_NAMES, get_topology # Layout data and hex topology
+
+# Number of dice combinations (pips) that roll each number token, indexed by the token
+PIPS = np.array([0, 0, 1, 2, 3, 4, 5, 0, 5, 4, 3, 2, 1], dtype=np.float32)
+
+# Vertex pip total from which an intersection counts as a hot spot
+HOT_VERTEX_PIPS = 11
+
+# Weights of the penalties subtracted from a perfect score of 100
+WEIGHTS = {
+    'hot_vertex': 4.0, # per pip the best intersection has above HOT_VERTEX_PIPS - 1
+    'resource_spread': 10.0, # per pip of standard deviation in average pips per tile between resources
+    'resource_clusters': 2.0, # per pair of neighbouring hexes with the same resource
+    'number_clusters': 5.0, # per pair of neighbouring hexes with the same number
+}
+
+# Boards scored per chunk, which bounds the size of the intermediate arrays
+CHUNK_SIZE = 1 << 18
+
+@lru_cache(maxsize=None)
+def vertex_matrix(mode):
+    """
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - ndarray of float32: Shape (hexes, vertices), 1 where a hex touches a vertex.
+    """
+    topology = get_topology(mode)
+    matrix = np.zeros((topology.hex_count, topology.vertex_count), dtype=np.float32)
+    for vertex, hexes in enumerate(topology.vertex_hexes):
+        matrix[list(hexes), vertex] = 1
+    return matrix
+
+def score_batch(boards, mode):
+    """
+    Scores the fairness of a whole batch of boards.
+
+    Every measure is computed with array operations over the batch, using the vertex and neighbour index of the
+    mode's topology:
+    - vertex_pips: pips collected by every intersection, and max_vertex_pips, the best one on the board.
+    - resource_pips: total pips of every resource, and resource_spread, the standard deviation between resources
+      of the average pips per tile, which is high when e.g. all the ore sits on 2's and 12's.
+    - resource_clusters: neighbouring hex pairs with the same resource.
+    - number_clusters: neighbouring hex pairs with the same number.
+    - score: 100 minus the weighted penalties in WEIGHTS, higher is fairer.
+
+    Parameters:
+    - boards (ndarray of uint8): Shape (n, 2, hexes), as returned by generate_batch.
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - dict of ndarrays: 'score', 'max_vertex_pips', 'resource_spread', 'resource_clusters' and 'number_clusters'
+      of shape (n,), and 'resource_pips' of shape (n, 5) in the order of RESOURCE_NAMES[1:].
+    """
+    topology = get_topology(mode)
+    matrix = vertex_matrix(mode)
+    first, second = np.array(topology.edges, dtype=np.intp).T
+    tiles_per_resource = np.array([BOARD_DATA[mode]['tiles'].count(resource)
+                                   for resource in range(1, len(RESOURCE_NAMES))], dtype=np.float32)
+
+    n = len(boards)
+    results = {
+        'score': np.empty(n, dtype=np.float32),
+        'max_vertex_pips': np.empty(n, dtype=np.float32),
+        'resource_pips': np.empty((n, len(tiles_per_resource)), dtype=np.float32),
+        'resource_spread': np.empty(n, dtype=np.float32),
+        'resource_clusters': np.empty(n, dtype=np.int16),
+        'number_clusters': np.empty(n, dtype=np.int16),
+    }
+
+    for start in range(0, n, CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        resources = boards[chunk, RESOURCES]
+        tokens = boards[chunk, TOKENS]
+        pips = PIPS[tokens]
+
+        # Pips at every intersection
+        max_vertex_pips = (pips @ matrix).max(axis=1)
+
+        # Pips per resource, and how unevenly they are spread per tile
+        resource_pips = np.stack([(pips * (resources == resource)).sum(axis=1)
+                                  for resource in range(1, len(RESOURCE_NAMES))], axis=1)
+        resource_spread = (resource_pips / tiles_per_resource).std(axis=1)
+
+        # Neighbouring pairs sharing a resource (deserts excluded) or a number
+        resource_clusters = ((resources[:, first] == resources[:, second]) & (resources[:, first] != 0)).sum(axis=1)
+        number_clusters = ((tokens[:, first] == tokens[:, second]) & (tokens[:, first] != 0)).sum(axis=1)
+
+        results['score'][chunk] = (100
+                                   - WEIGHTS['hot_vertex'] * np.maximum(max_vertex_pips - (HOT_VERTEX_PIPS - 1), 0)
+                                   - WEIGHTS['resource_spread'] * resource_spread
+                                   - WEIGHTS['resource_clusters'] * resource_clusters
+                                   - WEIGHTS['number_clusters'] * number_clusters)
+        results['max_vertex_pips'][chunk] = max_vertex_pips
+        results['resource_pips'][chunk] = resource_pips
+        results['resource_spread'][chunk] = resource_spread
+        results['resource_clusters'][chunk] = resource_clusters
+        results['number_clusters'][chunk] = number_clusters
+
+    return results
+
+def score_board(board_words, mode):
+    """
+    Scores a single board in 'board_words' format.
+
+    Parameters:
+    - board_words (list of lists of str): The board in text format.
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - float: The board's fairness score, as computed by score_batch.
+    """
+    return float(score_batch(words_to_batch([board_words]), mode)['score'][0])
+
+def best_of_n(mode, n, top=1, seed=None):
+    """
+    Generates n valid candidate boards and keeps the fairest ones.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - n (int): The number of candidates to generate.
+    - top (int): The number of boards to return.
+    - seed (int, optional): Seed of the random stream used by generate_batch.
+
+    Returns:
+    - boards (ndarray of uint8): Shape (top, 2, hexes), the best boards, fairest first.
+    - scores (ndarray of float32): Shape (top,), their scores.
+    """
+    candidates = generate_batch(mode, n, seed)
+    scores = score_batch(candidates, mode)['score']
+    top = min(top, n)
+    best = np.argpartition(-scores, top - 1)[:top] if top < n else np.arange(n)
+    best = best[np.argsort(-scores[best], kind='stable')]
+    return candidates[best], scores[best]
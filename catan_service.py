@@ -0,0 +1,605 @@
+### Catan Board Randomizer ###
+###   Board Service (HTTP)   ###
+
+# Import Necessary Packages
+import argparse # Command line argument parsing
+import asyncio # Event loop serving every connection
+import collections # Deques holding the inventory and the recent latencies
+import itertools # Slicing the endless board stream
+import json # Request and response bodies
+import os # Used to find the number of available cores
+import random # Seeds of the refill chunks
+import time # Latency and throughput counters
+from concurrent.futures import ProcessPoolExecutor # Pool of worker processes refilling the inventory
+from urllib.parse import parse_qs, urlsplit # Query string parameters
+from catan_codes import code_to_text, encode_board # Board codes sent with every board
+from catan_constraints import RULES, ConstraintSet # Declarative house rules
+from catan_core import BOARD_DATA, MODES, iter_boards, register_layout # Headless board generation engine
+from catan_export import board_record # JSON record of one board
+from catan_layouts import read_layout # Custom map files
+
+# Address the service listens on unless asked otherwise. Only the local machine can reach it
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Boards kept ready per (mode, rules) pair, and boards generated by one pool task
+INVENTORY_DEPTH = 512
+REFILL_CHUNK = 64
+
+# Largest number of boards a single request may ask for, of requests in one batch, and of boards in one batch,
+# whose response is built in memory
+MAX_COUNT = 1_000_000
+MAX_BATCH = 1000
+MAX_BATCH_BOARDS = 10_000
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 20
+
+# Boards a worker may abandon in a row while looking for one that satisfies the rules, so requests with rules that
+# cannot be met fail instead of keeping a worker busy forever
+MAX_ATTEMPTS = 100_000
+
+# Boards sent per chunk of a streaming response
+STREAM_CHUNK = 256
+
+# Number of recent requests the latency percentiles are computed from
+LATENCY_WINDOW = 4096
+
+# Reason phrases of the status codes the service sends
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+def _init_worker(layouts):
+    """
+    Worker initializer: registers the custom layouts the service was started with.
+
+    Parameters:
+    - layouts (list of dict): Layout descriptions, see catan_layouts.build_layout.
+    """
+    for spec in layouts:
+        register_layout(spec)
+
+def generate_chunk(mode, rules, count, seed, max_attempts=MAX_ATTEMPTS):
+    """
+    Worker task: generates boards and encodes them as JSON lines, so the event loop only copies bytes.
+
+    Parameters:
+    - mode (str): The game mode.
+    - rules (tuple of str): Names of house rules from catan_constraints.RULES every board must satisfy.
+    - count (int): The number of boards.
+    - seed (int): The master seed passed to iter_boards.
+    - max_attempts (int): The boards abandoned in a row before giving up.
+
+    Returns:
+    - list of bytes: One JSON record per board, with 'board_words', 'ports', 'colors', 'seed' and 'code' (the base
+      32 board code, None for custom layouts).
+
+    Raises:
+    - RuntimeError: If no board satisfying the rules was found within 'max_attempts'.
+    """
+    constraints = ConstraintSet([RULES[rule]() for rule in rules]) if rules else ()
+    boards = iter_boards(mode, seed, constraints, max_attempts)
+    lines = []
+    for board_words, ports, colors, board_seed in itertools.islice(boards, count):
+        record = board_record(board_words, ports, colors, board_seed)
+        try:
+            record['code'] = code_to_text(encode_board(board_words))
+        except ValueError:
+            record['code'] = None # Custom layouts have no board codes
+        lines.append(json.dumps(record).encode())
+    return lines
+
+def board_key(mode, rules):
+    """
+    Checks the parameters of a request and turns them into an inventory key.
+
+    Parameters:
+    - mode (str): The game mode.
+    - rules (iterable of str): Names of house rules.
+
+    Returns:
+    - tuple: (mode, sorted tuple of distinct rule names).
+
+    Raises:
+    - ValueError: If the mode or a rule is unknown, or they are not a string and a list of strings.
+    """
+    if not isinstance(mode, str):
+        raise ValueError("mode must be a string")
+    if not isinstance(rules, (list, tuple)) or not all(isinstance(rule, str) for rule in rules):
+        raise ValueError("rules must be a list of strings")
+    if mode not in BOARD_DATA:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {sorted(BOARD_DATA)}")
+    rules = tuple(sorted(set(rules)))
+    for rule in rules:
+        if rule not in RULES:
+            raise ValueError(f"Unknown rule {rule!r}, expected any of {sorted(RULES)}")
+    return mode, rules
+
+def parse_count(value, limit=MAX_COUNT):
+    """
+    Parameters:
+    - value (str or int): The requested number of boards.
+    - limit (int): The largest number allowed.
+
+    Returns:
+    - int: The number of boards.
+
+    Raises:
+    - ValueError: If the value is not a whole number from 1 to 'limit'.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError("count must be a whole number")
+    count = int(value)
+    if not 1 <= count <= limit:
+        raise ValueError(f"count must be between 1 and {limit}")
+    return count
+
+class Inventory:
+    """
+    Pre-generated boards per (mode, rules) key, refilled in the background by a process pool.
+
+    Taking boards pops them from the key's deque and tops it back up to 'depth' plus whatever is still owed,
+    in chunks of 'chunk' boards per pool task. A request that finds too few boards waits for the next chunk
+    instead of generating anything on the event loop, so the loop is never blocked by generation.
+
+    Attributes:
+    - executor (concurrent.futures.Executor): The pool running generate_chunk.
+    - depth (int): The number of boards kept ready per key.
+    - chunk (int): The number of boards generated per pool task.
+    - max_attempts (int): The boards a pool task may abandon in a row before its key fails.
+    - generated (int): The boards generated by the pool so far.
+    - generate_seconds (float): The time spent in pool tasks, as seen from the event loop.
+    """
+
+    def __init__(self, executor, depth=INVENTORY_DEPTH, chunk=REFILL_CHUNK, seed=None, max_attempts=MAX_ATTEMPTS):
+        self.executor = executor
+        self.depth = depth
+        self.chunk = chunk
+        self.max_attempts = max_attempts
+        self.generated = 0
+        self.generate_seconds = 0.0
+        self._boards = {} # Ready boards per key, as encoded JSON records
+        self._pending = {} # Boards being generated per key
+        self._ready = {} # Condition notified whenever a chunk for the key lands
+        self._failure = {} # Last error a refill of the key raised
+        self._seeds = random.Random(seed)
+        self._tasks = set() # Running refill tasks, kept so they are not garbage collected
+
+    def levels(self):
+        """
+        Returns:
+        - dict: "mode [rules]" -> ready boards, for every key that was ever requested.
+        """
+        return {' '.join((mode,) + rules): len(boards) for (mode, rules), boards in self._boards.items()}
+
+    def _refill(self, key, owed=0):
+        """
+        Starts enough pool tasks to bring the key back to 'depth' boards plus those already owed to requests.
+
+        Parameters:
+        - key (tuple): The inventory key.
+        - owed (int): Boards requests are waiting for, on top of the depth.
+        """
+        boards = self._boards.setdefault(key, collections.deque())
+        self._ready.setdefault(key, asyncio.Condition())
+        while len(boards) + self._pending.get(key, 0) < self.depth + owed:
+            self._pending[key] = self._pending.get(key, 0) + self.chunk
+            task = asyncio.create_task(self._fill(key, self._seeds.getrandbits(64)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fill(self, key, seed):
+        """
+        Runs one pool task and adds its boards to the inventory.
+
+        Parameters:
+        - key (tuple): The inventory key.
+        - seed (int): The master seed of the chunk.
+        """
+        mode, rules = key
+        start = time.perf_counter()
+        try:
+            lines = await asyncio.get_running_loop().run_in_executor(self.executor, generate_chunk, mode, rules,
+                                                                     self.chunk, seed, self.max_attempts)
+        except Exception as error:
+            self._failure[key] = error
+            lines = []
+        finally:
+            self._pending[key] -= self.chunk
+        self.generate_seconds += time.perf_counter() - start
+        self.generated += len(lines)
+        self._boards[key].extend(lines)
+        async with self._ready[key]:
+            self._ready[key].notify_all()
+
+    async def close(self):
+        """
+        Cancels the running refills and waits for them, so no task outlives the pool it runs on.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def warm(self, keys):
+        """
+        Starts filling the inventory of every key without waiting for it.
+
+        Parameters:
+        - keys (iterable of tuples): Inventory keys, see board_key.
+        """
+        for key in keys:
+            self._refill(key)
+
+    async def take(self, key, count):
+        """
+        Takes boards from the inventory, waiting for the pool if there are not enough.
+
+        Parameters:
+        - key (tuple): The inventory key, see board_key.
+        - count (int): The number of boards.
+
+        Returns:
+        - list of bytes: The encoded JSON records of the boards.
+
+        Raises:
+        - RuntimeError: If a refill for the key failed, for instance because its rules cannot be met.
+        """
+        taken = []
+        boards = self._boards.setdefault(key, collections.deque())
+        while True:
+            while boards and len(taken) < count:
+                taken.append(boards.popleft())
+            self._refill(key, count - len(taken))
+            if len(taken) == count:
+                return taken
+            async with self._ready[key]:
+                await self._ready[key].wait()
+            if key in self._failure:
+                raise RuntimeError(f"Generating boards failed: {self._failure.pop(key)}")
+
+    async def stream(self, key, count, size=STREAM_CHUNK):
+        """
+        Takes boards in chunks, so a bulk pull can be sent while the rest is still being generated.
+
+        Parameters:
+        - key (tuple): The inventory key.
+        - count (int): The total number of boards.
+        - size (int): The number of boards per chunk.
+
+        Yields:
+        - list of bytes: The encoded JSON records of the next chunk.
+        """
+        for start in range(0, count, size):
+            yield await self.take(key, min(size, count - start))
+
+class ServiceStats:
+    """
+    Latency and throughput counters of the service.
+
+    Attributes:
+    - started (float): The perf_counter time the service started at.
+    - requests (collections.Counter): Requests per route, plus 'errors'.
+    - boards (int): Boards sent.
+    - latencies (collections.deque): Seconds taken by the last LATENCY_WINDOW requests, from parsing the request
+      to writing the last byte.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.requests = collections.Counter()
+        self.boards = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, route, boards, seconds):
+        """
+        Parameters:
+        - route (str): The route that handled the request.
+        - boards (int): The boards sent in the response.
+        - seconds (float): The time the request took.
+        """
+        self.requests[route] += 1
+        self.boards += boards
+        self.latencies.append(seconds)
+
+    def snapshot(self, inventory):
+        """
+        Parameters:
+        - inventory (Inventory): The inventory, for its levels and generation rate.
+
+        Returns:
+        - dict: Uptime, request counts, boards sent per second, latency percentiles in milliseconds over the
+          recent requests, inventory levels, and how fast one pool process generates boards.
+        """
+        uptime = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        percentiles = {f"p{p}": latencies[min(len(latencies) - 1, len(latencies) * p // 100)] * 1000
+                       for p in (50, 90, 99)} if latencies else {}
+        return {
+            'uptime_s': uptime,
+            'requests': dict(self.requests),
+            'boards_sent': self.boards,
+            'boards_per_s': self.boards / uptime if uptime else 0.0,
+            'latency_ms': percentiles | ({'mean': sum(latencies) / len(latencies) * 1000,
+                                         'max': latencies[-1] * 1000} if latencies else {}),
+            'inventory': inventory.levels(),
+            'generated': inventory.generated,
+            'pool_boards_per_s': inventory.generated / inventory.generate_seconds if inventory.generate_seconds else 0.0,
+        }
+
+class HTTPError(Exception):
+    """
+    Raised by a route to answer with an error status.
+
+    Attributes:
+    - status (int): The HTTP status code.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class BoardService:
+    """
+    A small HTTP/1.1 server on asyncio handing out boards from the inventory as JSON.
+
+    Routes:
+    - GET /board?mode=Regular&rule=desert-in-center: one board, with 'board_words', 'ports', 'colors', 'seed' and
+      'code'. 'rule' may be repeated or given as a comma separated list.
+    - GET /boards?mode=...&rule=...&count=N: N boards streamed as one JSON record per line, in chunked encoding.
+    - POST /batch: a JSON list of {"mode", "rules", "count"} requests, answered with a JSON list holding the list
+      of boards of each request, so many small pulls cost a single round trip.
+    - GET /stats: the counters of ServiceStats.snapshot.
+
+    Connections are kept alive unless the client asks to close them.
+
+    Attributes:
+    - inventory (Inventory): The boards kept ready.
+    - stats (ServiceStats): The counters.
+    """
+
+    def __init__(self, inventory):
+        self.inventory = inventory
+        self.stats = ServiceStats()
+        self.routes = {
+            '/board': ('GET', self.get_board),
+            '/boards': ('GET', self.get_boards),
+            '/batch': ('POST', self.post_batch),
+            '/stats': ('GET', self.get_stats),
+        }
+
+    @staticmethod
+    def _key(query):
+        """
+        Parameters:
+        - query (dict): The parsed query string.
+
+        Returns:
+        - tuple: The inventory key of the request, see board_key.
+        """
+        rules = [rule for value in query.get('rule', []) for rule in value.split(',') if rule]
+        return board_key(query.get('mode', ['Regular'])[0], rules)
+
+    async def get_board(self, query, body, writer):
+        """
+        Sends one board.
+
+        Parameters:
+        - query (dict): The parsed query string.
+        - body (bytes): The request body.
+        - writer (asyncio.StreamWriter): The connection.
+
+        Returns:
+        - int: The number of boards sent.
+        """
+        (line,) = await self.inventory.take(self._key(query), 1)
+        await self._send(writer, 200, line)
+        return 1
+
+    async def get_boards(self, query, body, writer):
+        """
+        Streams many boards, one JSON record per line, taking them chunk by chunk.
+
+        The first chunk is taken before the status line is sent, so a request that cannot be served still gets an
+        error response. A failure after that can only be signalled by breaking the stream, so the connection is
+        aborted and the client sees an incomplete chunked body.
+
+        Parameters:
+        - query (dict): The parsed query string.
+        - body (bytes): The request body.
+        - writer (asyncio.StreamWriter): The connection.
+
+        Returns:
+        - int: The number of boards sent.
+
+        Raises:
+        - ConnectionAbortedError: If taking boards failed after the stream had started.
+        """
+        key = self._key(query)
+        count = parse_count(query.get('count', ['1'])[0])
+        chunks = self.inventory.stream(key, count)
+        lines = await anext(chunks)
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n')
+        try:
+            while lines is not None:
+                data = b'\n'.join(lines) + b'\n'
+                writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+                await writer.drain() # Wait for the client to read before taking more boards
+                lines = await anext(chunks, None)
+        except RuntimeError as error:
+            self.stats.requests['errors'] += 1
+            writer.transport.abort()
+            raise ConnectionAbortedError(f"Stream broken off: {error}") from error
+        writer.write(b'0\r\n\r\n')
+        return count
+
+    async def post_batch(self, query, body, writer):
+        """
+        Answers a list of requests in one response.
+
+        Parameters:
+        - query (dict): The parsed query string.
+        - body (bytes): The request body.
+        - writer (asyncio.StreamWriter): The connection.
+
+        Returns:
+        - int: The number of boards sent.
+        """
+        try:
+            requests = json.loads(body or b'[]')
+        except ValueError:
+            raise HTTPError(400, "The body is not valid JSON")
+        if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+            raise HTTPError(400, f"The body must be a list of at most {MAX_BATCH} requests")
+        if not all(isinstance(request, dict) for request in requests):
+            raise HTTPError(400, "Every request of a batch must be an object")
+
+        # Check every request first, then take all the boards concurrently
+        pulls = [(board_key(request.get('mode', 'Regular'), request.get('rules', [])),
+                  parse_count(request.get('count', 1))) for request in requests]
+        if sum(count for _, count in pulls) > MAX_BATCH_BOARDS:
+            raise HTTPError(400, f"A batch may ask for at most {MAX_BATCH_BOARDS} boards in total")
+        results = await asyncio.gather(*(self.inventory.take(key, count) for key, count in pulls))
+        await self._send(writer, 200, b'[' + b','.join(b'[' + b','.join(lines) + b']' for lines in results) + b']')
+        return sum(count for _, count in pulls)
+
+    async def get_stats(self, query, body, writer):
+        """
+        Sends the counters.
+
+        Parameters:
+        - query (dict): The parsed query string.
+        - body (bytes): The request body.
+        - writer (asyncio.StreamWriter): The connection.
+
+        Returns:
+        - int: The number of boards sent.
+        """
+        await self._send(writer, 200, json.dumps(self.stats.snapshot(self.inventory)).encode())
+        return 0
+
+    @staticmethod
+    async def _send(writer, status, body, content_type='application/json'):
+        """
+        Writes a complete response with a known length.
+
+        Parameters:
+        - writer (asyncio.StreamWriter): The connection.
+        - status (int): The HTTP status code.
+        - body (bytes): The response body.
+        - content_type (str): The media type of the body.
+        """
+        writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        """
+        Serves the requests of one connection until it is closed.
+
+        Parameters:
+        - reader (asyncio.StreamReader): The incoming side of the connection.
+        - writer (asyncio.StreamWriter): The outgoing side of the connection.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                start = time.perf_counter()
+                route, boards, headers = 'bad request', 0, {}
+                try:
+                    try:
+                        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                            name, _, value = line.decode('latin-1').partition(':')
+                            headers[name.strip().lower()] = value.strip()
+                        length = int(headers.get('content-length', 0))
+                        if not 0 <= length <= MAX_BODY:
+                            raise ValueError
+                    except ValueError:
+                        # Without a request line and length the next request cannot be found, so close afterwards
+                        headers['connection'] = 'close'
+                        raise HTTPError(400, "Malformed request line or Content-Length")
+                    body = await reader.readexactly(length)
+
+                    url = urlsplit(target)
+                    route = url.path if url.path in self.routes else 'not found'
+                    if route == 'not found':
+                        raise HTTPError(404, f"No route {url.path}")
+                    allowed, handler = self.routes[route]
+                    if method != allowed:
+                        raise HTTPError(405, f"{url.path} only answers {allowed}")
+                    boards = await handler(parse_qs(url.query), body, writer)
+                except (HTTPError, ValueError, RuntimeError) as error:
+                    status = getattr(error, 'status', 500 if isinstance(error, RuntimeError) else 400)
+                    self.stats.requests['errors'] += 1
+                    await self._send(writer, status, json.dumps({'error': str(error)}).encode())
+                await writer.drain()
+                self.stats.record(route, boards, time.perf_counter() - start)
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass # The client went away, or a broken stream was aborted
+        finally:
+            writer.close()
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, depth=INVENTORY_DEPTH, chunk=REFILL_CHUNK,
+                layouts=(), seed=None, ready=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Runs the service until it is cancelled.
+
+    Parameters:
+    - host (str): The address to listen on.
+    - port (int): The port to listen on, 0 for any free port.
+    - workers (int, optional): The number of pool processes. Defaults to the number of available cores.
+    - depth (int): Boards kept ready per key.
+    - chunk (int): Boards generated per pool task.
+    - layouts (list of dict): Custom layout descriptions to register in this process and in the workers.
+    - seed (int, optional): Master seed of the refill chunks.
+    - ready (callable, optional): Called with the (host, port) the server listens on, once it accepts
+      connections.
+    - max_attempts (int): The boards a worker may abandon in a row before a request with its rules fails.
+    """
+    modes = list(MODES) + [register_layout(spec) for spec in layouts]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker,
+                             initargs=(list(layouts),)) as executor:
+        service = BoardService(Inventory(executor, depth, chunk, seed, max_attempts))
+        service.inventory.warm(board_key(mode, ()) for mode in modes) # Start every mode warm
+        server = await asyncio.start_server(service.handle, host, port)
+        async with server:
+            if ready is not None:
+                ready(server.sockets[0].getsockname()[:2])
+            try:
+                await server.serve_forever()
+            finally:
+                await service.inventory.close()
+
+def main(argv=None):
+    """
+    Command line entry point: runs the board service.
+
+    Parameters:
+    - argv (list of str, optional): The command line arguments. Defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Serve random valid Catan boards over HTTP as JSON.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes refilling the inventory")
+    parser.add_argument('--depth', type=int, default=INVENTORY_DEPTH, help="boards kept ready per mode and rules")
+    parser.add_argument('--chunk', type=int, default=REFILL_CHUNK, help="boards generated per pool task")
+    parser.add_argument('-l', '--layout', action='append', default=[], help="layout file of a custom map to serve")
+    parser.add_argument('-s', '--seed', type=int, default=None, help="master seed of the inventory")
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                        help="boards a worker may abandon in a row before a request with rules fails")
+    args = parser.parse_args(argv)
+
+    layouts = [read_layout(path) for path in args.layout]
+    ready = lambda address: print(f"Serving boards on http://{address[0]}:{address[1]}", flush=True)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.depth, args.chunk, layouts, args.seed, ready,
+                          args.max_attempts))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
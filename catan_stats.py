@@ -0,0 +1,204 @@
+### Catan Board Randomizer ###
+###     Hot Path Statistics  ###
+
+# Import Necessary Packages
+import functools # Keeps the names and docstrings of the timed functions
+import sys # Lookup of the modules holding the timed functions
+import threading # Lock for updates from the prefetch thread
+import time # High resolution timers
+
+# True while the registered functions are wrapped with timers; checked before recording observations
+enabled = False
+
+# Functions that can be timed, as (module, function names) pairs added by register()
+_registry = []
+
+# id of every timed wrapper made by enable() -> (wrapper, original function)
+_originals = {}
+
+# Recorded data and the lock guarding it
+_timings = {}
+_observations = {}
+_lock = threading.Lock()
+
+def register(module_name, names):
+    """
+    Makes functions of a module available for timing. Nothing changes until enable() is called, or, for a module
+    imported while timing is on, the functions are timed straight away.
+
+    Parameters:
+    - module_name (str): The name of the module in sys.modules, usually __name__.
+    - names (iterable of str): The names of the module's functions to time.
+    """
+    module = sys.modules[module_name]
+    _registry.append((module, tuple(names)))
+    if enabled:
+        _wrap(module, names)
+
+def _project_modules():
+    """
+    Returns:
+    - list of modules: The loaded catan_ modules and the main script.
+    """
+    return [module for name, module in list(sys.modules.items()) if name.startswith('catan_') or name == '__main__']
+
+def _timed(name, function):
+    """
+    Parameters:
+    - name (str): The name the timings are recorded under.
+    - function (callable): The function to time.
+
+    Returns:
+    - callable: A wrapper recording the duration of every call.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - start)
+    return wrapper
+
+def _wrap(module, names):
+    """
+    Replaces functions of a module by timed wrappers, in the module and in every other catan_ module that
+    imported them by name.
+
+    Parameters:
+    - module (module): The module defining the functions.
+    - names (iterable of str): The names of the functions.
+    """
+    holders = _project_modules()
+    for name in names:
+        original = getattr(module, name)
+        wrapper = _timed(name, original)
+        _originals[id(wrapper)] = (wrapper, original)
+        # Swap every reference to the function held by the project's modules
+        for holder in holders:
+            for attribute, value in list(vars(holder).items()):
+                if value is original:
+                    setattr(holder, attribute, wrapper)
+
+def enable():
+    """
+    Starts timing every registered function.
+
+    The functions are replaced by timed wrappers in their own module and in every other catan_ module that
+    imported them by name, so internal calls such as new_board calling add_numbers are timed too. Modules imported
+    later pick up the wrappers when importing by name, and their own functions are wrapped when they register.
+    While disabled the original functions are in place and the instrumentation costs nothing.
+
+    Globals:
+    - enabled (bool): Set to True.
+    """
+    global enabled
+    if enabled:
+        return
+
+    enabled = True
+    for module, names in _registry:
+        _wrap(module, names)
+
+def disable():
+    """
+    Puts the original functions back wherever a wrapper is held, including modules imported while timing was on.
+    Recorded data is kept until reset().
+
+    Globals:
+    - enabled (bool): Set to False.
+    """
+    global enabled
+    enabled = False
+    for holder in _project_modules():
+        for attribute, value in list(vars(holder).items()):
+            wrapped = _originals.get(id(value))
+            if wrapped is not None and wrapped[0] is value:
+                setattr(holder, attribute, wrapped[1])
+    _originals.clear()
+
+def reset():
+    """
+    Forgets every recorded timing and observation.
+    """
+    with _lock:
+        _timings.clear()
+        _observations.clear()
+
+def record(name, seconds):
+    """
+    Records one duration.
+
+    Durations go into a histogram with power of two buckets in microseconds: bucket b holds durations from
+    2 ** (b - 1) up to 2 ** b microseconds.
+
+    Parameters:
+    - name (str): The name of the timed phase.
+    - seconds (float): The duration.
+    """
+    bucket = int(seconds * 1e6).bit_length()
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            timing = _timings[name] = {'count': 0, 'total': 0.0, 'min': seconds, 'max': seconds, 'histogram': {}}
+        timing['count'] += 1
+        timing['total'] += seconds
+        timing['min'] = min(timing['min'], seconds)
+        timing['max'] = max(timing['max'], seconds)
+        timing['histogram'][bucket] = timing['histogram'].get(bucket, 0) + 1
+
+def observe(name, value):
+    """
+    Records one integer value, such as the attempts a board needed. Callers check 'enabled' first.
+
+    Parameters:
+    - name (str): The name of the measured quantity.
+    - value (int): The observed value.
+    """
+    with _lock:
+        histogram = _observations.setdefault(name, {})
+        histogram[value] = histogram.get(value, 0) + 1
+
+def snapshot():
+    """
+    Returns a copy of everything recorded so far.
+
+    Returns:
+    - dict: 'timings' maps every timed phase to its 'count', 'total_s', 'mean_us', 'min_us', 'max_us' and
+      'histogram' ({upper bound in microseconds: calls}); 'observations' maps every measured quantity to its
+      'count', 'mean' and 'histogram' ({value: occurrences}).
+    """
+    with _lock:
+        timings = {
+            name: {
+                'count': timing['count'],
+                'total_s': timing['total'],
+                'mean_us': timing['total'] / timing['count'] * 1e6,
+                'min_us': timing['min'] * 1e6,
+                'max_us': timing['max'] * 1e6,
+                'histogram': {2 ** bucket: calls for bucket, calls in sorted(timing['histogram'].items())},
+            }
+            for name, timing in _timings.items()
+        }
+        observations = {}
+        for name, histogram in _observations.items():
+            count = sum(histogram.values())
+            observations[name] = {
+                'count': count,
+                'mean': sum(value * times for value, times in histogram.items()) / count,
+                'histogram': dict(sorted(histogram.items())),
+            }
+    return {'timings': timings, 'observations': observations}
+
+def summary_lines():
+    """
+    Returns:
+    - list of str: One readable line per timed phase and measured quantity, slowest phases first.
+    """
+    stats = snapshot()
+    lines = [f"{name:<20} {timing['count']:>7}x  mean {timing['mean_us'] / 1000:8.3f} ms  "
+             f"max {timing['max_us'] / 1000:8.3f} ms"
+             for name, timing in sorted(stats['timings'].items(), key=lambda item: -item[1]['total_s'])]
+    lines += [f"{name:<20} {observed['count']:>7}x  mean {observed['mean']:8.2f}"
+              for name, observed in stats['observations'].items()]
+    return lines
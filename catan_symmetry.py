@@ -0,0 +1,355 @@
+### Catan Board Randomizer ###
+###    Board Symmetries    ###
+
+# Import Necessary Packages
+import math # Rotations of hex positions
+import os # Spill files of the deduplicator
+import tempfile # Default spill directory
+from functools import lru_cache # Caches the per mode symmetry tables
+import numpy as np # Array library used to hash whole batches of boards at once
+from catan_batch import RESOURCES, TOKENS, batch_to_words, words_to_batch # Batch board arrays
+from catan_core import BOARD_DATA, get_topology # Layout data and hex topology
+
+# Seed of the random tables behind the canonical hash, fixed so hashes can be compared between runs
+HASH_SEED = 0x5EED_CA7A
+
+# Number of distinct (resource, token) codes per hex: resource * 13 + token
+CELL_CODES = 6 * 13
+
+# Boards hashed per chunk, which keeps the gathered table values in cache
+CHUNK_SIZE = 1 << 14
+
+# Positions closer than this, in half hex widths, count as the same position
+TOLERANCE = 1e-6
+
+def _rotate(x, y, rotation, reflect):
+    """
+    Applies one of the 12 dihedral symmetries to a point given relative to the board's centre.
+
+    Parameters:
+    - x (float): The horizontal offset, in doubled columns.
+    - y (float): The vertical offset, in rows.
+    - rotation (int): The number of 60 degree turns, from 0 to 5.
+    - reflect (bool): Whether to mirror the point top to bottom before turning it.
+
+    Returns:
+    - tuple of float: The moved (x, y) in the same units.
+    """
+    # Doubled columns and rows become a true to scale plane once rows are stretched by sqrt(3)
+    y *= math.sqrt(3)
+    if reflect:
+        y = -y
+    angle = math.pi / 3 * rotation
+    x, y = x * math.cos(angle) - y * math.sin(angle), x * math.sin(angle) + y * math.cos(angle)
+    return x, y / math.sqrt(3)
+
+@lru_cache(maxsize=None)
+def symmetries(mode, include_ports=False):
+    """
+    Lists the dihedral symmetries that map a layout onto itself.
+
+    Each of the 6 rotations and 6 reflections of the plane is tried around the centre of the board; the ones
+    sending every hex onto a hex are kept. The Regular board keeps all 12, the Expansion board keeps 4. With
+    'include_ports' only the symmetries that also send every port onto a port of the same color are kept.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - include_ports (bool): Whether the port layout has to be preserved as well.
+
+    Returns:
+    - tuple of tuples: (rotation, reflect, permutation) for every symmetry, identity first, where
+      permutation[i] is the hex that hex i is moved onto.
+    """
+    topology = get_topology(mode)
+    centre_x = sum(x for x, _ in topology.doubled) / topology.hex_count
+    centre_r = sum(r for _, r in topology.doubled) / topology.hex_count
+
+    def key(x, r):
+        return round(x / TOLERANCE), round(r / TOLERANCE)
+    index_of = {key(x - centre_x, r - centre_r): index for index, (x, r) in enumerate(topology.doubled)}
+    port_keys = {(key(*_port_offset(mode, port)), color)
+                 for port, color in zip(BOARD_DATA[mode]['ports'], BOARD_DATA[mode]['colors'])}
+
+    found = []
+    for reflect in (False, True):
+        for rotation in range(6):
+            permutation = [index_of.get(key(*_rotate(x - centre_x, r - centre_r, rotation, reflect)))
+                           for x, r in topology.doubled]
+            if None in permutation:
+                continue
+            if include_ports:
+                moved = {(key(*_rotate(*_port_offset(mode, port), rotation, reflect)), color)
+                         for port, color in zip(BOARD_DATA[mode]['ports'], BOARD_DATA[mode]['colors'])}
+                if moved != port_keys:
+                    continue
+            found.append((rotation, reflect, tuple(permutation)))
+    return tuple(found)
+
+@lru_cache(maxsize=None)
+def _port_shift(mode):
+    """
+    Parameters:
+    - mode (str): The game mode.
+
+    Returns:
+    - tuple of float: The doubled column and row of the board's centre. Port columns are half doubled columns.
+    """
+    topology = get_topology(mode)
+    centre_x = sum(x for x, _ in topology.doubled) / topology.hex_count
+    centre_r = sum(r for _, r in topology.doubled) / topology.hex_count
+    return centre_x, centre_r
+
+def _port_offset(mode, port):
+    """
+    Parameters:
+    - mode (str): The game mode.
+    - port (tuple): The (row, column) of a port.
+
+    Returns:
+    - tuple of float: The port's position relative to the board's centre, in doubled columns and rows.
+    """
+    centre_x, centre_r = _port_shift(mode)
+    row, col = port
+    return 2 * col - centre_x, row - centre_r
+
+def transform_ports(ports, mode, symmetry):
+    """
+    Moves port positions with a symmetry of the layout.
+
+    Parameters:
+    - ports (list of tuples): The (row, column) of every port.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - symmetry (tuple): One entry of symmetries(mode).
+
+    Returns:
+    - list of tuples: The moved (row, column) of every port, in the same order.
+    """
+    rotation, reflect, _ = symmetry
+    centre_x, centre_r = _port_shift(mode)
+    moved = []
+    for port in ports:
+        x, r = _rotate(*_port_offset(mode, port), rotation, reflect)
+        moved.append((round(r + centre_r, 6), round((x + centre_x) / 2, 6)))
+    return moved
+
+@lru_cache(maxsize=None)
+def hash_tables(mode, include_ports=False):
+    """
+    Builds one tabulation hash table per symmetry.
+
+    The hash of a board XORs a random 64 bit value per (hex, cell code). Hashing a moved board is the same as
+    hashing the original board with the rows of the table moved along, so every symmetry gets its own table and
+    the boards themselves are never permuted.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - include_ports (bool): Whether the port layout has to be preserved as well.
+
+    Returns:
+    - ndarray of uint64: Shape (symmetries, hexes, CELL_CODES).
+    """
+    hex_count = get_topology(mode).hex_count
+    table = np.random.default_rng(HASH_SEED).integers(0, 2 ** 64, size=(hex_count, CELL_CODES),
+                                                      dtype=np.uint64, endpoint=False)
+    return np.stack([table[list(permutation)] for _, _, permutation in symmetries(mode, include_ports)])
+
+def _hashes(boards, mode, include_ports):
+    """
+    Returns:
+    - ndarray of uint64: Shape (symmetries, n), the hash of every board moved by every symmetry.
+    """
+    tables = hash_tables(mode, include_ports)
+    symmetry_count, hex_count, _ = tables.shape
+    tables = tables.reshape(symmetry_count, -1)
+
+    # One flat table index per hex and board, laid out hex by hex so each XOR runs over a contiguous row
+    codes = boards[:, RESOURCES].astype(np.intp) * 13 + boards[:, TOKENS]
+    indices = np.ascontiguousarray((codes + np.arange(hex_count) * CELL_CODES).T)
+
+    hashes = np.empty((symmetry_count, len(boards)), dtype=np.uint64)
+    for symmetry, table in enumerate(tables):
+        gathered = table[indices]
+        hashed = hashes[symmetry]
+        hashed[:] = gathered[0]
+        for row in gathered[1:]:
+            hashed ^= row
+    return hashes
+
+def canonical_hash(boards, mode, include_ports=False):
+    """
+    Hashes a batch of boards so that boards that are rotations or reflections of each other hash the same.
+
+    The canonical hash is the smallest hash among all symmetric copies of the board.
+
+    Parameters:
+    - boards (ndarray of uint8): Shape (n, 2, hexes), as returned by generate_batch.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - include_ports (bool): Only treat boards as identical if the symmetry also preserves the port layout.
+
+    Returns:
+    - ndarray of uint64: Shape (n,), the canonical hash of every board.
+    """
+    hashes = np.empty(len(boards), dtype=np.uint64)
+    for start in range(0, len(boards), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        hashes[chunk] = _hashes(boards[chunk], mode, include_ports).min(axis=0)
+    return hashes
+
+def canonicalize_batch(boards, mode, include_ports=False):
+    """
+    Moves every board of a batch to its canonical orientation, the symmetric copy with the smallest hash.
+
+    Parameters:
+    - boards (ndarray of uint8): Shape (n, 2, hexes).
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - include_ports (bool): Only use symmetries that preserve the port layout.
+
+    Returns:
+    - canonical (ndarray of uint8): Shape (n, 2, hexes), the boards in canonical orientation.
+    - chosen (ndarray of intp): Shape (n,), the index into symmetries(mode, include_ports) used for every board.
+    """
+    chosen = np.empty(len(boards), dtype=np.intp)
+    for start in range(0, len(boards), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        chosen[chunk] = _hashes(boards[chunk], mode, include_ports).argmin(axis=0)
+    permutations = np.array([permutation for _, _, permutation in symmetries(mode, include_ports)], dtype=np.intp)
+    # Hex i of a board lands on permutation[i], so the canonical hex j is read from the inverse permutation
+    sources = np.argsort(permutations, axis=1)[chosen]
+    canonical = np.take_along_axis(boards, sources[:, None, :], axis=2)
+    return canonical, chosen
+
+def canonicalize(board_words, ports, mode, include_ports=False):
+    """
+    Moves a single board and its ports to the board's canonical orientation.
+
+    Parameters:
+    - board_words (list of lists of str): The board in text format.
+    - ports (list of tuples): The port locations.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - include_ports (bool): Only use symmetries that preserve the port layout.
+
+    Returns:
+    - board_words (list of lists of str): The canonical board.
+    - ports (list of tuples): The ports moved along with it.
+    - hash (int): The canonical 64 bit hash.
+    """
+    boards = words_to_batch([board_words])
+    canonical, chosen = canonicalize_batch(boards, mode, include_ports)
+    symmetry = symmetries(mode, include_ports)[chosen[0]]
+    return (batch_to_words(canonical, mode)[0], transform_ports(ports, mode, symmetry),
+            int(canonical_hash(boards, mode, include_ports)[0]))
+
+class BoardDeduplicator:
+    """
+    A set of 64 bit board hashes that stays within a memory budget.
+
+    Hashes are kept as sorted runs: every batch adds one run and runs of similar size are merged, so inserting
+    costs a sort of the batch plus occasional merges and a lookup costs one binary search per run. Once more
+    than 'max_items' hashes are held in memory they are written to one sorted file in 'spill_dir' and searched
+    through a memory map from then on, so only the pages that lookups touch are read back. Without a spill
+    directory a full set raises MemoryError.
+
+    Attributes:
+    - max_items (int): The number of hashes kept in memory before spilling.
+    - spill_dir (str or None): Where sorted runs are written.
+    - count (int): The number of distinct hashes seen.
+    """
+
+    def __init__(self, max_items=1 << 25, spill_dir=None):
+        self.max_items = max_items
+        self.spill_dir = spill_dir
+        self.count = 0
+        self._memory_runs = [] # Sorted arrays in memory, roughly halving in size
+        self._disk_runs = [] # Memory mapped sorted arrays
+        self._paths = [] # Files behind the disk runs
+
+    def __len__(self):
+        return self.count
+
+    def _contains(self, hashes):
+        """
+        Returns:
+        - ndarray of bool: For every hash of a sorted array, whether it is already in the set.
+        """
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self._memory_runs + self._disk_runs:
+            if len(run):
+                positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+                seen |= run[positions] == hashes
+        return seen
+
+    def add_batch(self, hashes):
+        """
+        Adds a batch of hashes to the set.
+
+        Parameters:
+        - hashes (ndarray of uint64): The hashes of a batch of boards.
+
+        Returns:
+        - ndarray of bool: True for the first occurrence of every hash not seen in earlier batches.
+
+        Raises:
+        - MemoryError: If the set outgrows 'max_items' and there is no spill directory.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        unique, first = np.unique(hashes, return_index=True)
+        new = ~self._contains(unique)
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first[new]] = True
+
+        added = unique[new]
+        if len(added):
+            self.count += len(added)
+            self._memory_runs.append(added)
+            # Merge runs of similar size so there are only logarithmically many
+            while len(self._memory_runs) > 1 and len(self._memory_runs[-2]) <= 2 * len(self._memory_runs[-1]):
+                last = self._memory_runs.pop()
+                self._memory_runs[-1] = np.sort(np.concatenate([self._memory_runs[-1], last]), kind='stable')
+            if sum(len(run) for run in self._memory_runs) > self.max_items:
+                self._spill()
+        return keep
+
+    def _spill(self):
+        """
+        Writes every in-memory run to disk as one sorted file and memory maps it.
+        """
+        if self.spill_dir is None:
+            raise MemoryError(f"More than {self.max_items} distinct boards; pass spill_dir to spill to disk")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        merged = np.sort(np.concatenate(self._memory_runs), kind='stable')
+        handle, path = tempfile.mkstemp(prefix='dedup_', suffix='.npy', dir=self.spill_dir)
+        with os.fdopen(handle, 'wb') as out:
+            np.save(out, merged)
+        self._paths.append(path)
+        self._disk_runs.append(np.load(path, mmap_mode='r'))
+        self._memory_runs = []
+
+    def close(self):
+        """
+        Releases the memory maps and deletes the spill files.
+        """
+        self._disk_runs = []
+        for path in self._paths:
+            os.remove(path)
+        self._paths = []
+
+def dedup_stream(batches, mode, include_ports=False, max_items=1 << 25, spill_dir=None):
+    """
+    Drops boards that are rotations or reflections of any board seen earlier in a stream of batches.
+
+    Parameters:
+    - batches (iterable of ndarrays): Batches of boards of shape (n, 2, hexes), such as generate_batch output.
+    - mode (str): The game mode ("Regular" or "Expansion").
+    - include_ports (bool): Only treat boards as identical if the symmetry also preserves the port layout.
+    - max_items (int): The number of hashes kept in memory before spilling.
+    - spill_dir (str, optional): Where to spill hashes to once memory is full.
+
+    Yields:
+    - ndarray of uint8: The boards of each batch that were not seen before, in their original orientation.
+    """
+    seen = BoardDeduplicator(max_items, spill_dir)
+    try:
+        for boards in batches:
+            yield boards[seen.add_batch(canonical_hash(boards, mode, include_ports))]
+    finally:
+        seen.close()
@@ -0,0 +1,249 @@
+### Catan Board Randomizer ###
+###   Tile Image Pipeline    ###
+
+# Import Necessary Packages
+import hashlib # Hashing of the source images for the cache keys
+import math # Math library for mathematical functions
+import os # File system access for the cache directory
+from functools import lru_cache # Keeps one mask per tile size and one pyramid per source image
+from PIL import Image, ImageDraw # Image loading, resizing and masking
+
+# Paths to  image files
+IMAGE_PATHS = {
+    'desert': 'desert.png',
+    'wheat': 'wheat.png',
+    'wood': 'wood.png',
+    'sheep': 'sheep.png',
+    'brick': 'brick.png',
+    'ore': 'ore.png',
+}
+
+# Directory holding the processed tiles, next to this file
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.tile_cache')
+
+# Masks kept in memory, one per tile size
+MASK_CACHE_SIZE = 64
+
+# Width and height in pixels below which the source image pyramid stops halving
+PYRAMID_MIN_SIZE = 32
+
+# Source images whose pyramids are kept in memory, one per resource with room to spare
+PYRAMID_CACHE_SIZE = 8
+
+# Function to create a hexagonal mask
+def create_hexagonal_mask(image_size, hex_size):
+    """
+    Creates a hexagonal mask for an image.
+
+    This function generates a hexagonal mask to be applied to an image for creating a hexagonal crop.
+    It first initializes a mask with the same dimensions as the target image but filled with zeros (transparent).
+    Then, it calculates the vertices of a hexagon based on the specified hexagon size and the center of the image.
+    Using these vertices, the function draws a filled hexagon on the mask with white color (255),
+    which represents the area to keep when the mask is applied to an image.
+
+    Parameters:
+    - image_size (tuple of int): The dimensions (width, height) of the image for which the mask is created.
+    - hex_size (int): The radius of the hexagon, defined from the center to any vertex.
+
+    Returns:
+    - hex_mask (Image): An image object representing the mask with a white hexagon on a transparent background.
+
+    """
+
+    # Calculate the center of the image
+    w, h = image_size
+    x_center, y_center = w / 2, h / 2
+
+    hex_mask = Image.new('L', image_size, 0)
+    hex_draw = ImageDraw.Draw(hex_mask)
+
+    points = []
+    # Calculate the vertices of the hexagon
+    for i in range(6):
+        angle_deg = (60 * i) + 30 # Calculate the angle for each vertex in degrees
+        angle_rad = math.pi / 180 * angle_deg  # Converts the degree to radians
+        x = x_center + hex_size * math.cos(angle_rad)  # Calculate the x-coordinate of the vertex
+        y = y_center + hex_size * math.sin(angle_rad)  # Calculate the y-coordinate of the vertex
+        points.append((x, y))
+
+    # Draw the hexagon on the mask
+    hex_draw.polygon(points, fill=255, outline=0)
+    return hex_mask
+
+# Function to apply the hexagonal mask to an image
+def apply_hex_mask(image, mask):
+
+    """
+    Applies a hexagonal mask to an image.
+
+    This function overlays a hexagonal mask onto an image to create a hexagonal crop effect.
+    The mask determines which parts of the original image are visible in the final result,
+    with the rest becoming transparent. The function uses the `Image.composite` method to apply this mask,
+    which combines the original image with a fully transparent image (same size as the mask),
+    using the mask to control the blending.
+
+    Parameters:
+    - image (Image): The original image to which the hexagonal mask will be applied.
+    - mask (Image): The hexagonal mask image, where the white area represents the portion of the original image to retain.
+
+    Returns:
+    - Image: A new image with the hexagonal mask applied, where the area outside the hexagon is transparent.
+    """
+
+    return Image.composite(image, Image.new('RGBA', mask.size, (0, 0, 0, 0)), mask)
+
+@lru_cache(maxsize=MASK_CACHE_SIZE)
+def shared_hex_mask(image_size, hex_size):
+    """
+    Returns the hexagonal mask for a tile size, built once and reused for every resource.
+
+    Parameters:
+    - image_size (tuple of int): The dimensions (width, height) of the tiles.
+    - hex_size (int): The radius of the hexagon.
+
+    Returns:
+    - Image: The mask created by create_hexagonal_mask.
+    """
+    return create_hexagonal_mask(image_size, hex_size)
+
+def tile_size(hex_size):
+    """
+    Parameters:
+    - hex_size (int): The radius of the hexagon.
+
+    Returns:
+    - tuple of int: The (width, height) the source images are resized to, which is much larger than the mask.
+    """
+    return 4 * hex_size, 2 * (int(math.sqrt(3) * hex_size))
+
+def file_digest(path):
+    """
+    Parameters:
+    - path (str): Path of the file to hash.
+
+    Returns:
+    - str: The SHA-256 hex digest of the file's contents.
+    """
+    with open(path, 'rb') as source:
+        return hashlib.sha256(source.read()).hexdigest()
+
+def cache_path(resource, path, hex_size, resample, cache_dir=CACHE_DIR):
+    """
+    Builds the cache file name of a processed tile.
+
+    The name holds the hash of the source file, the hex size and the resampling filter, so any change to one of
+    them points to a different file and the stale entry is never read again.
+
+    Parameters:
+    - resource (str): The resource name, such as "ore".
+    - path (str): Path of the source image.
+    - hex_size (int): The radius of the hexagon.
+    - resample (Image.Resampling): The filter used to resize the source image.
+    - cache_dir (str): The cache directory.
+
+    Returns:
+    - str: Path of the cached tile.
+    """
+    digest = file_digest(path)[:16]
+    return os.path.join(cache_dir, f"{resource}-{digest}-{hex_size}-{Image.Resampling(resample).name.lower()}.png")
+
+def load_tile(resource, path, hex_size, resample=Image.Resampling.LANCZOS, cache_dir=CACHE_DIR):
+    """
+    Loads the masked RGBA tile for a resource, from the cache when possible.
+
+    On a cache miss the source image is resized, masked with the shared mask and written to the cache, and older
+    entries for the same resource and settings are removed. On a hit the processed tile is read directly and no
+    resampling is done at all.
+
+    Parameters:
+    - resource (str): The resource name, such as "ore".
+    - path (str): Path of the source image.
+    - hex_size (int): The radius of the hexagon.
+    - resample (Image.Resampling): The filter used to resize the source image.
+    - cache_dir (str): The cache directory.
+
+    Returns:
+    - Image: The masked tile in RGBA mode.
+    """
+    cached = cache_path(resource, path, hex_size, resample, cache_dir)
+    if os.path.exists(cached):
+        with Image.open(cached) as tile:
+            tile.load()
+            return tile
+
+    # Resize the source and apply the mask shared by every resource of this size
+    size = tile_size(hex_size)
+    with Image.open(path) as original_image:
+        resized_image = original_image.convert('RGBA').resize(size, resample)
+    tile = apply_hex_mask(resized_image, shared_hex_mask(size, hex_size))
+
+    # Drop stale entries for this resource and setting, then store the new tile
+    os.makedirs(cache_dir, exist_ok=True)
+    name_resource, _, settings = os.path.basename(cached).split('-', 2)
+    for name in os.listdir(cache_dir):
+        parts = name.split('-', 2)
+        if len(parts) == 3 and parts[0] == name_resource and parts[2] == settings and name != os.path.basename(cached):
+            os.remove(os.path.join(cache_dir, name))
+    temporary = f"{cached}.{os.getpid()}.tmp"
+    tile.save(temporary, format='PNG', compress_level=1)
+    os.replace(temporary, cached) # Readers never see a half written file
+    return tile
+
+@lru_cache(maxsize=PYRAMID_CACHE_SIZE)
+def tile_pyramid(path):
+    """
+    Builds the downsampled levels of a source image.
+
+    Every level halves the one before with a 2x2 box filter, starting from the source in RGBA mode, until a side
+    would fall below PYRAMID_MIN_SIZE. The full resolution source itself is not kept, so a cached pyramid takes
+    a third of the memory of its source. The pyramids of the last PYRAMID_CACHE_SIZE source files are kept.
+
+    Parameters:
+    - path (str): Path of the source image.
+
+    Returns:
+    - tuple of Image: The levels, from half the source size down to the smallest. Empty for sources too small to
+      halve.
+    """
+    with Image.open(path) as source:
+        level = source.convert('RGBA')
+    levels = []
+    while min(level.size) >= 2 * PYRAMID_MIN_SIZE:
+        level = level.reduce(2)
+        levels.append(level)
+    return tuple(levels)
+
+def warm_pyramids(paths):
+    """
+    Builds the pyramids of the source images ahead of the first resize, meant to run on a background thread.
+
+    Parameters:
+    - paths (iterable of str): Paths of the source images. Missing files are skipped.
+    """
+    for path in paths:
+        if os.path.exists(path):
+            tile_pyramid(path)
+
+def scaled_tile(path, hex_size, resample=Image.Resampling.LANCZOS):
+    """
+    Makes the masked RGBA tile of a source image for any hex size, without touching the disk cache.
+
+    The tile is resized from the smallest pyramid level that is still at least as large, so the filter never
+    reads more than twice the pixels it writes, however large the source image is. Tiles larger than every level
+    are resized from the source file, which is read again instead of being kept in memory.
+
+    Parameters:
+    - path (str): Path of the source image.
+    - hex_size (int): The radius of the hexagon.
+    - resample (Image.Resampling): The filter used for the final resize.
+
+    Returns:
+    - Image: The masked tile in RGBA mode.
+    """
+    size = tile_size(hex_size)
+    source = next((level for level in reversed(tile_pyramid(path))
+                   if level.width >= size[0] and level.height >= size[1]), None)
+    if source is None:
+        with Image.open(path) as original_image:
+            source = original_image.convert('RGBA')
+    return apply_hex_mask(source.resize(size, resample), shared_hex_mask(size, hex_size))
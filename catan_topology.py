@@ -0,0 +1,176 @@
+### Catan Board Randomizer ###
+###      Board Topology      ###
+
+# Import Necessary Packages
+from dataclasses import dataclass # Immutable containers for the precomputed layout data
+from functools import lru_cache # Caches one topology per layout
+
+# Numbers that may not sit next to each other
+RED_NUMBERS = (6, 8)
+
+# Offsets from a hex to its six neighbours in doubled coordinates: (column, row)
+DOUBLED_DIRECTIONS = ((2, 0), (1, 1), (-1, 1), (-2, 0), (-1, -1), (1, -1))
+
+# Offsets from a hex at doubled (column, row) to its corners at (column + dx, 3 * row + dy), in the same
+# clockwise order as the outline drawn by hex_corners: upper right, lower right, bottom, lower left, upper left, top
+CORNER_OFFSETS = ((1, -1), (1, 1), (0, 2), (-1, 1), (-1, -1), (0, -2))
+
+@dataclass(frozen=True)
+class BoardTopology:
+    """
+    The fixed shape of a board layout, precomputed once so that checks never rebuild it.
+
+    Hexes are numbered in reading order, row by row, so index 0 is the first tile of the top row. The rows are
+    centred on each other like draw_board_gui draws them, which makes the doubled column of a hex equal to
+    (widest row - row length) + 2 * column. Neighbours are then two doubled columns apart in the same row, or
+    one apart in the rows above and below.
+
+    Attributes:
+    - row_lengths (tuple of int): How many tiles are in each row.
+    - row_col (tuple of tuples): The (row, column) of every hex, matching the indices of 'board_words'.
+    - doubled (tuple of tuples): The (doubled column, row) of every hex.
+    - axial (tuple of tuples): The axial (q, r) coordinates of every hex.
+    - neighbours (tuple of tuples of int): For every hex, the sorted indices of its neighbours.
+    - neighbour_masks (tuple of int): For every hex, a bitmask of its neighbours.
+    - edges (tuple of tuples): Every pair (i, j) of neighbouring hexes with i < j.
+    - hex_vertices (tuple of tuples of int): For every hex, its six vertex (intersection) indices in corner order.
+    - vertex_coords (tuple of tuples): The (doubled column, 3 * row) lattice position of every vertex.
+    - vertex_hexes (tuple of tuples of int): For every vertex, the one to three hexes touching it.
+    - vertex_neighbours (tuple of tuples of int): For every vertex, the vertices one road away.
+    """
+    row_lengths: tuple
+    row_col: tuple
+    doubled: tuple
+    axial: tuple
+    neighbours: tuple
+    neighbour_masks: tuple
+    edges: tuple
+    hex_vertices: tuple
+    vertex_coords: tuple
+    vertex_hexes: tuple
+    vertex_neighbours: tuple
+
+    @property
+    def vertex_count(self):
+        """
+        Returns:
+        - int: The number of vertices (intersections) in the layout.
+        """
+        return len(self.vertex_hexes)
+
+    @property
+    def hex_count(self):
+        """
+        Returns:
+        - int: The number of hexes in the layout.
+        """
+        return len(self.row_col)
+
+    def tokens(self, board):
+        """
+        Converts a board in 'board_words' format into a flat list of number tokens.
+
+        Parameters:
+        - board (list of lists of str): A 2D list of "resource-number" strings, as returned by new_board.
+
+        Returns:
+        - list of int: The number on every hex in index order, 0 for the desert.
+        """
+        return [int(cell.partition('-')[2] or 0) for row in board for cell in row]
+
+    def red_mask(self, tokens):
+        """
+        Parameters:
+        - tokens (sequence of int): The number on every hex in index order.
+
+        Returns:
+        - int: A bitmask of the hexes holding a 6 or an 8.
+        """
+        mask = 0
+        for index, token in enumerate(tokens):
+            if token in RED_NUMBERS:
+                mask |= 1 << index
+        return mask
+
+    def is_valid(self, tokens):
+        """
+        Checks that no 6 or 8 is next to another 6 or 8.
+
+        Parameters:
+        - tokens (sequence of int): The number on every hex in index order.
+
+        Returns:
+        - bool: True if no two red numbers are neighbours; False otherwise.
+        """
+        red_mask = self.red_mask(tokens)
+        neighbour_masks = self.neighbour_masks
+        for index, token in enumerate(tokens):
+            if token in RED_NUMBERS and neighbour_masks[index] & red_mask:
+                return False
+        return True
+
+@lru_cache(maxsize=None)
+def topology_for_rows(row_lengths):
+    """
+    Builds the topology for a layout given by its row lengths, such as (3, 4, 5, 4, 3) for the Regular board.
+
+    Parameters:
+    - row_lengths (tuple of int): How many tiles are in each row.
+
+    Returns:
+    - BoardTopology: The cached topology of the layout.
+    """
+    row_lengths = tuple(row_lengths)
+    widest = max(row_lengths)
+
+    # Place every hex on the doubled coordinate grid
+    row_col = []
+    doubled = []
+    for row, row_length in enumerate(row_lengths):
+        for col in range(row_length):
+            row_col.append((row, col))
+            doubled.append(((widest - row_length) + 2 * col, row))
+
+    # Axial coordinates need the doubled column and row to share parity, so shift by the first hex if required
+    shift = (doubled[0][0] - doubled[0][1]) % 2
+    axial = tuple(((x - shift - r) // 2, r) for x, r in doubled)
+
+    # Look up the neighbours of every hex through its doubled coordinates
+    index_of = {position: index for index, position in enumerate(doubled)}
+    neighbours = []
+    for x, r in doubled:
+        hex_neighbours = [index_of[(x + dx, r + dr)] for dx, dr in DOUBLED_DIRECTIONS if (x + dx, r + dr) in index_of]
+        neighbours.append(tuple(sorted(hex_neighbours)))
+
+    neighbour_masks = tuple(sum(1 << n for n in hex_neighbours) for hex_neighbours in neighbours)
+    edges = tuple((i, j) for i, hex_neighbours in enumerate(neighbours) for j in hex_neighbours if i < j)
+
+    # Number the corners shared between hexes once, in reading order from the top of the board
+    corners = [[(x + dx, 3 * r + dy) for dx, dy in CORNER_OFFSETS] for x, r in doubled]
+    vertex_coords = sorted({corner for hex_corners in corners for corner in hex_corners}, key=lambda c: (c[1], c[0]))
+    vertex_of = {corner: index for index, corner in enumerate(vertex_coords)}
+    hex_vertices = tuple(tuple(vertex_of[corner] for corner in hex_corners) for hex_corners in corners)
+
+    vertex_hexes = [[] for _ in vertex_of]
+    vertex_neighbours = [set() for _ in vertex_of]
+    for hex_index, vertices in enumerate(hex_vertices):
+        for corner, vertex in enumerate(vertices):
+            vertex_hexes[vertex].append(hex_index)
+            # Consecutive corners of a hex are joined by one of its sides
+            next_vertex = vertices[(corner + 1) % 6]
+            vertex_neighbours[vertex].add(next_vertex)
+            vertex_neighbours[next_vertex].add(vertex)
+
+    return BoardTopology(
+        row_lengths=row_lengths,
+        row_col=tuple(row_col),
+        doubled=tuple(doubled),
+        axial=axial,
+        neighbours=tuple(neighbours),
+        neighbour_masks=neighbour_masks,
+        edges=edges,
+        hex_vertices=hex_vertices,
+        vertex_coords=tuple(vertex_coords),
+        vertex_hexes=tuple(tuple(hexes) for hexes in vertex_hexes),
+        vertex_neighbours=tuple(tuple(sorted(vertices)) for vertices in vertex_neighbours),
+    )
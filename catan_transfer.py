@@ -0,0 +1,72 @@
+### Catan Board Randomizer ###
+###  Transfer Matrix Counts  ###
+
+# Import Necessary Packages
+import random # Library for generating random numbers and choices
+import time # Sampling throughput measurements
+from collections import Counter # Multiplicities of the tiles and numbers
+from math import factorial, prod # Multinomial coefficients
+from catan_core import BOARD_DATA, PlacementDP, placement_table # Layout data, the placement engine and its per mode tables
+from catan_topology import RED_NUMBERS # Numbers that may not sit next to each other
+
+def multinomial(values):
+    """
+    Parameters:
+    - values (iterable): A multiset.
+
+    Returns:
+    - int: The number of distinct arrangements of the multiset.
+    """
+    counts = Counter(values)
+    return factorial(sum(counts.values())) // prod(factorial(count) for count in counts.values())
+
+def placement_dp(mode):
+    """
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - PlacementDP: The engine new_valid_board samples from, built once per mode by placement_table.
+    """
+    return placement_table(mode)['dp']
+
+def count_valid_boards(mode):
+    """
+    Counts the distinct boards of a mode that pass is_valid_board, and every board of the mode.
+
+    A valid board is a valid (desert, red) placement, an order of the red numbers on the red hexes, an order of
+    the other numbers on the remaining numbered hexes, and an order of the other resources.
+
+    Parameters:
+    - mode (str): The game mode ("Regular" or "Expansion").
+
+    Returns:
+    - dict: 'placements' (valid desert and red hex choices), 'valid_boards', 'all_boards', and 'valid_share',
+      the chance that a board from new_board is valid.
+    """
+    mode_data = BOARD_DATA[mode]
+    numbers = mode_data['numbers_list']
+    resources = [tile for tile in mode_data['tiles'] if tile != 0]
+    placements = placement_dp(mode).count
+    valid = (placements * multinomial(n for n in numbers if n in RED_NUMBERS)
+             * multinomial(n for n in numbers if n not in RED_NUMBERS) * multinomial(resources))
+    total = multinomial(mode_data['tiles']) * multinomial(numbers)
+    return {'placements': placements, 'valid_boards': valid, 'all_boards': total, 'valid_share': valid / total}
+
+def sampling_throughput(dp, samples=10000, seed=None):
+    """
+    Measures how fast an engine draws placements.
+
+    Parameters:
+    - dp (PlacementDP): The engine.
+    - samples (int): The number of placements to draw.
+    - seed (int, optional): Seed of the random number generator.
+
+    Returns:
+    - float: Placements drawn per second.
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(samples):
+        dp.sample(rng)
+    return samples / (time.perf_counter() - start)
@@ -0,0 +1,52 @@
+### Catan Board Randomizer ###
+###    Analytics Tests     ###
+
+# Import Necessary Packages
+import random # Seeded generators for the Python boards
+import numpy as np # Count arrays
+import pytest # Expected errors
+from catan_analytics import BoardStats, analyse # Module under test
+from catan_batch import generate_batch # Reference boards
+from catan_core import new_board # Reference boards
+
+COUNTS = ('boards', 'resources', 'numbers', 'red_pairs', 'matching_ports')
+
+def assert_same_counts(first, second):
+    for name in COUNTS:
+        assert np.array_equal(getattr(first, name), getattr(second, name)), name
+
+@pytest.mark.parametrize('source', ['new_board', 'new_valid_board', 'batch'])
+def test_analyse_does_not_depend_on_the_workers(source):
+    single = analyse('Regular', 1000, source, seed=24, workers=1, chunk=300)
+    pooled = analyse('Regular', 1000, source, seed=24, workers=2, chunk=300)
+    assert single.boards == 1000
+    assert_same_counts(single, pooled)
+    if source != 'new_board':
+        assert single.red_pairs[0] == 1000 # Valid boards never have neighbouring reds
+
+def test_merge_is_additive():
+    for mode in ('Regular', 'Expansion'):
+        boards = generate_batch(mode, 900, seed=5)
+        whole = BoardStats(mode)
+        whole.update(boards)
+
+        parts = [BoardStats(mode) for _ in range(3)]
+        for part, share in zip(parts, np.array_split(boards, 3)):
+            part.update(share)
+        merged = BoardStats(mode).merge(parts[2]).merge(parts[0]).merge(parts[1])
+        assert_same_counts(merged, whole)
+
+        # Every board puts one resource and one number slot on every hex
+        assert (whole.resources.sum(axis=1) == 900).all() and (whole.numbers.sum(axis=1) == 900).all()
+        assert whole.red_pairs.sum() == whole.matching_ports.sum() == 900
+
+def test_merge_rejects_other_modes():
+    with pytest.raises(ValueError):
+        BoardStats('Regular').merge(BoardStats('Expansion'))
+
+def test_consume_tallies_board_streams():
+    rng = random.Random(6)
+    stats = BoardStats('Regular').consume((new_board('Regular', rng) for _ in range(250)), batch=64)
+    assert stats.boards == 250
+    assert stats.red_pairs[1:].sum() > 0 # Plain shuffles often put two reds next to each other
+    assert stats.numbers[:, 0].sum() == 250 # One desert per Regular board
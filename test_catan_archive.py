@@ -0,0 +1,84 @@
+### Catan Board Randomizer ###
+###      Archive Tests       ###
+
+# Import Necessary Packages
+import numpy as np # Record arrays
+import pytest # Temporary directories
+import catan_core # Registered layouts, cleared to mimic a fresh process
+from catan_archive import BoardArchive, create_archive, generate_archive # Module under test
+from catan_batch import RESOURCES, batch_to_words # Reference words
+from catan_core import BOARD_DATA, register_layout # Layout data
+from catan_layouts import hexagon_layout # Custom layout
+from catan_score import score_batch # Reference scores
+
+@pytest.fixture(scope='module')
+def archive(tmp_path_factory):
+    return generate_archive(str(tmp_path_factory.mktemp('archive')), 'Regular', 3000, seed=4)
+
+def test_records(archive):
+    assert len(archive) == 3000
+    assert archive.boards.base is not None # A view of the memory mapped records
+    scores = score_batch(np.ascontiguousarray(archive.boards), 'Regular')
+    assert np.allclose(archive.records['score'], scores['score'])
+
+def test_generation_is_reproducible(archive, tmp_path):
+    again = generate_archive(str(tmp_path), 'Regular', 3000, seed=4)
+    assert np.array_equal(again.records, archive.records)
+
+def test_ports_are_shuffled_per_board(archive):
+    ports = archive.records['ports']
+    assert (np.sort(ports, axis=1) == np.arange(len(BOARD_DATA['Regular']['ports']) // 2)).all()
+    assert len(np.unique(ports, axis=0)) > 100
+
+@pytest.mark.parametrize('name, low, high', [
+    ('score', 80, None), ('score', None, 60), ('score', 70, 75),
+    ('max_vertex_pips', 11, 11), ('max_vertex_pips', None, 10),
+])
+def test_query_matches_a_scan(archive, name, low, high):
+    values = archive.records['score'] if name == 'score' else \
+        score_batch(np.ascontiguousarray(archive.boards), 'Regular')[name]
+    inside = np.ones(len(values), dtype=bool)
+    if low is not None:
+        inside &= values >= low
+    if high is not None:
+        inside &= values <= high
+    expected = np.nonzero(inside)[0]
+    assert len(expected)
+    assert np.array_equal(archive.query(name, low, high), expected)
+
+def test_select_combines_criteria(archive):
+    deserts = np.nonzero(archive.boards[:, RESOURCES] == 0)[1]
+    expected = np.nonzero((deserts == 9) & (archive.records['score'] >= 75))[0]
+    assert len(expected)
+    assert np.array_equal(archive.select(desert=9, score=(75, None)), expected)
+    assert np.array_equal(archive.select(), np.arange(len(archive)))
+    with pytest.raises(KeyError):
+        archive.query('ore')
+
+def test_words_round_trip(archive):
+    mode_data = BOARD_DATA['Regular']
+    for record in (0, 17, 2999):
+        board_words, ports, colors = archive.words(record)
+        assert board_words == batch_to_words(archive.boards[record:record + 1], 'Regular')[0]
+        assert ports == [tuple(port) for port in mode_data['ports']]
+        # Every slot shows both circles of the port stored for it
+        for slot, port in enumerate(archive.records[record]['ports']):
+            assert colors[2 * slot:2 * slot + 2] == mode_data['colors'][2 * port:2 * port + 2]
+        assert sorted(colors) == sorted(mode_data['colors'])
+
+def test_custom_layout_is_registered_on_open(tmp_path):
+    mode = register_layout(hexagon_layout(3, name='Archive-Hexagon'))
+    written = generate_archive(str(tmp_path), mode, 200, seed=2)
+    expected = written.words(5)
+
+    # Forget the layout, as in a process that never registered it
+    del BOARD_DATA[mode], catan_core.LAYOUT_SPECS[mode]
+    reopened = BoardArchive(str(tmp_path))
+    assert reopened.words(5) == expected
+
+def test_wrong_count_is_rejected(tmp_path, archive):
+    boards = np.ascontiguousarray(archive.boards[:10])
+    with pytest.raises(ValueError):
+        create_archive(str(tmp_path), 'Regular', [(boards, None)], 20)
+    with pytest.raises(ValueError):
+        create_archive(str(tmp_path), 'Regular', [(boards, None)], 5)
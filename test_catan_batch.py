@@ -0,0 +1,43 @@
+### Catan Board Randomizer ###
+###    Batch Mode Tests      ###
+
+# Import Necessary Packages
+import random # Seeded generators for the Python boards
+import numpy as np # Batch arrays
+from catan_batch import RESOURCES, TOKENS, batch_to_words, generate_batch, valid_mask, words_to_batch # Module under test
+from catan_core import BOARD_DATA, is_valid_board, new_board, new_valid_board # Reference boards
+
+def test_words_round_trip():
+    rng = random.Random(3)
+    for mode in ('Regular', 'Expansion'):
+        boards_words = [new_board(mode, rng)[0] for _ in range(50)]
+        assert batch_to_words(words_to_batch(boards_words), mode) == boards_words
+
+def test_batch_round_trip():
+    for mode in ('Regular', 'Expansion'):
+        boards = generate_batch(mode, 500, seed=11)
+        assert np.array_equal(words_to_batch(batch_to_words(boards, mode)), boards)
+
+def test_generate_batch_boards_are_valid_and_complete():
+    for mode in ('Regular', 'Expansion'):
+        boards = generate_batch(mode, 2000, seed=1)
+        assert valid_mask(boards, mode).all()
+        assert all(is_valid_board(board_words) for board_words in batch_to_words(boards[:200], mode))
+
+        # Every board uses exactly the tile and number pools of its mode, with no number on the deserts
+        mode_data = BOARD_DATA[mode]
+        assert (np.sort(boards[:, RESOURCES], axis=1) == sorted(mode_data['tiles'])).all()
+        tokens = np.sort(boards[:, TOKENS], axis=1)
+        assert (tokens == sorted([0] * mode_data['tiles'].count(0) + mode_data['numbers_list'])).all()
+        assert ((boards[:, RESOURCES] == 0) == (boards[:, TOKENS] == 0)).all()
+
+def test_generate_batch_is_reproducible():
+    assert np.array_equal(generate_batch('Expansion', 100, seed=9), generate_batch('Expansion', 100, seed=9))
+    assert not np.array_equal(generate_batch('Expansion', 100, seed=9), generate_batch('Expansion', 100, seed=10))
+
+def test_valid_mask_rejects_neighbouring_reds():
+    rng = random.Random(5)
+    boards_words = [new_board('Regular', rng)[0] for _ in range(300)]
+    expected = [is_valid_board(board_words) for board_words in boards_words]
+    assert valid_mask(words_to_batch(boards_words), 'Regular').tolist() == expected
+    assert valid_mask(words_to_batch([new_valid_board('Regular', rng)[0]]), 'Regular').all()
@@ -0,0 +1,39 @@
+### Catan Board Randomizer ###
+###     Board Code Tests     ###
+
+# Import Necessary Packages
+import random # Seeded generators
+import pytest # Expected errors
+from catan_codes import code_bytes, code_mode, code_to_text, decode_board, encode_board, text_to_code # Module under test
+from catan_core import BOARD_DATA, new_valid_board # Reference boards
+
+def test_encode_decode_round_trip():
+    rng = random.Random(15)
+    for mode in ('Regular', 'Expansion'):
+        for _ in range(100):
+            board_words, ports, colors = new_valid_board(mode, rng)
+            code = encode_board(board_words)
+            assert code_mode(code) == mode
+            assert code.bit_length() <= 8 * code_bytes(mode)
+            assert decode_board(code) == (board_words, BOARD_DATA[mode]['ports'], BOARD_DATA[mode]['colors'])
+
+def test_text_round_trip():
+    rng = random.Random(16)
+    for mode in ('Regular', 'Expansion'):
+        code = encode_board(new_valid_board(mode, rng)[0])
+        text = code_to_text(code)
+        assert text_to_code(text) == code
+        # Case, dashes, spaces and look-alike letters are forgiven when a code is typed back in
+        assert text_to_code(' ' + '-'.join(text[i:i + 4] for i in range(0, len(text), 4)).lower()) == code
+        assert text_to_code(text.replace('1', 'I').replace('0', 'O')) == code
+    assert code_to_text(0) == '0'
+
+def test_invalid_codes_are_rejected():
+    with pytest.raises(ValueError):
+        text_to_code('U')
+    with pytest.raises(ValueError):
+        text_to_code(' - ')
+    with pytest.raises(ValueError):
+        decode_board(1 << (8 * code_bytes('Expansion') + 8))
+    with pytest.raises(ValueError):
+        encode_board([['Wood-2']])
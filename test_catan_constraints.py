@@ -0,0 +1,133 @@
+### Catan Board Randomizer ###
+###    Constraint Tests      ###
+
+# Import Necessary Packages
+import random # Seeded generators
+import pytest # Parametrized rules
+from collections import Counter # Tallies of board features
+from catan_constraints import RULES, ConstraintSet, centre_order # Module under test
+from catan_core import get_topology, is_valid_board, new_valid_board # Reference generator
+from test_catan_core import chi2_p_value # Chi-square tail probability
+
+def cells(board_words):
+    """
+    Returns:
+    - resources (list of str): The resource on every hex in index order.
+    - tokens (list of int): The number on every hex in index order, 0 on the deserts.
+    """
+    split = [cell.partition('-') for row in board_words for cell in row]
+    return [resource for resource, _, _ in split], [int(number or 0) for _, _, number in split]
+
+def touching_group_sizes(resources, neighbours):
+    """
+    Returns:
+    - list of int: The size of every group of touching hexes with the same resource, deserts excluded.
+    """
+    seen, sizes = set(), []
+    for start, resource in enumerate(resources):
+        if start in seen or resource == 'desert':
+            continue
+        group, frontier = {start}, [start]
+        while frontier:
+            for neighbour in neighbours[frontier.pop()]:
+                if neighbour not in group and resources[neighbour] == resource:
+                    group.add(neighbour)
+                    frontier.append(neighbour)
+        seen |= group
+        sizes.append(len(group))
+    return sizes
+
+def satisfies(rule, board_words, mode):
+    """
+    Checks one rule of RULES on a finished board, written out independently of the compiled checks.
+    """
+    topology = get_topology(mode)
+    resources, tokens = cells(board_words)
+    pairs = [(a, b) for a in range(topology.hex_count) for b in topology.neighbours[a]]
+    if rule == 'no-adjacent-6-8':
+        return is_valid_board(board_words)
+    if rule == 'no-adjacent-2-12':
+        return not any(tokens[a] in (2, 12) and tokens[b] in (2, 12) for a, b in pairs)
+    if rule == 'no-adjacent-same-number':
+        return not any(tokens[a] and tokens[a] == tokens[b] for a, b in pairs)
+    if rule == 'max-2-touching-resource':
+        return max(touching_group_sizes(resources, topology.neighbours)) <= 2
+    if rule == 'desert-in-center':
+        deserts = {index for index, resource in enumerate(resources) if resource == 'desert'}
+        return deserts == set(centre_order(topology)[:len(deserts)])
+    raise KeyError(rule)
+
+def test_centre_of_the_regular_board():
+    assert centre_order(get_topology('Regular'))[0] == 9
+
+@pytest.mark.parametrize('mode', ['Regular', 'Expansion'])
+@pytest.mark.parametrize('rule', list(RULES))
+def test_generated_boards_satisfy_the_rule(rule, mode):
+    constraints = ConstraintSet([RULES[rule]()])
+    rng = random.Random(7)
+    for _ in range(100 if mode == 'Regular' else 40):
+        board_words, _, _ = constraints.generate(mode, rng)
+        assert is_valid_board(board_words)
+        assert satisfies(rule, board_words, mode)
+        assert constraints(board_words, mode)
+
+def test_every_rule_at_once():
+    constraints = ConstraintSet([factory() for factory in RULES.values()])
+    rng = random.Random(3)
+    for _ in range(30):
+        board_words, _, _ = constraints.generate('Regular', rng)
+        assert all(satisfies(rule, board_words, 'Regular') for rule in RULES)
+    report = {row['name']: row for row in constraints.report()}
+    assert len(report) == len(RULES)
+    assert all(0 <= row['rejection_rate'] <= 1 for row in report.values())
+
+def test_call_agrees_with_the_rules():
+    rng = random.Random(11)
+    boards = [new_valid_board('Regular', rng)[0] for _ in range(300)]
+    for rule in RULES:
+        constraints = ConstraintSet([RULES[rule]()])
+        assert [constraints(board_words, 'Regular') for board_words in boards] == \
+               [satisfies(rule, board_words, 'Regular') for board_words in boards]
+
+def test_call_needs_the_rows_of_its_mode():
+    board_words = new_valid_board('Regular', random.Random(1))[0]
+    with pytest.raises(ValueError):
+        ConstraintSet()(board_words, 'Expansion')
+
+def distance_2_12(resources, tokens):
+    """
+    Returns:
+    - int: The number of steps between the 2 and the 12 of a Regular board.
+    """
+    (x1, r1), (x2, r2) = (get_topology('Regular').doubled[tokens.index(number)] for number in (2, 12))
+    return abs(r1 - r2) + max(0, (abs(x1 - x2) - abs(r1 - r2)) // 2)
+
+def touching_pairs(resources, tokens):
+    """
+    Returns:
+    - int: The number of neighbouring pairs of hexes with the same resource on a Regular board.
+    """
+    neighbours = get_topology('Regular').neighbours
+    return sum(resources[a] == resources[b] != 'desert' for a in range(len(resources)) for b in neighbours[a] if a < b)
+
+@pytest.mark.parametrize('rule, feature', [
+    ('no-adjacent-2-12', distance_2_12),
+    ('max-2-touching-resource', touching_pairs),
+])
+def test_pruning_matches_filtering(rule, feature):
+    # Pruned generation and rejection of new_valid_board boards must sample the same distribution
+    constraints = ConstraintSet([RULES[rule]()])
+    samples = 2000
+    rng = random.Random(5)
+    pruned = Counter(feature(*cells(constraints.generate('Regular', rng)[0])) for _ in range(samples))
+    filtered = Counter()
+    while sum(filtered.values()) < samples:
+        board_words = new_valid_board('Regular', rng)[0]
+        if constraints(board_words, 'Regular'):
+            filtered[feature(*cells(board_words))] += 1
+
+    # Two sample chi-square test over the categories seen in either sample
+    categories = set(pruned) | set(filtered)
+    chi2 = sum((pruned[category] - filtered[category]) ** 2 / (pruned[category] + filtered[category])
+               for category in categories)
+    assert chi2_p_value(chi2, len(categories) - 1) > 0.001
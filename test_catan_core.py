@@ -0,0 +1,71 @@
+### Catan Board Randomizer ###
+###     Core Engine Tests    ###
+
+# Import Necessary Packages
+import math # Normal approximation of the chi-square tail
+import random # Seeded generators
+import pytest # Expected errors
+from collections import Counter # Tallies of the sampled placements
+from itertools import combinations # Every set of red hexes
+from catan_core import (PlacementDP, draw_red_hexes, get_topology, is_valid_board, new_valid_board,
+                        placement_table) # Engine under test
+
+def chi2_p_value(chi2, df):
+    """
+    Parameters:
+    - chi2 (float): The statistic.
+    - df (int): The degrees of freedom.
+
+    Returns:
+    - float: The upper tail probability, by the Wilson-Hilferty approximation.
+    """
+    scale = 2 / (9 * df)
+    z = ((chi2 / df) ** (1 / 3) - (1 - scale)) / math.sqrt(scale)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def valid_red_sets(mode):
+    """
+    Returns:
+    - list of tuples: Every set of red hexes of the mode with no two neighbours, by brute force.
+    """
+    topology = get_topology(mode)
+    reds = placement_table(mode)['reds']
+    return [hexes for hexes in combinations(range(topology.hex_count), reds)
+            if not any(topology.neighbour_masks[a] >> b & 1 for a, b in combinations(hexes, 2))]
+
+def test_red_placements_are_uniform():
+    # Every one of the valid red sets must come up equally often
+    sets = valid_red_sets('Regular')
+    assert len(sets) == 532
+
+    rng = random.Random(2024)
+    table = placement_table('Regular')
+    samples = 40 * len(sets)
+    counts = Counter(tuple(sorted(draw_red_hexes(table, rng))) for _ in range(samples))
+    assert set(counts) <= set(sets)
+
+    expected = samples / len(sets)
+    chi2 = sum((counts[hexes] - expected) ** 2 / expected for hexes in sets)
+    assert chi2_p_value(chi2, len(sets) - 1) > 0.001
+
+def test_placement_tables_list_every_valid_set():
+    sets = valid_red_sets('Regular')
+    dp = placement_table('Regular')['dp']
+    assert dp.red_count == len(sets)
+    assert list(dp.placements()) == sets
+
+def test_red_numbers_that_do_not_fit_are_refused():
+    dp = PlacementDP(get_topology('Regular'), 8)
+    assert dp.red_count == 0 and list(dp.placements()) == []
+    with pytest.raises(ValueError):
+        dp.sample_reds(random.Random(1))
+
+def test_new_valid_board_is_valid():
+    rng = random.Random(7)
+    for mode in ('Regular', 'Expansion'):
+        for _ in range(200):
+            board_words, _, _ = new_valid_board(mode, rng)
+            assert is_valid_board(board_words)
+
+def test_new_valid_board_is_reproducible():
+    assert new_valid_board('Expansion', random.Random(5)) == new_valid_board('Expansion', random.Random(5))
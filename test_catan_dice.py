@@ -0,0 +1,74 @@
+### Catan Board Randomizer ###
+###    Dice Income Tests     ###
+
+# Import Necessary Packages
+import random # Seeded generator for the reference board
+import numpy as np # Result arrays
+import pytest # Error checks
+from catan_batch import generate_batch, words_to_batch # Batch board arrays
+from catan_core import RESOURCE_NAMES, get_topology, new_valid_board # Reference board and topology
+from catan_dice import _simulate_code, simulate, simulate_batch, simulate_board # Module under test
+
+def exact_income(board_words, mode):
+    """
+    Returns:
+    - ndarray: Shape (vertices, 5), the expected resources of every type per roll, from the pips of every hex.
+    """
+    cells = [cell.partition('-') for row in board_words for cell in row]
+    topology = get_topology(mode)
+    income = np.zeros((topology.vertex_count, len(RESOURCE_NAMES) - 1))
+    for vertex, hexes in enumerate(topology.vertex_hexes):
+        for hex_index in hexes:
+            resource, _, number = cells[hex_index]
+            if number:
+                income[vertex, RESOURCE_NAMES.index(resource) - 1] += (6 - abs(7 - int(number))) / 36
+    return income
+
+@pytest.fixture(scope='module')
+def board_words():
+    return new_valid_board('Regular', random.Random(8))[0]
+
+def test_income_matches_pip_arithmetic(board_words):
+    result = simulate_board(board_words, 'Regular', rolls=4_000_000, seed=5, trials=50)
+    expected = exact_income(board_words, 'Regular')
+    assert np.allclose(result['income'], expected, atol=3e-3)
+    assert np.allclose(result['total'], result['income'].sum(axis=1))
+    assert (result['variance'] >= 0).all()
+    assert result['total'][result['ranking'][0]] == result['total'].max()
+
+def test_time_to_build(board_words):
+    result = simulate_board(board_words, 'Regular', rolls=1000, seed=2, trials=200)
+    for build in ('road', 'settlement', 'city', 'development'):
+        finished = ~np.isnan(result['time_to_build'][build])
+        assert (result['time_to_build'][build][finished] >= 1).all()
+        assert ((result['unfinished'][build] >= 0) & (result['unfinished'][build] <= 1)).all()
+    # A spot touches at most three hexes, never the four resources a settlement costs
+    assert np.isnan(result['time_to_build']['settlement']).all()
+
+def test_only_seeded_results_are_cached(board_words):
+    _simulate_code.cache_clear()
+    simulate_board(board_words, 'Regular', rolls=1000, trials=10)
+    assert _simulate_code.cache_info().currsize == 0
+
+    first = simulate_board(board_words, 'Regular', rolls=1000, seed=3, trials=10)
+    first['income'][:] = -1 # Changing a result must not reach the cache
+    second = simulate_board(board_words, 'Regular', rolls=1000, seed=3, trials=10)
+    assert _simulate_code.cache_info().hits == 1
+    assert (second['income'] >= 0).all()
+
+def test_mode_must_match_the_board(board_words):
+    with pytest.raises(ValueError):
+        simulate_board(board_words, 'Expansion', rolls=1000, seed=1, trials=10)
+
+def test_batch_does_not_depend_on_workers():
+    boards = generate_batch('Regular', 4, seed=6)
+    one = simulate_batch(boards, 'Regular', rolls=10_000, seed=7, trials=20, workers=1)
+    two = simulate_batch(boards, 'Regular', rolls=10_000, seed=7, trials=20, workers=2)
+    for a, b in zip(one, two):
+        assert np.array_equal(a['income'], b['income'])
+        assert np.array_equal(a['unfinished']['city'], b['unfinished']['city'], equal_nan=True)
+
+def test_simulate_matches_simulate_board(board_words):
+    board = words_to_batch([board_words])[0]
+    direct = simulate(board, 'Regular', rolls=5000, seed=9, trials=10)
+    assert np.array_equal(direct['income'], simulate_board(board_words, 'Regular', 5000, 9, 10)['income'])
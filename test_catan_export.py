@@ -0,0 +1,27 @@
+### Catan Board Randomizer ###
+###    Board Export Tests    ###
+
+# Import Necessary Packages
+import io # In-memory files
+import itertools # Slicing the board stream
+import json # JSONL records
+import random # Rebuilding boards from their seeds
+from catan_core import iter_boards, new_valid_board # Reference boards
+from catan_export import read_binary, write_boards # Module under test
+
+def test_binary_round_trip():
+    for mode in ('Regular', 'Expansion'):
+        out = io.BytesIO()
+        write_boards(out, mode, 100, seed=4, fmt='binary', buffer_size=7)
+        out.seek(0)
+        expected = list(itertools.islice(iter_boards(mode, 4), 100))
+        read = list(read_binary(out))
+        assert [(words, seed) for words, _, _, seed in read] == [(words, seed) for words, _, _, seed in expected]
+        assert [tuple(port) for port in read[0][1]] == [tuple(port) for port in expected[0][1]]
+
+def test_jsonl_records_rebuild_from_their_seed():
+    out = io.BytesIO()
+    write_boards(out, 'Regular', 20, seed=8)
+    for line in out.getvalue().splitlines():
+        record = json.loads(line)
+        assert new_valid_board('Regular', random.Random(record['seed']))[0] == record['board_words']
@@ -0,0 +1,44 @@
+### Catan Board Randomizer ###
+###  Opening Solver Tests    ###
+
+# Import Necessary Packages
+import random # Seeded generators
+import time # Time budget checks
+import pytest # Parametrised player counts
+from catan_core import get_topology, new_valid_board # Reference boards
+from catan_openings import START_WIDTH, OpeningSolver, solve_openings # Module under test
+
+@pytest.mark.parametrize('mode, players', [('Regular', 3), ('Regular', 4), ('Expansion', 3), ('Expansion', 4)])
+def test_openings_obey_the_distance_rule_and_snake_order(mode, players):
+    board = new_valid_board(mode, random.Random(21))
+    result = solve_openings(*board, mode, players, budget=0.2)
+    settlements, picks = result['settlements'], result['picks']
+    assert len(settlements) == players
+
+    # Snake draft: players 0..n-1 place their first settlement, then n-1..0 their second
+    order = list(range(players)) + list(reversed(range(players)))
+    assert [player for player, _ in picks] == order
+    assert picks == [(player, settlements[player][0 if index < players else 1]) for index, player in enumerate(order)]
+
+    # No two settlements on the same vertex or on neighbouring vertices
+    vertices = [vertex for _, vertex in picks]
+    assert len(set(vertices)) == len(vertices)
+    neighbours = get_topology(mode).vertex_neighbours
+    for vertex in vertices:
+        assert not set(neighbours[vertex]) & set(vertices)
+
+    solver = OpeningSolver(*board, mode, players)
+    assert result['scores'] == [solver.score(pair) for pair in settlements]
+
+def test_openings_respect_the_time_budget():
+    board = new_valid_board('Expansion', random.Random(22))
+    start = time.perf_counter()
+    result = solve_openings(*board, 'Expansion', 4, budget=0.05)
+    # The first pass always completes, so allow for it on top of the budget
+    assert time.perf_counter() - start < 1.0
+    assert result['width'] >= START_WIDTH
+
+def test_invalid_player_counts_are_refused():
+    board = new_valid_board('Regular', random.Random(23))
+    with pytest.raises(ValueError):
+        solve_openings(*board, 'Regular', 5)
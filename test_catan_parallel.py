@@ -0,0 +1,30 @@
+### Catan Board Randomizer ###
+###     Parallel Tests     ###
+
+# Import Necessary Packages
+import numpy as np # Batch arrays
+import pytest # Parametrized modes
+import catan_parallel # Module under test
+from catan_batch import generate_batch, valid_mask # Reference chunks and validity
+from catan_parallel import generate_parallel # Module under test
+
+@pytest.mark.parametrize('mode', ['Regular', 'Expansion'])
+def test_output_does_not_depend_on_workers(mode, monkeypatch):
+    # Small chunks so that four workers share several of them, with a short one at the end
+    monkeypatch.setattr(catan_parallel, 'CHUNK_SIZE', 1000)
+    single = generate_parallel(mode, 5500, seed=21, workers=1)
+    pooled = generate_parallel(mode, 5500, seed=21, workers=4)
+    assert np.array_equal(single, pooled)
+    assert valid_mask(pooled, mode).all()
+
+    # Every chunk is the generate_batch output of its own child seed
+    chunk_seeds = np.random.SeedSequence(21).spawn(6)
+    assert np.array_equal(pooled[1000:2000], generate_batch(mode, 1000, chunk_seeds[1]))
+    assert np.array_equal(pooled[5000:], generate_batch(mode, 500, chunk_seeds[5]))
+
+def test_seeds_differ():
+    assert not np.array_equal(generate_parallel('Regular', 200, seed=1, workers=2),
+                              generate_parallel('Regular', 200, seed=2, workers=2))
+
+def test_empty_batch():
+    assert generate_parallel('Regular', 0, seed=1, workers=4).shape == (0, 2, 19)
@@ -0,0 +1,38 @@
+### Catan Board Randomizer ###
+###   Fairness Score Tests   ###
+
+# Import Necessary Packages
+import random # Seeded generator for the text boards
+import numpy as np # Score arrays
+import pytest # Parametrized modes
+from catan_batch import TOKENS, generate_batch, words_to_batch # Batch board arrays
+from catan_core import get_topology, new_valid_board # Reference boards and topology
+from catan_score import PIPS, best_of_n, score_batch, score_board # Module under test
+
+@pytest.mark.parametrize('mode', ['Regular', 'Expansion'])
+def test_best_of_n_keeps_the_fairest(mode):
+    boards, scores = best_of_n(mode, 3000, top=10, seed=8)
+    assert boards.shape[0] == 10
+    assert (np.diff(scores) <= 0).all() # Fairest first
+    assert np.allclose(score_batch(boards, mode)['score'], scores)
+
+    # The candidates are generate_batch's boards for the same seed, and no candidate left out beats the kept ones
+    candidates = score_batch(generate_batch(mode, 3000, 8), mode)['score']
+    assert np.allclose(np.sort(candidates)[::-1][:10], scores)
+    assert scores[-1] >= np.median(candidates)
+
+def test_best_of_n_with_top_above_n():
+    boards, scores = best_of_n('Regular', 5, top=10, seed=1)
+    assert len(boards) == 5 and (np.diff(scores) <= 0).all()
+
+def test_max_vertex_pips_matches_a_scan():
+    boards = generate_batch('Regular', 200, seed=3)
+    topology = get_topology('Regular')
+    expected = [max(sum(PIPS[board[TOKENS][hex_index]] for hex_index in hexes) for hexes in topology.vertex_hexes)
+                for board in boards]
+    assert np.array_equal(score_batch(boards, 'Regular')['max_vertex_pips'], expected)
+
+def test_score_board_matches_score_batch():
+    board_words = new_valid_board('Expansion', random.Random(6))[0]
+    batch = score_batch(words_to_batch([board_words]), 'Expansion')
+    assert score_board(board_words, 'Expansion') == pytest.approx(float(batch['score'][0]))
@@ -0,0 +1,170 @@
+### Catan Board Randomizer ###
+###  Board Service Tests     ###
+
+# Import Necessary Packages
+import asyncio # Event loop running the service
+import contextlib # Service lifetime as a context manager
+import http.client # HTTP client, which also decodes the chunked stream
+import json # Request and response bodies
+import socket # Raw connections for malformed requests
+import threading # Thread running the event loop
+import pytest # Fixtures
+from catan_codes import decode_board, text_to_code # Codes sent with every board
+from catan_constraints import RULES # Every house rule
+from catan_core import is_valid_board # Validity of the served boards
+from catan_service import MAX_BATCH_BOARDS, generate_chunk, serve # Module under test
+
+@contextlib.contextmanager
+def running_service(**options):
+    """
+    Runs serve on a free local port in a background thread.
+
+    Parameters:
+    - options: Keyword arguments for serve.
+
+    Yields:
+    - tuple: The (host, port) the service listens on.
+    """
+    running = {}
+    started = threading.Event()
+
+    def ready(host_port):
+        running['address'] = host_port
+        started.set()
+
+    async def main():
+        running['loop'], running['task'] = asyncio.get_running_loop(), asyncio.current_task()
+        await serve('127.0.0.1', 0, workers=1, depth=16, chunk=8, seed=1, ready=ready, **options)
+
+    def run():
+        with contextlib.suppress(asyncio.CancelledError):
+            asyncio.run(main())
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        assert started.wait(30), "The service did not start"
+        yield tuple(running['address'])
+    finally:
+        running['loop'].call_soon_threadsafe(running['task'].cancel)
+        thread.join(30)
+
+@pytest.fixture(scope='module')
+def service():
+    with running_service() as address:
+        yield address
+
+def request(address, method, path, body=None):
+    """
+    Returns:
+    - tuple: The status, the response headers and the body of one request on a new connection.
+    """
+    connection = http.client.HTTPConnection(*address, timeout=30)
+    try:
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+def raw_request(address, data):
+    """
+    Returns:
+    - bytes: Everything the service answers to 'data' before it closes the connection.
+    """
+    with socket.create_connection(address, timeout=30) as connection:
+        connection.sendall(data)
+        received = b''
+        while chunk := connection.recv(65536):
+            received += chunk
+    return received
+
+def check_record(record, mode):
+    assert is_valid_board(record['board_words'])
+    assert decode_board(text_to_code(record['code']))[0] == record['board_words']
+    assert len(record['board_words']) == (5 if mode == 'Regular' else 7)
+
+def test_board(service):
+    status, headers, body = request(service, 'GET', '/board?mode=Expansion')
+    assert status == 200 and headers['Content-Type'] == 'application/json'
+    check_record(json.loads(body), 'Expansion')
+
+    status, _, body = request(service, 'GET', '/board?rule=desert-in-center,no-adjacent-2-12')
+    assert status == 200
+    check_record(json.loads(body), 'Regular')
+
+def test_boards_are_streamed_in_chunks(service):
+    status, headers, body = request(service, 'GET', '/boards?mode=Regular&count=300')
+    assert status == 200 and headers['Transfer-Encoding'] == 'chunked'
+    records = [json.loads(line) for line in body.splitlines()]
+    assert len(records) == 300
+    assert len({record['seed'] for record in records}) == 300
+    for record in records[:20]:
+        check_record(record, 'Regular')
+
+def test_batch(service):
+    pulls = [{'mode': 'Regular', 'count': 3}, {'mode': 'Expansion', 'rules': ['no-adjacent-same-number']}]
+    status, _, body = request(service, 'POST', '/batch', json.dumps(pulls))
+    assert status == 200
+    results = json.loads(body)
+    assert [len(boards) for boards in results] == [3, 1]
+    check_record(results[1][0], 'Expansion')
+
+@pytest.mark.parametrize('method, path, body, status', [
+    ('GET', '/nowhere', None, 404),
+    ('POST', '/board', None, 405),
+    ('GET', '/board?mode=Huge', None, 400),
+    ('GET', '/board?rule=no-such-rule', None, 400),
+    ('GET', '/boards?count=0', None, 400),
+    ('GET', '/boards?count=many', None, 400),
+    ('POST', '/batch', b'not json', 400),
+    ('POST', '/batch', b'{"mode": "Regular"}', 400),
+    ('POST', '/batch', b'[1]', 400),
+    ('POST', '/batch', b'[{"mode": 3}]', 400),
+    ('POST', '/batch', b'[{"rules": "desert-in-center"}]', 400),
+    ('POST', '/batch', b'[{"rules": [1]}]', 400),
+    ('POST', '/batch', b'[{"count": null}]', 400),
+    ('POST', '/batch', json.dumps([{'count': MAX_BATCH_BOARDS}, {'count': 1}]).encode(), 400),
+])
+def test_errors(service, method, path, body, status):
+    answer_status, _, answer = request(service, method, path, body)
+    assert answer_status == status
+    assert 'error' in json.loads(answer)
+
+def test_malformed_requests_get_400(service):
+    assert raw_request(service, b'GARBAGE\r\n\r\n').startswith(b'HTTP/1.1 400 ')
+    answer = raw_request(service, b'POST /batch HTTP/1.1\r\nContent-Length: lots\r\n\r\n[]')
+    assert answer.startswith(b'HTTP/1.1 400 ')
+
+def test_keep_alive(service):
+    connection = http.client.HTTPConnection(*service, timeout=30)
+    try:
+        for _ in range(5):
+            connection.request('GET', '/board')
+            response = connection.getresponse()
+            assert response.status == 200
+            check_record(json.loads(response.read()), 'Regular')
+    finally:
+        connection.close()
+
+def test_stats(service):
+    request(service, 'GET', '/board')
+    status, _, body = request(service, 'GET', '/stats')
+    assert status == 200
+    stats = json.loads(body)
+    assert stats['requests']['/board'] >= 1
+    assert stats['boards_sent'] >= 1
+    assert 'Regular' in stats['inventory']
+    assert set(stats['latency_ms']) >= {'p50', 'p90', 'p99', 'mean', 'max'}
+
+def test_unsatisfiable_rules_fail_instead_of_hanging():
+    with pytest.raises(RuntimeError):
+        generate_chunk('Regular', tuple(RULES), 50, 0, max_attempts=1)
+
+    with running_service(max_attempts=1) as address:
+        status, _, body = request(address, 'GET', '/board?' + '&'.join(f"rule={rule}" for rule in RULES))
+        assert status == 500
+        assert 'error' in json.loads(body)
+        # The stream reports the failure before sending its status line
+        status, _, _ = request(address, 'GET', '/boards?count=100&' + '&'.join(f"rule={rule}" for rule in RULES))
+        assert status == 500
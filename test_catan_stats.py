@@ -0,0 +1,94 @@
+### Catan Board Randomizer ###
+###    Statistics Tests    ###
+
+# Import Necessary Packages
+import random # Seeded generator for the timed boards
+import sys # Stand-in modules imported while timing is on
+import types # Stand-in modules imported while timing is on
+import pytest # Fixtures
+import catan_core # Registered generation phases
+import catan_stats # Module under test
+
+def registered_functions():
+    """
+    Returns:
+    - dict: (module name, function name) -> the function the module holds now, for every registered function.
+    """
+    return {(module.__name__, name): getattr(module, name) for module, names in catan_stats._registry for name in names}
+
+def held_references(functions):
+    """
+    Returns:
+    - list: (module name, attribute) of every attribute of a catan_ module holding one of 'functions'.
+    """
+    ids = {id(function) for function in functions}
+    return sorted((module.__name__, attribute) for module in catan_stats._project_modules()
+                  for attribute, value in vars(module).items() if id(value) in ids)
+
+@pytest.fixture
+def stats():
+    catan_stats.disable()
+    catan_stats.reset()
+    registry = list(catan_stats._registry)
+    yield catan_stats
+    catan_stats.disable()
+    catan_stats.reset()
+    catan_stats._registry[:] = registry
+
+def test_enable_wraps_and_disable_restores(stats):
+    originals = registered_functions()
+    references = held_references(originals.values())
+    assert ('catan_core', 'new_board') in originals
+
+    stats.enable()
+    wrapped = registered_functions()
+    for key, function in wrapped.items():
+        assert function is not originals[key]
+        assert function.__wrapped__ is originals[key]
+    assert not held_references(originals.values()) # Every module holds the wrapper now
+
+    catan_core.new_board('Regular', random.Random(1))
+    timings = stats.snapshot()['timings']
+    assert {'new_board', 'populate_tiles', 'add_numbers'} <= set(timings) # Internal calls are timed too
+
+    stats.disable()
+    assert registered_functions() == originals
+    assert held_references(originals.values()) == references
+    assert not held_references(wrapped.values())
+
+    # Nothing is recorded while disabled
+    before = stats.snapshot()['timings']['new_board']['count']
+    catan_core.new_board('Regular', random.Random(2))
+    assert stats.snapshot()['timings']['new_board']['count'] == before
+
+def test_modules_imported_while_enabled(stats, monkeypatch):
+    stats.enable()
+
+    # A module registering its own functions after enable() is timed straight away
+    late = types.ModuleType('catan_late_probe')
+    def phase():
+        return 3
+    late.phase = phase
+    monkeypatch.setitem(sys.modules, late.__name__, late)
+    stats.register(late.__name__, ('phase',))
+    assert late.phase is not phase and late.phase() == 3
+    assert stats.snapshot()['timings']['phase']['count'] == 1
+
+    # A module importing a timed function by name after enable() holds the wrapper, and gets the original back
+    importer = types.ModuleType('catan_importer_probe')
+    importer.new_board = catan_core.new_board
+    importer.phase = late.phase
+    monkeypatch.setitem(sys.modules, importer.__name__, importer)
+
+    stats.disable()
+    assert late.phase is phase and importer.phase is phase
+    assert importer.new_board is catan_core.new_board and not hasattr(importer.new_board, '__wrapped__')
+
+def test_observations_and_summary(stats):
+    for value in (1, 1, 4):
+        stats.observe('attempts', value)
+    stats.record('phase', 0.003)
+    snapshot = stats.snapshot()
+    assert snapshot['observations']['attempts'] == {'count': 3, 'mean': 2.0, 'histogram': {1: 2, 4: 1}}
+    assert snapshot['timings']['phase']['histogram'] == {4096: 1}
+    assert len(stats.summary_lines()) == 2
@@ -0,0 +1,69 @@
+### Catan Board Randomizer ###
+###  Board Symmetry Tests    ###
+
+# Import Necessary Packages
+import os # Spill directory contents
+import random # Seeded generators for the Python boards
+import numpy as np # Batch arrays
+import pytest # Expected errors
+from catan_batch import generate_batch, words_to_batch # Reference boards
+from catan_core import new_valid_board # Reference boards
+from catan_symmetry import (BoardDeduplicator, canonical_hash, canonicalize, canonicalize_batch, dedup_stream,
+                            symmetries) # Module under test
+
+def moved(boards, symmetry):
+    """
+    Returns:
+    - ndarray of uint8: The boards with hex i moved onto permutation[i] of the symmetry.
+    """
+    copy = np.empty_like(boards)
+    copy[:, :, list(symmetry[2])] = boards
+    return copy
+
+def test_symmetry_counts():
+    assert len(symmetries('Regular')) == 12
+    assert len(symmetries('Expansion')) == 4
+    for mode in ('Regular', 'Expansion'):
+        assert symmetries(mode)[0][:2] == (0, False)
+        assert set(symmetries(mode, include_ports=True)) <= set(symmetries(mode))
+
+def test_canonical_hash_is_invariant_under_symmetries():
+    for mode in ('Regular', 'Expansion'):
+        boards = generate_batch(mode, 200, seed=16)
+        hashes = canonical_hash(boards, mode)
+        for symmetry in symmetries(mode):
+            copy = moved(boards, symmetry)
+            assert np.array_equal(canonical_hash(copy, mode), hashes)
+            assert np.array_equal(canonicalize_batch(copy, mode)[0], canonicalize_batch(boards, mode)[0])
+        # Different boards almost never collide on 64 bits
+        assert len(np.unique(hashes)) == len(boards)
+
+def test_canonicalize_single_board():
+    rng = random.Random(17)
+    for mode in ('Regular', 'Expansion'):
+        board_words, ports, _ = new_valid_board(mode, rng)
+        canonical_words, canonical_ports, hashed = canonicalize(board_words, ports, mode, include_ports=True)
+        assert hashed == int(canonical_hash(words_to_batch([board_words]), mode, include_ports=True)[0])
+        assert len(canonical_ports) == len(ports)
+        # The canonical board is its own canonical form
+        assert canonicalize(canonical_words, canonical_ports, mode, include_ports=True)[0] == canonical_words
+
+def test_dedup_stream_spills_to_disk(tmp_path):
+    mode = 'Regular'
+    boards = generate_batch(mode, 300, seed=18)
+    copies = [moved(boards, symmetry) for symmetry in symmetries(mode)[:4]]
+    batches = [boards[:100], copies[1], boards, copies[2][:150], copies[3]]
+
+    kept = list(dedup_stream(batches, mode, max_items=64, spill_dir=str(tmp_path)))
+    assert [len(batch) for batch in kept] == [100, 200, 0, 0, 0]
+    assert np.array_equal(kept[0], boards[:100])
+    assert len(np.unique(canonical_hash(np.concatenate(kept), mode))) == len(boards)
+    # The spill files are removed once the stream is done
+    assert os.listdir(tmp_path) == []
+
+def test_deduplicator_without_spill_dir_runs_out_of_memory():
+    seen = BoardDeduplicator(max_items=10)
+    assert seen.add_batch(np.arange(10, dtype=np.uint64)).all()
+    assert not seen.add_batch(np.arange(5, dtype=np.uint64)).any()
+    with pytest.raises(MemoryError):
+        seen.add_batch(np.arange(10, 20, dtype=np.uint64))
@@ -0,0 +1,46 @@
+### Catan Board Randomizer ###
+###  Transfer Matrix Tests   ###
+
+# Import Necessary Packages
+import random # Seeded generators
+from fractions import Fraction # Exact share of valid boards
+from math import comb # Desert choices per red placement
+import pytest # Parametrized modes
+from catan_core import get_topology, is_valid_board, new_board # Reference generator
+from catan_transfer import count_valid_boards, multinomial, placement_dp, sampling_throughput # Module under test
+
+@pytest.mark.parametrize('mode, red_sets, placements', [
+    ('Regular', 532, 7980),
+    ('Expansion', 21473, 5926548),
+])
+def test_counts(mode, red_sets, placements):
+    dp = placement_dp(mode)
+    assert dp.red_count == red_sets
+    # Every red set leaves the same hexes for the deserts
+    assert placements == red_sets * comb(get_topology(mode).hex_count - dp.reds, dp.deserts)
+    assert count_valid_boards(mode)['placements'] == dp.count == placements
+
+def test_regular_board_counts():
+    counts = count_valid_boards('Regular')
+    assert counts['all_boards'] == multinomial([0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 5, 5, 5]) * \
+        multinomial([2, 3, 3, 4, 4, 5, 5, 6, 6, 8, 8, 9, 9, 10, 10, 11, 11, 12])
+    assert Fraction(counts['valid_boards'], counts['all_boards']) == Fraction(7, 51)
+
+def test_valid_share_matches_new_board():
+    # The exact share of valid boards must agree with rejection sampling within four standard deviations
+    rng = random.Random(12)
+    samples = 10000
+    valid = sum(is_valid_board(new_board('Regular', rng)[0]) for _ in range(samples))
+    share = count_valid_boards('Regular')['valid_share']
+    assert abs(valid / samples - share) < 4 * (share * (1 - share) / samples) ** 0.5
+
+def test_samples_are_valid_placements():
+    dp = placement_dp('Expansion')
+    neighbours = get_topology('Expansion').neighbours
+    rng = random.Random(4)
+    for _ in range(200):
+        deserts, reds = dp.sample(rng)
+        assert len(set(deserts)) == dp.deserts and len(set(reds)) == dp.reds
+        assert not set(deserts) & set(reds)
+        assert not any(neighbour in reds for red in reds for neighbour in neighbours[red])
+    assert sampling_throughput(dp, samples=100, seed=1) > 0